@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+⏱️ ANALYZER BENCHMARK SUITE
+Times every signal component of AdvancedTechnicalAnalyzer, end-to-end analyze()
+and get_precise_entry_signal() on deterministic synthetic candles from 100 to
+100k bars, without Django setup.
+
+    python benchmark_analyzer.py                      # run, compare with the baseline if one exists
+    python benchmark_analyzer.py --save               # run and store the results as the baseline
+    python benchmark_analyzer.py --sizes 100,1000 --only analyze,fvg --threshold 0.5
+
+Exits with status 1 when a scenario's best time is slower than the baseline's
+by more than --threshold (default 25%); the best of many runs is far less
+sensitive to scheduler noise than the median. Baselines are machine-specific:
+save one on the machine that runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the predictor path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quotex_predictor'))
+
+from predictor.technical_analysis import AdvancedTechnicalAnalyzer, SIGNAL_WEIGHTS
+from predictor.ohlcv import OHLCV
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Differences below this many milliseconds are timer noise, never regressions
+NOISE_FLOOR_MS = 0.05
+
+
+def create_candles(periods, seed=7, freq='1h', volatility=0.004):
+    """Deterministic random-walk candles; the same seed and size always give the same frame"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end='2024-06-01', periods=periods, freq=freq)
+
+    close = 1.0850 * np.exp(np.cumsum(rng.normal(0, volatility, periods)))
+    open_price = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, volatility / 2, periods)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, volatility / 2, periods)))
+    volume = rng.integers(1000, 10000, periods).astype(float)
+
+    return pd.DataFrame({'open': open_price, 'high': high, 'low': low,
+                         'close': close, 'volume': volume}, index=dates)
+
+
+def build_scenarios(analyzer, df_1h, df_4h):
+    """Name -> zero-argument callable for one input size"""
+    bars_1h, bars_4h = OHLCV.from_frame(df_1h), OHLCV.from_frame(df_4h)
+
+    def component(name):
+        def run():
+            # Fresh per-frame memo, as at the start of an analysis
+            analyzer._frame_memo = {}
+            try:
+                return analyzer._component_evaluators(bars_1h, bars_4h)[name]()
+            finally:
+                analyzer._frame_memo = None
+        return run
+
+    scenarios = {name: component(name) for name in SIGNAL_WEIGHTS}
+
+    stored = analyzer.analyze(df_1h, df_4h)
+    live_price = float(df_1h['close'].iloc[-1]) * 1.0002
+    scenarios.update({
+        'analyze': lambda: analyzer.analyze(df_1h, df_4h),
+        'analyze_debug': lambda: analyzer.analyze(df_1h, df_4h, debug=True),
+        'analyze_horizons': lambda: analyzer.analyze(df_1h, df_4h, horizons=['1m', '5m', '10m']),
+        'precise_entry': lambda: analyzer.get_precise_entry_signal(df_1h, df_4h),
+        'precise_entry_cached': lambda: analyzer.get_precise_entry_signal(analysis=stored, current_price=live_price),
+    })
+    return scenarios
+
+
+def measure(run, min_time=0.2, min_runs=3, max_runs=200):
+    """Median and best wall time (ms) over repeated runs after one warm-up run"""
+    run()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_runs or (time.perf_counter() - started < min_time and len(timings) < max_runs):
+        t = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - t) * 1000)
+    return {'median_ms': round(statistics.median(timings), 4), 'min_ms': round(min(timings), 4), 'runs': len(timings)}
+
+
+def run_benchmarks(sizes, only=None, min_time=0.2):
+    """{'scenario@bars': timing} for every selected scenario and size"""
+    analyzer = AdvancedTechnicalAnalyzer()
+    # Load lazily imported code paths before the first timed scenario
+    analyzer.analyze(create_candles(100, seed=1), debug=True)
+
+    results = {}
+    for size in sizes:
+        df_1h = create_candles(size, seed=7)
+        df_4h = create_candles(size, seed=8, freq='4h', volatility=0.008)
+        scenarios = build_scenarios(analyzer, df_1h, df_4h)
+
+        print(f"\n📏 {size:,} bars")
+        print("-" * 50)
+        for name, run in scenarios.items():
+            if only and name not in only:
+                continue
+            timing = measure(run, min_time=min_time)
+            results[f"{name}@{size}"] = timing
+            print(f"   {name:24s} {timing['median_ms']:10.3f} ms  (best {timing['min_ms']:.3f}, {timing['runs']} runs)")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Scenarios whose best time exceeds the baseline's by more than `threshold` (a fraction)"""
+    regressions = []
+    print(f"\n📊 COMPARISON WITH BASELINE (threshold {threshold:.0%})")
+    print("=" * 50)
+    for key, timing in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        before, after = reference['min_ms'], timing['min_ms']
+        change = (after - before) / before if before else 0.0
+        regressed = after > before * (1 + threshold) and after - before > NOISE_FLOOR_MS
+        if regressed:
+            regressions.append(key)
+        marker = '❌' if regressed else ('🚀' if change < -threshold else '✅')
+        print(f"   {marker} {key:30s} {before:10.3f} -> {after:10.3f} ms ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the technical-analysis engine')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated bar counts (default: 100,1000,10000,100000)')
+    parser.add_argument('--only', default='', help='Comma-separated scenario names (default: all)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before flagging (0.25 = 25%%)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds to repeat each scenario for')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    only = {name.strip() for name in args.only.split(',') if name.strip()}
+
+    print("\n⏱️ ANALYZER BENCHMARKS")
+    print("=" * 50)
+    results = run_benchmarks(sizes, only, args.min_time)
+
+    if args.save:
+        # Merge, so a partial run only replaces the scenarios it measured
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f).get('results', {})
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'meta': {
+                    'created': pd.Timestamp.now().isoformat(),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'pandas': pd.__version__,
+                    'machine': platform.machine(),
+                },
+                'results': {**stored, **results},
+            }, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️ No baseline at {args.baseline}; run with --save to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n🎉 No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import TradingPair, PriceData, Prediction, AccuracyMetrics, ChartUpload
+from .models import TradingPair, PriceData, PriceTick, Prediction, AccuracyMetrics, AccuracyBucket, ChartUpload
 
 
 @admin.register(TradingPair)
@@ -17,6 +17,14 @@ class PriceDataAdmin(admin.ModelAdmin):
     ordering = ['-timestamp']
 
 
+@admin.register(PriceTick)
+class PriceTickAdmin(admin.ModelAdmin):
+    list_display = ['trading_pair', 'timestamp', 'price']
+    list_filter = ['trading_pair', 'timestamp']
+    search_fields = ['trading_pair__symbol']
+    ordering = ['-timestamp']
+
+
 @admin.register(Prediction)
 class PredictionAdmin(admin.ModelAdmin):
     list_display = ['trading_pair', 'direction', 'confidence', 'timeframe', 
@@ -36,6 +44,14 @@ class AccuracyMetricsAdmin(admin.ModelAdmin):
     ordering = ['-accuracy_percentage']
 
 
+@admin.register(AccuracyBucket)
+class AccuracyBucketAdmin(admin.ModelAdmin):
+    list_display = ['trading_pair', 'timeframe', 'hour', 'total_predictions', 'correct_predictions']
+    list_filter = ['timeframe', 'trading_pair', 'hour']
+    search_fields = ['trading_pair__symbol']
+    ordering = ['-hour']
+
+
 @admin.register(ChartUpload)
 class ChartUploadAdmin(admin.ModelAdmin):
     list_display = ['symbol', 'timeframe', 'uploaded_at', 'analysis_completed', 'get_real_prediction', 'get_visual_trend']
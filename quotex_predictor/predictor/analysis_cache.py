@@ -0,0 +1,98 @@
+"""
+Analysis Memoization
+Keeps the latest analysis per symbol until one of its timeframes closes a candle
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_FREQUENCIES = {
+    '1m': '1min',
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '1h',
+    '4h': '4h',
+    '1d': '1D',
+}
+
+
+def to_utc(timestamp) -> pd.Timestamp:
+    """`timestamp` in UTC; naive values are local wall-clock times, as the data sources produce them"""
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = pd.Timestamp(timestamp.to_pydatetime().astimezone())
+    return timestamp.tz_convert('UTC')
+
+
+def candle_close(timestamp, timeframe: str) -> Optional[pd.Timestamp]:
+    """Close time (UTC) of the last completed candle at `timestamp` (the open of the candle forming then)"""
+    if timestamp is None:
+        return None
+    return to_utc(timestamp).floor(TIMEFRAME_FREQUENCIES.get(timeframe, '1h'))
+
+
+def candle_key(symbol: str, frames: Dict[str, Optional[pd.DataFrame]]) -> Tuple:
+    """(symbol, timeframes, last closed candle per timeframe) for the newest bar of each frame"""
+    closes = tuple(
+        candle_close(df.index[-1], timeframe) if df is not None and len(df) else None
+        for timeframe, df in frames.items()
+    )
+    return (symbol, tuple(frames), closes)
+
+
+def current_key(symbol: str, timeframes: List[str], now=None) -> Tuple:
+    """Key an analysis of up-to-date frames would have at `now` (default: the current time)"""
+    now = pd.Timestamp.now(tz='UTC') if now is None else now
+    return (symbol, tuple(timeframes), tuple(candle_close(now, timeframe) for timeframe in timeframes))
+
+
+class AnalysisCache:
+    """
+    Analyses keyed by (symbol, timeframes, last closed candle timestamps in UTC)
+
+    Between candle closes the key is stable, so repeated requests reuse the
+    stored analysis and only re-evaluate the price-dependent fields. A candle
+    close changes the key and replaces the entry.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Stored analysis for `key`, or None when the candles have moved on"""
+        symbol, timeframes, _ = key
+        with self._lock:
+            entry = self._entries.get((symbol, timeframes))
+            if entry is None or entry[0] != key:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end((symbol, timeframes))
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def put(self, key: Tuple, analysis: Dict[str, Any]):
+        symbol, timeframes, _ = key
+        stored = copy.deepcopy(analysis)
+        with self._lock:
+            self._entries[(symbol, timeframes)] = (key, stored)
+            self._entries.move_to_end((symbol, timeframes))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,309 @@
+"""
+Analysis Service
+Runs AdvancedTechnicalAnalyzer.analyze in a warm process pool, off the web
+threads. Candle arrays reach the workers through shared memory, and a bounded
+queue turns bursts into a "busy" answer instead of an ever-growing backlog.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .analysis_cache import analysis_cache, candle_key
+from .ohlcv import OHLCV, as_bars
+from .profiling import StageTimer, NULL_TIMER, profiling_enabled, stage_histograms
+from .technical_analysis import AdvancedTechnicalAnalyzer, get_signal_profile
+
+logger = logging.getLogger(__name__)
+
+# Rows of a frame's shared-memory block; timestamps are stored as int64 in the last row
+BLOCK_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class AnalysisBusy(Exception):
+    """The service already holds its maximum number of queued and running jobs"""
+
+
+class AnalysisTimeout(Exception):
+    """A job did not finish before its deadline"""
+
+
+def _pack_frames(frames: List[Optional[OHLCV]]) -> Tuple[Optional[shared_memory.SharedMemory], List[Optional[Dict[str, Any]]]]:
+    """Copy bars into one shared-memory block; returns the block and a layout per frame"""
+    layouts, offset = [], 0
+    for bars in frames:
+        if bars is None or bars.empty:
+            layouts.append(None)
+            continue
+        layouts.append({'offset': offset, 'length': len(bars), 'tz': bars.tz, 'volume': bars.volume is not None})
+        offset += (len(BLOCK_FIELDS) + 1) * len(bars) * 8
+    if not offset:
+        return None, layouts
+
+    block = shared_memory.SharedMemory(create=True, size=offset)
+    for bars, layout in zip(frames, layouts):
+        if layout is None:
+            continue
+        rows, length = len(BLOCK_FIELDS), layout['length']
+        values = np.ndarray((rows, length), dtype=np.float64, buffer=block.buf, offset=layout['offset'])
+        for row, name in enumerate(BLOCK_FIELDS):
+            field = getattr(bars, name)
+            values[row] = 0.0 if field is None else field
+        stamps = np.ndarray(length, dtype=np.int64, buffer=block.buf, offset=layout['offset'] + rows * length * 8)
+        stamps[:] = bars.timestamps
+        del values, stamps
+    return block, layouts
+
+
+def _unpack_frames(name: str, layouts: List[Optional[Dict[str, Any]]]) -> List[Optional[OHLCV]]:
+    """Bars copied out of the shared-memory block written by _pack_frames"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        frames = []
+        for layout in layouts:
+            if layout is None:
+                frames.append(None)
+                continue
+            rows, length = len(BLOCK_FIELDS), layout['length']
+            values = np.ndarray((rows, length), dtype=np.float64, buffer=block.buf, offset=layout['offset']).copy()
+            stamps = np.ndarray(length, dtype=np.int64, buffer=block.buf, offset=layout['offset'] + rows * length * 8).copy()
+            frames.append(OHLCV(values[0], values[1], values[2], values[3], stamps,
+                                values[4] if layout['volume'] else None, tz=layout['tz']))
+        return frames
+    finally:
+        block.close()
+
+
+# Analyzer of a worker process, built once by _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(profile: Dict[str, Any]):
+    global _worker_analyzer
+    _worker_analyzer = AdvancedTechnicalAnalyzer(profile)
+
+
+def _warm_up() -> bool:
+    """First analysis of a worker, so imports and kernels are loaded before real jobs arrive"""
+    rng = np.random.default_rng(0)
+    close = 1.0 + np.cumsum(rng.normal(0, 0.001, 100))
+    bars = OHLCV(close, close + 0.001, close - 0.001, close, np.arange(100, dtype=np.int64) * 3_600_000_000_000)
+    _worker_analyzer.analyze(bars, bars)
+    return True
+
+
+def _run_job(block_name: str, layouts: List[Optional[Dict[str, Any]]], debug: bool, horizons: Optional[List[str]],
+             complete: bool, profile: bool, deadline: float) -> Tuple[Optional[Dict[str, Any]], float, Dict[str, tuple]]:
+    """
+    Analysis of one job in a worker, with the time it started and its stage timings;
+    None once its deadline has passed
+
+    Stage timings (debug or `profile`) go back to the parent, whose stage_histograms
+    the profiling endpoint reports; the worker's own histograms are never read.
+
+    Jobs go to whichever worker is free, so per-symbol state (level engine,
+    indicator cache, divergence history) would be split across workers. Workers
+    analyze without a symbol instead: every job reads its own frames only.
+    """
+    started = time.time()
+    if started > deadline:
+        return None, started, {}
+    bars_1h, bars_4h = _unpack_frames(block_name, layouts)
+    timer = StageTimer() if debug or profile else NULL_TIMER
+    analysis = _worker_analyzer.analyze(bars_1h, bars_4h, debug=debug, horizons=horizons, complete=complete, timer=timer)
+    return analysis, started, dict(timer.stages)
+
+
+class AnalysisService:
+    """
+    Analyses on a pool of warm worker processes
+
+    At most `max_pending` jobs are queued or running at once; further requests
+    raise AnalysisBusy right away. Each job has a deadline (`timeout` seconds by
+    default): the caller gets AnalysisTimeout when it passes, and a worker that
+    only reaches the job afterwards skips it. Analyses the parent process can
+    answer from analysis_cache are refreshed in place and never queued.
+
+    With `workers=0` jobs run inline in the calling thread; the queue bound
+    still applies, deadlines do not. With workers, per-symbol state is off:
+    levels, indicators and divergences come from each request's frames alone,
+    exactly as analyze() without a symbol, and cached analyses are re-priced
+    against their stored levels rather than a level engine.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 8, timeout: float = 10.0,
+                 profile: Dict[str, Any] = None):
+        self.workers = max(int(workers), 0)
+        self.max_pending = max(int(max_pending), 1)
+        self.timeout = float(timeout)
+        self.profile = profile or get_signal_profile()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'submitted': 0, 'completed': 0, 'cache_hits': 0, 'rejected': 0, 'timed_out': 0, 'failed': 0}
+
+    def start(self):
+        """Start the worker processes and warm them up with a throwaway analysis"""
+        if self.workers:
+            self._get_pool()
+        return self
+
+    def shutdown(self, wait: bool = False):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned workers do not inherit locks held by the web server's threads
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker, initargs=(self.profile,)
+                )
+                warm = [pool.submit(_warm_up) for _ in range(self.workers)]
+                for future in warm:
+                    future.result()
+                self._pool = pool
+            return self._pool
+
+    def state_symbol(self, symbol: Optional[str]) -> Optional[str]:
+        """Symbol for per-symbol state (level engine etc.): None with workers, where that state is off"""
+        # Per-symbol state lives in one process only when analyses run inline
+        return None if self.workers else symbol
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Configuration and job counters"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {'workers': self.workers, 'max_pending': self.max_pending, 'timeout': self.timeout, **stats}
+
+    def analyze(self, df_1h, df_4h=None, symbol: str = None, debug: bool = False,
+                horizons: List[str] = None, timeout: float = None) -> Dict[str, Any]:
+        """
+        Same result as AdvancedTechnicalAnalyzer.analyze, computed off the calling thread
+
+        Raises AnalysisBusy when the queue is full and AnalysisTimeout when the
+        job misses its deadline.
+        """
+        # Analyzers keep per-call state, so each request gets its own
+        analyzer = AdvancedTechnicalAnalyzer(self.profile)
+        state_symbol = self.state_symbol(symbol)
+        bars_1h, bars_4h = as_bars(df_1h), as_bars(df_4h)
+        if bars_1h is None or len(bars_1h) < 50:
+            return analyzer._get_default_analysis()
+
+        # Between candle closes the stored analysis only needs re-pricing, which is cheap
+        cache_key = candle_key(symbol, {'1h': bars_1h, '4h': bars_4h}) if symbol and not debug else None
+        if cache_key is not None:
+            cached = analysis_cache.get(cache_key)
+            if cached is not None:
+                self._count('cache_hits')
+                return analyzer.refresh_analysis(cached, float(bars_1h.close[-1]), state_symbol, horizons)
+
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise AnalysisBusy(f"{self.max_pending} analyses already queued or running")
+        self._count('submitted')
+
+        if not self.workers:
+            try:
+                analysis = analyzer.analyze(bars_1h, bars_4h, symbol=symbol, debug=debug, horizons=horizons)
+            finally:
+                self._slots.release()
+            self._count('completed')
+            return analysis
+
+        try:
+            analysis = self._submit(bars_1h, bars_4h, symbol, debug, horizons, cache_key is not None,
+                                    self.timeout if timeout is None else timeout)
+        except BrokenProcessPool as e:
+            # A dead worker breaks the whole pool; answer inline and start a fresh pool for later jobs
+            logger.error(f"Analysis pool broke, restarting: {e}")
+            self._count('failed')
+            self.shutdown()
+            return analyzer.analyze(bars_1h, bars_4h, symbol=state_symbol, debug=debug, horizons=horizons,
+                                    complete=cache_key is not None)
+        if cache_key is not None and 'components' in analysis['signal_breakdown']:
+            analysis_cache.put(cache_key, analysis)
+        return analysis
+
+    def _submit(self, bars_1h: OHLCV, bars_4h: Optional[OHLCV], symbol: Optional[str], debug: bool,
+                horizons: Optional[List[str]], complete: bool, timeout: float) -> Dict[str, Any]:
+        """Run one job on the pool; the slot and shared memory are released once the worker is done with them"""
+        submitted = time.time()
+        deadline = submitted + timeout
+        profile = profiling_enabled()
+        block, future = None, None
+        try:
+            block, layouts = _pack_frames([bars_1h, bars_4h])
+            future = self._get_pool().submit(_run_job, block.name, layouts, debug, horizons, complete, profile, deadline)
+        except Exception:
+            self._release(block)
+            raise
+        future.add_done_callback(lambda _: self._release(block))
+
+        try:
+            analysis, started, stages = future.result(timeout=max(deadline - time.time(), 0))
+        except FutureTimeout:
+            future.cancel()
+            self._count('timed_out')
+            raise AnalysisTimeout(f"Analysis of {symbol or 'frame'} missed its {timeout:.1f}s deadline")
+
+        if analysis is None:
+            self._count('timed_out')
+            raise AnalysisTimeout(f"Analysis of {symbol or 'frame'} missed its {timeout:.1f}s deadline")
+
+        self._count('completed')
+        if stages:
+            stage_histograms.record(stages)
+        if profile:
+            stage_histograms.record({
+                'service_queue_wait': (max(started - submitted, 0.0), 1),
+                'service_total': (time.time() - submitted, 1),
+            })
+        return analysis
+
+    def _release(self, block: Optional[shared_memory.SharedMemory]):
+        self._slots.release()
+        if block is not None:
+            try:
+                block.close()
+                block.unlink()
+            except Exception as e:
+                logger.error(f"Shared memory release error: {e}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_analysis_service() -> AnalysisService:
+    """Process-wide service configured by settings.ANALYSIS_WORKERS / ANALYSIS_QUEUE_SIZE / ANALYSIS_TIMEOUT"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            try:
+                from django.conf import settings
+                workers = getattr(settings, 'ANALYSIS_WORKERS', 0)
+                max_pending = getattr(settings, 'ANALYSIS_QUEUE_SIZE', 8)
+                timeout = getattr(settings, 'ANALYSIS_TIMEOUT', 10.0)
+            except Exception:
+                workers, max_pending, timeout = 0, 8, 10.0
+            _service = AnalysisService(workers, max_pending, timeout)
+            atexit.register(_service.shutdown)
+        return _service
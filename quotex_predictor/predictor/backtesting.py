@@ -0,0 +1,370 @@
+"""
+Walk-Forward Backtesting
+Replays AdvancedTechnicalAnalyzer over historical candles bar by bar and scores
+every call against the realized price
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .technical_analysis import AdvancedTechnicalAnalyzer, COMPONENT_LOOKBACKS, get_signal_profile
+from .ohlcv import OHLCV
+from .price_index import prices_at
+from .feature_matrix import FeatureMatrix, COMPONENTS, build_features, reduce_features
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Confidence buckets for the calibration table (lower bound inclusive)
+CALIBRATION_BUCKETS = (0, 70, 75, 80, 85, 90, 95, 101)
+
+
+class _ResampledBars:
+    """
+    Higher-timeframe candles built once from the base candles
+
+    `window(i, lookback)` returns the frame the analyzer would have seen at base
+    bar `i`: the last `lookback - 1` closed candles plus the candle still forming
+    at `i`, built only from base bars up to and including `i`.
+    """
+
+    def __init__(self, base: Dict[str, np.ndarray], index: pd.DatetimeIndex, freq: str):
+        period_start = index.floor(freq)
+        _, bucket = np.unique(period_start.asi8, return_inverse=True)
+
+        self.bucket = bucket
+        self.index = period_start[np.r_[True, bucket[1:] != bucket[:-1]]]
+        self.timestamps = self.index.as_unit('ns').asi8
+
+        # Closed candles, one per period
+        grouped = pd.DataFrame({name: base[name] for name in OHLCV_COLUMNS}).groupby(bucket, sort=True)
+        self.closed = {
+            'open': grouped['open'].first().to_numpy(dtype=float),
+            'high': grouped['high'].max().to_numpy(dtype=float),
+            'low': grouped['low'].min().to_numpy(dtype=float),
+            'close': grouped['close'].last().to_numpy(dtype=float),
+            'volume': grouped['volume'].sum().to_numpy(dtype=float),
+        }
+
+        # Forming candle as of each base bar (running aggregates within the period)
+        running = pd.DataFrame({name: base[name] for name in ('high', 'low', 'volume')}).groupby(bucket, sort=False)
+        self.forming = {
+            'open': self.closed['open'][bucket],
+            'high': running['high'].cummax().to_numpy(dtype=float),
+            'low': running['low'].cummin().to_numpy(dtype=float),
+            'close': np.asarray(base['close'], dtype=float),
+            'volume': running['volume'].cumsum().to_numpy(dtype=float),
+        }
+
+    def first_full_window(self, lookback: int) -> int:
+        """First base bar at which `lookback` candles (including the forming one) exist"""
+        return int(np.searchsorted(self.bucket, lookback - 1))
+
+    def windows(self, positions: np.ndarray, lookback: int) -> Dict[str, np.ndarray]:
+        """Full windows for many base bars at once, as (len(positions), lookback) arrays"""
+        buckets = self.bucket[positions]
+        closed_rows = buckets[:, None] - (lookback - 1) + np.arange(lookback - 1)
+        return {
+            name: np.concatenate([self.closed[name][closed_rows], self.forming[name][positions, None]], axis=1)
+            for name in OHLCV_COLUMNS
+        }
+
+    def window(self, i: int, lookback: int) -> OHLCV:
+        k = int(self.bucket[i])
+        start = max(k - lookback + 1, 0)
+        data = {
+            name: np.append(self.closed[name][start:k], self.forming[name][i])
+            for name in OHLCV_COLUMNS
+        }
+        return OHLCV(data['open'], data['high'], data['low'], data['close'],
+                     self.timestamps[start:k + 1], data['volume'], tz=self.index.tz)
+
+
+class WalkForwardBacktester:
+    """
+    Walk-forward replay of `AdvancedTechnicalAnalyzer.analyze()`
+
+    Base candles (normally 1m) are resampled once into 1h/4h candles; at every
+    evaluation step the analyzer sees `lookback` candles per timeframe, the last
+    one still forming at that moment, so no future data leaks into a call.
+    Each call is scored against the base close `horizon_minutes` later.
+
+    By default all steps are evaluated at once through the bar-wise feature
+    matrix; `vectorized=False` calls analyze() once per step instead, which is
+    the reference the matrix is checked against. Both modes use `profile`
+    (weights, bonuses and lookbacks; default settings.SIGNAL_PROFILE_PATH).
+    """
+
+    def __init__(self, horizon_minutes: int = 5, step_minutes: Optional[int] = None,
+                 lookback: int = 100, confidence_threshold: float = 70.0,
+                 vectorized: bool = True, chunk_size: int = 2048, profile: Dict[str, Any] = None):
+        self.horizon_minutes = horizon_minutes
+        self.step_minutes = step_minutes or horizon_minutes
+        self.lookback = lookback
+        self.confidence_threshold = confidence_threshold
+        self.vectorized = vectorized
+        self.chunk_size = chunk_size
+        self.profile = profile or get_signal_profile()
+
+    def run(self, candles: pd.DataFrame, symbol: str = 'BACKTEST') -> Dict[str, Any]:
+        """Replay the analyzer over `candles` (DatetimeIndex, OHLCV columns) and score every call"""
+        started = time.perf_counter()
+        steps = self._steps(candles)
+        positions = steps['positions']
+
+        if self.vectorized:
+            # Blend with the weights and bonuses analyze() would use under the same profile
+            analyzer = AdvancedTechnicalAnalyzer(self.profile)
+            blend = analyzer._horizon_profile(analyzer.prediction_timeframe)
+            reduced = reduce_features(self._features(steps), blend['weights'], blend['bonuses'])
+            directions, confidences = reduced['direction'], reduced['confidence']
+        else:
+            directions, confidences = self._evaluate_replay(steps, symbol)
+
+        called = directions != 0
+        directions = directions[called]
+        confidences = confidences[called]
+        change = steps['change'][called]
+
+        calls = pd.DataFrame({
+            'direction': np.where(directions > 0, 'UP', 'DOWN'),
+            'confidence': confidences,
+            'correct': np.where(directions > 0, change > 0, change < 0),
+            'meets_threshold': confidences >= self.confidence_threshold,
+        }, index=steps['index'][positions[called]].rename('time'))
+
+        report = score_calls(calls)
+        report.update({
+            'symbol': symbol,
+            'bars': len(steps['index']),
+            'horizon_minutes': self.horizon_minutes,
+            'step_minutes': self.step_minutes,
+            'confidence_threshold': self.confidence_threshold,
+            'mode': 'vectorized' if self.vectorized else 'replay',
+            'elapsed_seconds': round(time.perf_counter() - started, 2),
+        })
+        return report
+
+    def feature_dataset(self, candles: pd.DataFrame) -> Dict[str, Any]:
+        """Feature matrix for every evaluation step and the realized price change over the horizon"""
+        steps = self._steps(candles)
+        return {
+            'features': self._features(steps),
+            'change': steps['change'],
+            'index': steps['index'][steps['positions']],
+        }
+
+    def _steps(self, candles: pd.DataFrame) -> Dict[str, Any]:
+        """Resampled bars, evaluation positions and realized changes for `candles`"""
+        candles = _prepare_candles(candles)
+        n = len(candles)
+
+        base = {name: candles[name].to_numpy(dtype=float) for name in OHLCV_COLUMNS}
+        base_minutes = _bar_minutes(candles.index)
+        horizon = max(int(round(self.horizon_minutes / base_minutes)), 1)
+        step = max(int(round(self.step_minutes / base_minutes)), 1)
+
+        bars_1h = _ResampledBars(base, candles.index, '1h')
+        bars_4h = _ResampledBars(base, candles.index, '4h')
+
+        # Each close is observed when its bar ends; the outcome is the close at or just before
+        # `horizon_minutes` after that, so gaps in the candles cannot shift the horizon
+        close_times = candles.index.as_unit('ns').asi8 + int(base_minutes * 60e9)
+        horizon_ns = int(horizon * base_minutes * 60e9)
+
+        # Steps where both timeframes have a full window and the outcome is known
+        first = max(bars_1h.first_full_window(self.lookback), bars_4h.first_full_window(self.lookback))
+        positions = np.arange(first, n, step)
+        if n:
+            positions = positions[close_times[positions] + horizon_ns <= close_times[-1]]
+        outcome = prices_at(close_times, base['close'], close_times[positions] + horizon_ns)
+
+        return {
+            'index': candles.index,
+            'positions': positions,
+            'change': outcome - base['close'][positions],
+            'bars_1h': bars_1h,
+            'bars_4h': bars_4h,
+        }
+
+    def _features(self, steps: Dict[str, Any]) -> FeatureMatrix:
+        """Feature matrix for every step, built chunk by chunk to bound memory"""
+        positions = steps['positions']
+        lookbacks = {**COMPONENT_LOOKBACKS, **self.profile.get('lookbacks', {})}
+        chunks = []
+        for start in range(0, positions.size, self.chunk_size):
+            chunk = positions[start:start + self.chunk_size]
+            chunks.append(build_features(
+                steps['bars_1h'].windows(chunk, self.lookback),
+                steps['bars_4h'].windows(chunk, self.lookback),
+                lookbacks
+            ))
+
+        if not chunks:
+            return FeatureMatrix(
+                np.zeros((0, len(COMPONENTS)), dtype=np.int8),
+                np.zeros((0, len(COMPONENTS))),
+                np.zeros(0, dtype=np.int8)
+            )
+        return FeatureMatrix(
+            np.concatenate([chunk.direction for chunk in chunks]),
+            np.concatenate([chunk.strength for chunk in chunks]),
+            np.concatenate([chunk.fallback for chunk in chunks])
+        )
+
+    def _evaluate_replay(self, steps: Dict[str, Any], symbol: str):
+        """Direction and confidence for every step from one analyze() call per step"""
+        analyzer = AdvancedTechnicalAnalyzer(self.profile)
+        analyzer.min_confidence_threshold = self.confidence_threshold
+        positions = steps['positions']
+        directions = np.zeros(positions.size, dtype=np.int8)
+        confidences = np.zeros(positions.size)
+
+        for row, i in enumerate(positions):
+            try:
+                # Stateless analysis (no symbol), so every step only depends on its own windows
+                result = analyzer.analyze(
+                    steps['bars_1h'].window(i, self.lookback),
+                    steps['bars_4h'].window(i, self.lookback)
+                )
+            except Exception as e:
+                logger.error(f"Backtest analysis failed for {symbol} at {steps['index'][i]}: {str(e)}")
+                continue
+
+            direction = result.get('direction')
+            if direction in ('UP', 'DOWN'):
+                directions[row] = 1 if direction == 'UP' else -1
+                confidences[row] = float(result.get('confidence', 0))
+
+        return directions, confidences
+
+
+def score_calls(calls: pd.DataFrame) -> Dict[str, Any]:
+    """Hit-rate and confidence-calibration tables for scored calls"""
+    total = len(calls)
+    hits = int(calls['correct'].sum()) if total else 0
+
+    by_direction = {}
+    for direction in ('UP', 'DOWN'):
+        subset = calls[calls['direction'] == direction]
+        by_direction[direction] = _hit_rate_row(subset)
+
+    signals = calls[calls['meets_threshold']] if total else calls
+
+    calibration = []
+    if total:
+        buckets = pd.cut(calls['confidence'], bins=list(CALIBRATION_BUCKETS), right=False)
+        for interval, subset in calls.groupby(buckets, observed=True):
+            row = _hit_rate_row(subset)
+            row['bucket'] = f"{int(interval.left)}-{min(int(interval.right), 100)}"
+            row['avg_confidence'] = round(float(subset['confidence'].mean()), 2)
+            row['calibration_gap'] = round(row['hit_rate'] - row['avg_confidence'], 2)
+            calibration.append(row)
+
+    return {
+        'calls': total,
+        'hits': hits,
+        'hit_rate': round(hits / total * 100, 2) if total else 0.0,
+        'by_direction': by_direction,
+        'threshold_signals': _hit_rate_row(signals),
+        'calibration': calibration,
+    }
+
+
+def _hit_rate_row(subset: pd.DataFrame) -> Dict[str, Any]:
+    count = len(subset)
+    hits = int(subset['correct'].sum()) if count else 0
+    return {
+        'calls': count,
+        'hits': hits,
+        'hit_rate': round(hits / count * 100, 2) if count else 0.0,
+    }
+
+
+def _prepare_candles(candles: pd.DataFrame) -> pd.DataFrame:
+    candles = candles.copy()
+    candles.columns = [str(c).lower() for c in candles.columns]
+    if 'volume' not in candles.columns:
+        candles['volume'] = 1000.0
+    missing = [c for c in OHLCV_COLUMNS if c not in candles.columns]
+    if missing:
+        raise ValueError(f"Candles are missing columns: {', '.join(missing)}")
+    if not isinstance(candles.index, pd.DatetimeIndex):
+        raise ValueError("Candles must be indexed by timestamp")
+    candles = candles[~candles.index.duplicated(keep='last')].sort_index()
+    return candles[list(OHLCV_COLUMNS)].astype(float)
+
+
+def _bar_minutes(index: pd.DatetimeIndex) -> float:
+    """Typical spacing of the base candles in minutes"""
+    if len(index) < 2:
+        return 1.0
+    spacing = (index[1:] - index[:-1]).median() / pd.Timedelta(minutes=1)
+    return float(spacing) if spacing > 0 else 1.0
+
+
+def load_candles_csv(path: str) -> pd.DataFrame:
+    """Load OHLCV candles from a CSV with a timestamp/time/date column"""
+    df = pd.read_csv(path)
+    df.columns = [str(c).lower() for c in df.columns]
+    for column in ('timestamp', 'time', 'datetime', 'date'):
+        if column in df.columns:
+            df.index = pd.to_datetime(df.pop(column), utc=True)
+            break
+    else:
+        raise ValueError(f"{path}: no timestamp column")
+    return df
+
+
+def load_price_history(symbol: str, timeframe: str = '1m') -> pd.DataFrame:
+    """Load stored PriceData candles for a symbol"""
+    from .models import PriceData
+
+    rows = PriceData.objects.filter(
+        trading_pair__symbol=symbol, timeframe=timeframe
+    ).order_by('timestamp').values_list('timestamp', 'open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+    df = pd.DataFrame(list(rows), columns=['timestamp', *OHLCV_COLUMNS])
+    df.index = pd.DatetimeIndex(df.pop('timestamp'))
+    return df.astype(float)
+
+
+def load_symbol_candles(symbol: str, data_dir: Optional[str] = None, timeframe: str = '1m') -> pd.DataFrame:
+    """Candles for `symbol` from `<data_dir>/<SYMBOL>.csv`, or from stored PriceData"""
+    if data_dir:
+        path = os.path.join(data_dir, f'{symbol}.csv')
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No candle file for {symbol}: {path}")
+        return load_candles_csv(path)
+    return load_price_history(symbol, timeframe)
+
+
+def _run_symbol(args) -> Dict[str, Any]:
+    symbol, candles, options = args
+    try:
+        return WalkForwardBacktester(**options).run(candles, symbol=symbol)
+    except Exception as e:
+        logger.error(f"Backtest failed for {symbol}: {str(e)}")
+        return {'symbol': symbol, 'error': str(e)}
+
+
+def run_backtests(candles_by_symbol: Dict[str, pd.DataFrame], workers: int = 1, **options) -> List[Dict[str, Any]]:
+    """
+    Backtest several symbols, one symbol per worker process when `workers` > 1
+
+    `options` are passed to WalkForwardBacktester.
+    """
+    jobs = [(symbol, candles, options) for symbol, candles in candles_by_symbol.items()]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [_run_symbol(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_symbol, jobs))
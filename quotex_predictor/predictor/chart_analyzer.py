@@ -221,7 +221,8 @@ class ChartVisualAnalyzer:
             # Perform technical analysis on real data
             analysis = self.technical_analyzer.analyze(
                 df_1h=multi_tf_data['1h'], 
-                df_4h=multi_tf_data.get('4h', None)
+                df_4h=multi_tf_data.get('4h', None),
+                symbol=symbol
             )
             
             return {
@@ -0,0 +1,241 @@
+"""
+Divergence Engine
+Regular and hidden divergences between price swings and an oscillator (RSI,
+MACD) read at those swings, found for the whole series in one vectorized pass.
+
+At every swing the price and oscillator are compared with the previous swing
+of the same kind:
+- Regular bullish: lower low in price, higher low in the oscillator
+- Hidden bullish: higher low in price, lower low in the oscillator
+- Regular bearish: higher high in price, lower high in the oscillator
+- Hidden bearish: lower high in price, higher high in the oscillator
+
+The oscillator arrays are taken as given, so callers pass the series they
+already computed (indicator cache, analyzer memo) instead of recomputing them.
+"""
+
+import logging
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .levels import swing_point_masks
+from .ohlcv import OHLCV, as_bars
+from .structures import Divergences
+
+logger = logging.getLogger(__name__)
+
+DIVERGENCE_TYPES = ('REGULAR_BULLISH', 'HIDDEN_BULLISH', 'REGULAR_BEARISH', 'HIDDEN_BEARISH')
+
+SWING_WINDOW = 5        # Bars on each side of a swing
+MAX_SWING_GAP = 60      # Most bars between the two swings of a divergence
+RECENT_BARS = 10        # A divergence is live while its second swing is this close to the last bar
+
+REGULAR_STRENGTH = 0.6
+HIDDEN_STRENGTH = 0.45
+CONFIRMATION_BONUS = 0.2    # Both oscillators diverge the same way
+
+
+def _previous_swing(mask: np.ndarray) -> np.ndarray:
+    """Position of the swing before each bar (-1 when there is none)"""
+    positions = np.where(mask, np.arange(mask.shape[-1]), -1)
+    last = np.maximum.accumulate(positions, axis=-1)
+    previous = np.full(mask.shape, -1, dtype=np.int64)
+    previous[..., 1:] = last[..., :-1]
+    return previous
+
+
+def _at(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """values[positions] along the last axis"""
+    if values.ndim == 1:
+        return values[positions]
+    return np.take_along_axis(values, positions, axis=-1)
+
+
+def divergence_masks(high: np.ndarray, low: np.ndarray, oscillators: Dict[str, np.ndarray],
+                     window: int = SWING_WINDOW, max_gap: int = MAX_SWING_GAP) -> Tuple[Dict[str, Dict[str, np.ndarray]], np.ndarray, np.ndarray]:
+    """
+    Per-bar masks of the four divergence types for each oscillator, set at the second swing
+
+    Works on 1-D series and on (rows, bars) stacks; swings are found once and
+    shared by all oscillators. Returns {indicator: {type: mask}} with the
+    position of the previous swing high and low of every bar. Bars where an
+    oscillator is still NaN (warm-up) never diverge.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    is_high, is_low = swing_point_masks(high, low, window)
+    bars = np.arange(high.shape[-1])
+
+    prev_high = _previous_swing(is_high)
+    prev_low = _previous_swing(is_low)
+    at_high = is_high & (prev_high >= 0) & (bars - prev_high <= max_gap)
+    at_low = is_low & (prev_low >= 0) & (bars - prev_low <= max_gap)
+    from_high = np.maximum(prev_high, 0)
+    from_low = np.maximum(prev_low, 0)
+
+    # Sign of the move from the previous swing: +1 higher, -1 lower, NaN undefined
+    high_move = np.sign(high - _at(high, from_high))
+    low_move = np.sign(low - _at(low, from_low))
+
+    masks = {}
+    for indicator, oscillator in oscillators.items():
+        oscillator = np.asarray(oscillator, dtype=float)
+        osc_high_move = np.sign(oscillator - _at(oscillator, from_high))
+        osc_low_move = np.sign(oscillator - _at(oscillator, from_low))
+        masks[indicator] = {
+            'REGULAR_BULLISH': at_low & (low_move < 0) & (osc_low_move > 0),
+            'HIDDEN_BULLISH': at_low & (low_move > 0) & (osc_low_move < 0),
+            'REGULAR_BEARISH': at_high & (high_move > 0) & (osc_high_move < 0),
+            'HIDDEN_BEARISH': at_high & (high_move < 0) & (osc_high_move > 0),
+        }
+    return masks, prev_high, prev_low
+
+
+def find_divergences(bars: OHLCV, oscillators: Dict[str, np.ndarray], window: int = SWING_WINDOW,
+                     max_gap: int = MAX_SWING_GAP, scan=None) -> Divergences:
+    """
+    Every divergence of the frame against each named oscillator, ordered by the second swing
+
+    `scan` is the frame's divergence_masks() result when the caller already has it.
+    """
+    bars = as_bars(bars)
+    oscillators = {name: np.asarray(values, dtype=float) for name, values in oscillators.items()}
+    masks, prev_high, prev_low = scan or divergence_masks(bars.high, bars.low, oscillators, window, max_gap)
+
+    parts = []
+    for indicator, oscillator in oscillators.items():
+        for kind in DIVERGENCE_TYPES:
+            ends = np.flatnonzero(masks[indicator][kind])
+            if not len(ends):
+                continue
+            bullish = kind.endswith('BULLISH')
+            prices = bars.low if bullish else bars.high
+            starts = (prev_low if bullish else prev_high)[ends]
+            parts.append(Divergences(
+                tz=bars.tz, type=np.full(len(ends), kind), indicator=np.full(len(ends), indicator),
+                start=bars.timestamps[starts], end=bars.timestamps[ends],
+                price_start=prices[starts], price_end=prices[ends],
+                oscillator_start=oscillator[starts], oscillator_end=oscillator[ends]
+            ))
+
+    divergences = Divergences.concat(parts, bars.tz)
+    if len(divergences):
+        divergences = divergences[np.argsort(divergences.end, kind='stable')]
+    return divergences
+
+
+def _latest(masks: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Direction (+1/-1, 0 for none or conflicting) and regular flag of the last divergence per row"""
+    last = {kind: np.where(mask.any(axis=-1), mask.shape[-1] - 1 - np.argmax(mask[..., ::-1], axis=-1), -1)
+            for kind, mask in masks.items()}
+    bullish = np.maximum(last['REGULAR_BULLISH'], last['HIDDEN_BULLISH'])
+    bearish = np.maximum(last['REGULAR_BEARISH'], last['HIDDEN_BEARISH'])
+
+    direction = np.where(bullish > bearish, 1, np.where(bearish > bullish, -1, 0)).astype(np.int8)
+    regular = np.where(direction > 0, last['REGULAR_BULLISH'] == bullish, last['REGULAR_BEARISH'] == bearish)
+    return direction, regular & (direction != 0)
+
+
+def latest_divergence(masks: Dict[str, Dict[str, np.ndarray]],
+                      recent: int = RECENT_BARS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Direction, strength and regular flag of the live divergence, per row
+
+    Only swings confirmed within the last `recent` bars count. Regular
+    divergences score REGULAR_STRENGTH, hidden ones HIDDEN_STRENGTH, plus
+    CONFIRMATION_BONUS when both oscillators diverge the same way; opposite
+    divergences on the two oscillators cancel out.
+    """
+    found, found_regular = [], []
+    for indicator_masks in masks.values():
+        direction, regular = _latest({kind: np.atleast_2d(mask)[:, -recent:] for kind, mask in indicator_masks.items()})
+        found.append(direction)
+        found_regular.append(regular)
+    found, found_regular = np.array(found), np.array(found_regular)
+
+    bullish, bearish = (found > 0).any(axis=0), (found < 0).any(axis=0)
+    direction = np.where(bullish & ~bearish, 1, np.where(bearish & ~bullish, -1, 0)).astype(np.int8)
+    agreeing = (found == direction) & (direction != 0)
+    regular = (agreeing & found_regular).any(axis=0)
+
+    strength = np.where(regular, REGULAR_STRENGTH, HIDDEN_STRENGTH) + CONFIRMATION_BONUS * (agreeing.sum(axis=0) > 1)
+    strength = np.where(direction != 0, np.minimum(strength, 1.0), 0.0)
+    return direction, strength, regular
+
+
+def divergence_signal(high: np.ndarray, low: np.ndarray, oscillators: Dict[str, np.ndarray],
+                      window: int = SWING_WINDOW, max_gap: int = MAX_SWING_GAP,
+                      recent: int = RECENT_BARS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """latest_divergence() scanning only the tail that can hold the recent swings and their previous swings"""
+    span = recent + max_gap + 2 * window
+    tail = {name: np.asarray(values, dtype=float)[..., -span:] for name, values in oscillators.items()}
+    masks, _, _ = divergence_masks(np.asarray(high, dtype=float)[..., -span:],
+                                   np.asarray(low, dtype=float)[..., -span:], tail, window, max_gap)
+    return latest_divergence(masks, recent)
+
+
+class DivergenceEngine:
+    """
+    Divergences of one symbol accumulated across calls
+
+    A swing is final once `window` bars follow it, so each update scans only
+    the bars after the last final bar, plus enough history before them to
+    reach the previous swing; divergences already recorded are never searched
+    for again. The last `max_history` divergences are kept.
+    """
+
+    def __init__(self, window: int = SWING_WINDOW, max_gap: int = MAX_SWING_GAP, max_history: int = 500):
+        self.window = window
+        self.max_gap = max_gap
+        self.max_history = max_history
+        self.divergences = None
+        self.last_bar_time = None  # Timestamp of the last bar whose swing status is final
+        self._lock = threading.Lock()
+
+    def update(self, bars: OHLCV, oscillators: Dict[str, np.ndarray]) -> Divergences:
+        """Record the divergences that became final with these bars; returns the full history"""
+        bars = as_bars(bars)
+        n = len(bars)
+        with self._lock:
+            if self.divergences is None:
+                self.divergences = Divergences.empty(bars.tz)
+            final = n - self.window - 1
+            if final < 0:
+                return self.divergences
+
+            start, boundary = 0, None
+            if self.last_bar_time is not None:
+                processed = int(np.searchsorted(bars.timestamps, self.last_bar_time, side='right'))
+                if processed > final:
+                    return self.divergences
+                # Swings before the tail are only needed as the previous swing of a new one
+                start = max(processed - self.max_gap - 2 * self.window, 0)
+                boundary = self.last_bar_time
+
+            tail = bars.tail(n - start)
+            found = find_divergences(tail, {name: np.asarray(values, dtype=float)[start:]
+                                            for name, values in oscillators.items()},
+                                     self.window, self.max_gap)
+            if boundary is not None and len(found):
+                found = found[found.end > boundary]
+
+            self.divergences = Divergences.concat([self.divergences, found], bars.tz)[-self.max_history:]
+            self.last_bar_time = int(bars.timestamps[final])
+            return self.divergences
+
+
+_engines: Dict[Tuple[str, str], DivergenceEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_divergence_engine(symbol: str, timeframe: str = '1h') -> DivergenceEngine:
+    """Process-wide divergence engine per symbol/timeframe so history accumulates across calls"""
+    key = (symbol, timeframe)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = DivergenceEngine()
+            _engines[key] = engine
+        return engine
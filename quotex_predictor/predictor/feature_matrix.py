@@ -0,0 +1,525 @@
+"""
+Bar-wise Feature Matrix
+Expresses the AdvancedTechnicalAnalyzer signal components as per-bar columns
+(direction and strength) so that direction and confidence for many bars come
+from one vectorized reduction instead of one analyze() call per bar.
+
+Input is a stack of analysis windows: a dict of OHLCV arrays shaped
+(rows, lookback), where each row is the frame analyze() would receive. Every
+component replicates the stateless analyze() path on that frame (no per-symbol
+level or divergence engine, no indicator cache).
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import indicators as kernels
+from .levels import swing_point_masks
+from .divergence import divergence_signal
+from .technical_analysis import SIGNAL_WEIGHTS, CONFIDENCE_BONUSES, COMPONENT_LOOKBACKS
+
+# Column order of the matrix; matches the order analyze() collects signals in
+COMPONENTS = (
+    'htf_bias', 'bos', 'choch', 'fvg', 'support_resistance', 'supply_demand',
+    'order_blocks', 'ict_concepts', 'smart_money', 'smart_money_divergence',
+    'qmlr', 'traditional', 'ltf_structure',
+)
+
+SWING_WINDOW = 5
+LEVEL_WINDOW = 3
+LEVEL_BIN_PCT = 0.001
+
+
+class FeatureMatrix:
+    """
+    Signal components for a stack of analysis windows
+
+    - direction: (rows, components) +1 for UP, -1 for DOWN, 0 when the component is silent
+    - strength: (rows, components) component strength; a firing component adds
+      SIGNAL_WEIGHTS[name] * strength to the blend
+    - fallback: (rows,) direction used when no component fires
+    """
+
+    def __init__(self, direction: np.ndarray, strength: np.ndarray, fallback: np.ndarray):
+        self.direction = direction
+        self.strength = strength
+        self.fallback = fallback
+
+    def __len__(self):
+        return self.direction.shape[0]
+
+    def column(self, name: str) -> int:
+        return COMPONENTS.index(name)
+
+
+def window_stack(df: pd.DataFrame, lookback: int) -> Dict[str, np.ndarray]:
+    """Every full `lookback`-bar window of `df` as (rows, lookback) views, one row per closing bar"""
+    stack = {}
+    for name in ('open', 'high', 'low', 'close', 'volume'):
+        if name in df.columns:
+            values = df[name].to_numpy(dtype=float)
+        else:
+            values = np.full(len(df), 1000.0)
+        stack[name] = np.lib.stride_tricks.sliding_window_view(values, lookback)
+    return stack
+
+
+def _recent(bars: Dict[str, np.ndarray], lookback: Optional[int]) -> Dict[str, np.ndarray]:
+    """Last `lookback` columns of each window (all of them without a lookback), as analyze() hands a component"""
+    if not lookback:
+        return bars
+    return {key: np.asarray(values)[:, -lookback:] for key, values in bars.items()}
+
+
+def build_features(bars_1h: Dict[str, np.ndarray], bars_4h: Optional[Dict[str, np.ndarray]] = None,
+                   lookbacks: Optional[Dict[str, int]] = None) -> FeatureMatrix:
+    """
+    Compute every signal component for each row of the window stacks
+
+    Each component sees the last `lookbacks[name]` columns of its frame (the 4H
+    stack for htf_bias and the 4H side of qmlr), as in analyze(); pass the
+    analyzer's `component_lookbacks`, default COMPONENT_LOOKBACKS.
+    """
+    lookbacks = COMPONENT_LOOKBACKS if lookbacks is None else lookbacks
+    if bars_4h is None:
+        bars_4h = bars_1h
+
+    close = np.asarray(bars_1h['close'], dtype=float)
+    rows = close.shape[0]
+    direction = np.zeros((rows, len(COMPONENTS)), dtype=np.int8)
+    strength = np.zeros((rows, len(COMPONENTS)))
+
+    def put(name, up, down, values):
+        col = COMPONENTS.index(name)
+        direction[:, col] = np.where(up, 1, np.where(down, -1, 0))
+        strength[:, col] = np.where(up | down, values, 0.0)
+
+    # One view per (stack, lookback) and one swing scan per view, so components with equal lookbacks share them
+    views, view_swings = {}, {}
+
+    def recent(bars, name):
+        lookback = lookbacks.get(name)
+        if not lookback or lookback >= np.shape(bars['close'])[-1]:
+            lookback = None
+        key = (id(bars), lookback)
+        if key not in views:
+            views[key] = _recent(bars, lookback)
+        return views[key]
+
+    def swings_of(view):
+        if id(view) not in view_swings:
+            view_swings[id(view)] = _swings(view)
+        return view_swings[id(view)]
+
+    htf = recent(bars_4h, 'htf_bias')
+    ltf = recent(bars_1h, 'ltf_structure')
+    htf_bias, htf_strength = _market_structure(htf, swings_of(htf))
+    ltf_bias, ltf_strength = _market_structure(ltf, swings_of(ltf))
+
+    put('htf_bias', htf_bias > 0, htf_bias < 0, htf_strength)
+    bos_bars = recent(bars_1h, 'bos')
+    put('bos', *_break_of_structure(np.asarray(bos_bars['close'], dtype=float), swings_of(bos_bars)))
+    put('choch', *_change_of_character(swings_of(recent(bars_1h, 'choch'))))
+    put('fvg', *_fair_value_gaps(recent(bars_1h, 'fvg')))
+    put('support_resistance', *_support_resistance(recent(bars_1h, 'support_resistance')))
+    put('supply_demand', *_supply_demand_zones(recent(bars_1h, 'supply_demand')))
+    put('order_blocks', *_order_blocks(recent(bars_1h, 'order_blocks')))
+    ict_bars = recent(bars_1h, 'ict_concepts')
+    put('ict_concepts', *_ict_concepts(np.asarray(ict_bars['close'], dtype=float), swings_of(ict_bars)))
+    put('smart_money', *_smart_money_concepts(swings_of(recent(bars_1h, 'smart_money'))))
+    divergence_bars = recent(bars_1h, 'smart_money_divergence')
+    traditional_bars = recent(bars_1h, 'traditional')
+    divergence_oscillators = _oscillators(divergence_bars['close'])
+    # The same view has the same closes, so RSI / MACD are computed once for both components
+    if traditional_bars is divergence_bars:
+        traditional_oscillators = divergence_oscillators
+    else:
+        traditional_oscillators = _oscillators(traditional_bars['close'])
+    put('smart_money_divergence', *_smart_money_divergence(divergence_bars, divergence_oscillators))
+    qmlr_1h, qmlr_4h = recent(bars_1h, 'qmlr'), recent(bars_4h, 'qmlr')
+    qmlr_strength = ltf_strength if qmlr_1h is ltf else _trend_strength(qmlr_1h)
+    put('qmlr', *_qmlr(qmlr_1h, qmlr_4h, qmlr_strength))
+    put('traditional', *_traditional_confirmation(traditional_bars, traditional_oscillators))
+    put('ltf_structure', ltf_bias > 0, ltf_bias < 0, ltf_strength)
+
+    # No component fired: follow the last 5-bar move
+    fallback = np.where(close[:, -1] - close[:, -5] > 0, 1, -1).astype(np.int8)
+
+    return FeatureMatrix(direction, strength, fallback)
+
+
+def signal_votes(features: FeatureMatrix) -> Dict[str, np.ndarray]:
+    """
+    Weight-independent part of the blend: direction (majority vote with the HTF
+    bias as tie-breaker, fallback when nothing fires), majority share and the
+    bonus conditions
+    """
+    direction = features.direction
+    up = (direction > 0).sum(axis=1)
+    down = (direction < 0).sum(axis=1)
+    total = up + down
+
+    htf = direction[:, features.column('htf_bias')]
+    ltf = direction[:, features.column('ltf_structure')]
+
+    majority = np.where(up > down, 1, np.where(down > up, -1, np.where(htf != 0, htf, 1)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        consensus_ratio = np.maximum(up, down) / total
+
+    return {
+        'direction': np.where(total > 0, majority, features.fallback).astype(np.int8),
+        'has_signals': total > 0,
+        'consensus_ratio': consensus_ratio,
+        'mtf': (htf != 0) & (ltf == htf),
+        'structure': (direction[:, features.column('bos')] != 0) | (direction[:, features.column('choch')] != 0),
+    }
+
+
+def reduce_features(features: FeatureMatrix, weights: Optional[Dict[str, float]] = None,
+                    bonuses: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Direction (+1/-1) and confidence for every row, following the analyze() blend:
+    70 plus consensus, weight, multi-timeframe and structure bonuses, capped to 70-95
+
+    Pass the analyzer's blend (weights and bonuses of its prediction timeframe)
+    to match a loaded signal profile; default SIGNAL_WEIGHTS / CONFIDENCE_BONUSES.
+    """
+    weights = weights or SIGNAL_WEIGHTS
+    bonuses = bonuses or CONFIDENCE_BONUSES
+    weight_vector = np.array([weights[name] for name in COMPONENTS])
+    votes = signal_votes(features)
+
+    total_weight = features.strength @ weight_vector
+    confidence = (
+        70.0
+        + (votes['consensus_ratio'] - 0.5) * bonuses['consensus']
+        + np.minimum(total_weight * bonuses['weight_scale'], bonuses['weight_cap'])
+        + np.where(votes['mtf'], bonuses['mtf'], 0.0)
+        + np.where(votes['structure'], bonuses['structure'], 0.0)
+    )
+    confidence = np.where(votes['has_signals'], np.clip(confidence, 70.0, 95.0), 70.0)
+
+    return {'direction': votes['direction'], 'confidence': np.round(confidence, 1)}
+
+
+def _last_swings(mask: np.ndarray, prices: np.ndarray, count: int = 3):
+    """Prices of the latest `count` swings per row (latest first, NaN if missing) and the swing count"""
+    positions = np.where(mask, np.arange(mask.shape[-1]), -1)
+    latest = -np.sort(-positions, axis=-1)[:, :count]
+    values = np.take_along_axis(prices, np.maximum(latest, 0), axis=-1)
+    return np.where(latest >= 0, values, np.nan), mask.sum(axis=-1)
+
+
+def _swings(bars: Dict[str, np.ndarray]):
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    is_high, is_low = swing_point_masks(high, low, SWING_WINDOW)
+    high_prices, high_count = _last_swings(is_high, high)
+    low_prices, low_count = _last_swings(is_low, low)
+    return high_prices, high_count, low_prices, low_count
+
+
+def _trend_strength(bars: Dict[str, np.ndarray]) -> np.ndarray:
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    close = np.asarray(bars['close'], dtype=float)
+    volume = np.asarray(bars['volume'], dtype=float)
+
+    adx_strength = np.minimum(kernels.adx(high, low, close, 14)[:, -1] / 50, 1.0)
+    price_change = (close[:, -1] - close[:, -20]) / close[:, -20]
+    momentum_strength = np.minimum(np.abs(price_change) * 10, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_strength = np.minimum(volume[:, -5:].mean(axis=1) / volume.mean(axis=1), 2.0) / 2.0
+
+    return np.minimum(adx_strength * 0.4 + momentum_strength * 0.4 + volume_strength * 0.2, 1.0)
+
+
+def _market_structure(bars: Dict[str, np.ndarray], swings):
+    """Bias (+1/-1/0) and trend strength per row"""
+    rows, lookback = np.shape(bars['close'])
+    if lookback < 20:
+        return np.zeros(rows, dtype=np.int8), np.zeros(rows)
+
+    high_prices, high_count, low_prices, low_count = swings
+    enough = (high_count >= 2) & (low_count >= 2)
+    three_highs = high_count >= 3
+    three_lows = low_count >= 3
+    h0, h1, h2 = high_prices[:, 0], high_prices[:, 1], high_prices[:, 2]
+    l0, l1, l2 = low_prices[:, 0], low_prices[:, 1], low_prices[:, 2]
+
+    higher_highs = (h0 > h1) & (~three_highs | (h1 > h2))
+    higher_lows = (l0 > l1) & (~three_lows | (l1 > l2))
+    lower_highs = (h0 < h1) & (~three_highs | (h1 < h2))
+    lower_lows = (l0 < l1) & (~three_lows | (l1 < l2))
+
+    bullish = enough & higher_highs & higher_lows
+    bearish = enough & ~bullish & lower_highs & lower_lows
+
+    strength = _trend_strength(bars)
+    strong = strength > 0.6
+    bias = np.where(bullish & strong, 1, np.where(bearish & strong, -1, 0)).astype(np.int8)
+    return bias, strength
+
+
+def _break_of_structure(close: np.ndarray, swings):
+    high_prices, high_count, low_prices, low_count = swings
+    current = close[:, -1]
+    enough = (high_count >= 2) & (low_count >= 2)
+
+    recent_high = np.where(high_count >= 3, high_prices.max(axis=1), high_prices[:, 0])
+    recent_low = np.where(low_count >= 3, low_prices.min(axis=1), low_prices[:, 0])
+
+    bullish = enough & (current > recent_high * 1.001)
+    bearish = enough & ~bullish & (current < recent_low * 0.999)
+    strength = np.where(
+        bullish,
+        np.minimum((current - recent_high) / recent_high * 100, 1.0),
+        np.minimum((recent_low - current) / recent_low * 100, 1.0),
+    )
+    return bullish, bearish, np.minimum(strength, 1.0)
+
+
+def _change_of_character(swings):
+    high_prices, high_count, low_prices, low_count = swings
+    enough = (high_count >= 3) & (low_count >= 3)
+    h0, h1, h2 = high_prices[:, 0], high_prices[:, 1], high_prices[:, 2]
+    l0, l1, l2 = low_prices[:, 0], low_prices[:, 1], low_prices[:, 2]
+
+    bullish = enough & (h0 > h1) & (h1 < h2)
+    bearish = enough & ~bullish & (l0 < l1) & (l1 > l2)
+    strength = np.where(bullish, (h0 - h1) / h1, (l1 - l0) / l1)
+    return bullish, bearish, np.minimum(strength, 1.0)
+
+
+def _fair_value_gaps(bars: Dict[str, np.ndarray]):
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    current = np.asarray(bars['close'], dtype=float)[:, -1:]
+    rows, lookback = high.shape
+
+    cols = np.arange(2, min(lookback, 50))
+    if lookback < 10 or cols.size == 0:
+        none = np.zeros(rows, dtype=bool)
+        return none, none, np.zeros(rows)
+
+    bullish_gap = low[:, cols - 2] > high[:, cols]
+    bearish_gap = ~bullish_gap & (high[:, cols - 2] < low[:, cols])
+    upper = np.where(bullish_gap, low[:, cols - 2], low[:, cols])
+    lower = np.where(bullish_gap, high[:, cols], high[:, cols - 2])
+    filled = np.where(bullish_gap, current > low[:, cols - 2], current < high[:, cols - 2])
+    unfilled = (bullish_gap | bearish_gap) & ~filled
+
+    # Closest unfilled gap to the current price (first one on ties)
+    distance = np.minimum(np.abs(current - upper), np.abs(current - lower))
+    best = np.argmin(np.where(unfilled, distance, np.inf), axis=1)[:, None]
+    has_gap = unfilled.any(axis=1)
+    best_bullish = np.take_along_axis(bullish_gap, best, axis=1)[:, 0]
+    best_upper = np.take_along_axis(upper, best, axis=1)[:, 0]
+    best_lower = np.take_along_axis(lower, best, axis=1)[:, 0]
+
+    current = current[:, 0]
+    bullish = has_gap & best_bullish & (current < best_upper)
+    bearish = has_gap & ~best_bullish & (current > best_lower)
+    return bullish, bearish, np.ones(rows)
+
+
+def _level_prices(prices: np.ndarray, mask: np.ndarray):
+    """Clustered level prices and their rows, using the same log-price bins as SupportResistanceEngine"""
+    rows, cols = np.nonzero(mask)
+    if rows.size == 0:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+
+    swing_prices = prices[rows, cols]
+    bins = np.floor(np.log(swing_prices) / np.log1p(LEVEL_BIN_PCT)).astype(np.int64)
+    order = np.lexsort((bins, rows))
+    rows, bins, swing_prices = rows[order], bins[order], swing_prices[order]
+
+    starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (bins[1:] != bins[:-1])])
+    counts = np.diff(np.r_[starts, rows.size])
+    levels = np.add.reduceat(swing_prices, starts) / counts
+    return levels, rows[starts]
+
+
+def _support_resistance(bars: Dict[str, np.ndarray]):
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    current = np.asarray(bars['close'], dtype=float)[:, -1]
+    rows = high.shape[0]
+    is_high, is_low = swing_point_masks(high, low, LEVEL_WINDOW)
+
+    resistance = np.full(rows, np.inf)
+    levels, level_rows = _level_prices(high, is_high)
+    above = levels > current[level_rows]
+    np.minimum.at(resistance, level_rows[above], levels[above])
+
+    support = np.full(rows, -np.inf)
+    levels, level_rows = _level_prices(low, is_low)
+    below = levels < current[level_rows]
+    np.maximum.at(support, level_rows[below], levels[below])
+
+    with np.errstate(invalid='ignore'):
+        resistance_distance = np.where(np.isfinite(resistance), (resistance - current) / current * 100, np.inf)
+        support_distance = np.where(np.isfinite(support), (current - support) / current * 100, np.inf)
+
+    bullish = support_distance < 0.5
+    bearish = ~bullish & (resistance_distance < 0.5)
+    proximity = 1.0 / (np.minimum(resistance_distance, support_distance) + 0.1)
+    return bullish, bearish, np.minimum(proximity, 1.0)
+
+
+def _latest_events(events: np.ndarray, count: int = 10) -> np.ndarray:
+    """Mask of the last `count` events per row"""
+    from_end = np.cumsum(events[:, ::-1], axis=1)[:, ::-1]
+    return events & (from_end <= count)
+
+
+def _strongest(active: np.ndarray, strength: np.ndarray, is_bullish: np.ndarray):
+    """Direction and strength of the strongest active entry per row (first one on ties)"""
+    best = np.argmax(np.where(active, strength, -np.inf), axis=1)[:, None]
+    has_active = active.any(axis=1)
+    best_bullish = np.take_along_axis(is_bullish, best, axis=1)[:, 0]
+    best_strength = np.take_along_axis(strength, best, axis=1)[:, 0]
+    return has_active & best_bullish, has_active & ~best_bullish, best_strength
+
+
+def _supply_demand_zones(bars: Dict[str, np.ndarray]):
+    open_ = np.asarray(bars['open'], dtype=float)
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    close = np.asarray(bars['close'], dtype=float)
+    rows, lookback = close.shape
+    current = close[:, -1:]
+
+    cols = np.arange(10, lookback - 5)
+    if cols.size == 0:
+        none = np.zeros(rows, dtype=bool)
+        return none, none, np.zeros(rows)
+
+    body = (close[:, cols] - open_[:, cols]) / open_[:, cols]
+    demand = body > 0.01
+    supply = ~demand & ((open_[:, cols] - close[:, cols]) / open_[:, cols] > 0.01)
+    strength = np.where(demand, body, (open_[:, cols] - close[:, cols]) / open_[:, cols])
+    upper = kernels.rolling_max(high, 3)[:, cols]
+    lower = kernels.rolling_min(low, 3)[:, cols]
+
+    recent = _latest_events(demand | supply)
+    active = recent & (lower <= current) & (current <= upper)
+    bullish, bearish, _ = _strongest(active, strength, demand)
+    return bullish, bearish, np.ones(rows)
+
+
+def _order_blocks(bars: Dict[str, np.ndarray]):
+    open_ = np.asarray(bars['open'], dtype=float)
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    close = np.asarray(bars['close'], dtype=float)
+    rows, lookback = close.shape
+    current = close[:, -1:]
+
+    cols = np.arange(20, lookback - 5)
+    if cols.size == 0:
+        none = np.zeros(rows, dtype=bool)
+        return none, none, np.zeros(rows)
+
+    up_move = (close[:, cols] - open_[:, cols]) / open_[:, cols]
+    down_move = (open_[:, cols] - close[:, cols]) / open_[:, cols]
+    bullish_move = up_move > 0.015
+    bearish_move = ~bullish_move & (down_move > 0.015)
+
+    # Latest opposite candle among the 9 bars before the move
+    positions = np.arange(lookback)
+    last_down = np.maximum.accumulate(np.where(close < open_, positions, -1), axis=1)[:, cols - 1]
+    last_up = np.maximum.accumulate(np.where(close > open_, positions, -1), axis=1)[:, cols - 1]
+    block = np.where(bullish_move, last_down, last_up)
+    is_block = (bullish_move | bearish_move) & (block >= cols - 9)
+
+    block = np.maximum(block, 0)
+    upper = np.take_along_axis(high, block, axis=1)
+    lower = np.take_along_axis(low, block, axis=1)
+    strength = np.where(bullish_move, up_move, down_move)
+
+    recent = _latest_events(is_block)
+    distance = np.minimum(np.abs(current - upper), np.abs(current - lower))
+    active = recent & (distance / current < 0.01)
+    bullish, bearish, best_strength = _strongest(active, strength, bullish_move)
+    return bullish, bearish, np.minimum(best_strength, 1.0)
+
+
+def _ict_concepts(close: np.ndarray, swings):
+    high_prices, high_count, low_prices, low_count = swings
+    current = close[:, -1]
+    has_swings = (high_count > 0) & (low_count > 0)
+
+    above_high = has_swings & (current > high_prices[:, 0] * 1.001)
+    below_low = has_swings & ~above_high & (current < low_prices[:, 0] * 0.999)
+    bearish = above_high & (close[:, -1] < close[:, -2])
+    bullish = below_low & (close[:, -1] > close[:, -2])
+    return bullish, bearish, np.full(close.shape[0], 0.8)
+
+
+def _smart_money_concepts(swings):
+    high_prices, high_count, low_prices, low_count = swings
+    enough = (high_count >= 2) & (low_count >= 2)
+    bullish = enough & (high_prices[:, 0] > high_prices[:, 1])
+    bearish = enough & ~bullish & (low_prices[:, 0] < low_prices[:, 1])
+    return bullish, bearish, np.full(high_count.shape[0], 0.7)
+
+
+def _oscillators(close: np.ndarray) -> Dict[str, np.ndarray]:
+    close = np.asarray(close, dtype=float)
+    macd_line, macd_signal = kernels.macd(close)
+    return {'rsi': kernels.rsi(close, 14), 'macd': macd_line, 'macd_signal': macd_signal}
+
+
+def _smart_money_divergence(bars: Dict[str, np.ndarray], oscillators: Dict[str, np.ndarray]):
+    direction, strength, _ = divergence_signal(
+        bars['high'], bars['low'], {'rsi': oscillators['rsi'], 'macd': oscillators['macd']}
+    )
+    return direction > 0, direction < 0, strength
+
+
+def _qmlr(bars_1h: Dict[str, np.ndarray], bars_4h: Dict[str, np.ndarray], trend_strength: np.ndarray):
+    close = np.asarray(bars_1h['close'], dtype=float)
+    close_4h = np.asarray(bars_4h['close'], dtype=float)
+    volume = np.asarray(bars_1h['volume'], dtype=float)
+
+    strong_trend = trend_strength > 0.7
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_confirm = volume[:, -5:].mean(axis=1) / volume[:, -20:].mean(axis=1) > 1.2
+    mtf_align = (close[:, -1] > close[:, -20]) == (close_4h[:, -1] > close_4h[:, -10])
+
+    factors = strong_trend.astype(int) + volume_confirm + mtf_align
+    fires = factors >= 2
+    rising = close[:, -1] > close[:, -10]
+    return fires & rising, fires & ~rising, np.minimum(factors / 3.0, 1.0)
+
+
+def _traditional_confirmation(bars: Dict[str, np.ndarray], oscillators: Dict[str, np.ndarray]):
+    high = np.asarray(bars['high'], dtype=float)
+    low = np.asarray(bars['low'], dtype=float)
+    close = np.asarray(bars['close'], dtype=float)
+    current = close[:, -1]
+
+    def latest(values, default):
+        values = values[:, -1]
+        return np.where(np.isnan(values), default, values)
+
+    rsi = latest(oscillators['rsi'], 50.0)
+    macd_line = latest(oscillators['macd'], 0.0)
+    macd_signal = latest(oscillators['macd_signal'], 0.0)
+    ema_21 = latest(kernels.ema(close, 21), current)
+    ema_50 = latest(kernels.ema(close, 50), current)
+    stoch = latest(kernels.stoch_k(high, low, close, 14), 50.0)
+
+    up = (
+        (rsi < 30).astype(int) + (macd_line > macd_signal)
+        + ((current > ema_21) & (ema_21 > ema_50)) + (stoch < 20)
+    )
+    down = (
+        (rsi > 70).astype(int) + ~(macd_line > macd_signal)
+        + ((current < ema_21) & (ema_21 < ema_50)) + (stoch > 80)
+    )
+    total = up + down
+    return up > down, down > up, np.maximum(up, down) / total
@@ -0,0 +1,181 @@
+"""
+Indicator Cache
+Keeps the supporting indicator series per symbol/timeframe and extends them
+bar by bar instead of recomputing the whole frame on every poll
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .ohlcv import OHLCV, as_bars
+from .streaming_indicators import StreamingIndicatorSet, INDICATOR_NAMES
+
+logger = logging.getLogger(__name__)
+
+
+class _CacheEntry:
+    """Cached indicator history for one symbol/timeframe"""
+
+    def __init__(self, sma_window: int):
+        # Held from the key check until the new series are in place
+        self.lock = threading.Lock()
+        self.reset(sma_window)
+
+    def reset(self, sma_window: int):
+        # Values are kept in `values`, so the streaming indicators need no history of their own
+        self.state = StreamingIndicatorSet(sma_window=sma_window, history_size=1)
+        self.before_last = None      # State before the last bar, to redo a still-forming candle
+        self.index = []              # Bar timestamps
+        self.bars = []               # (high, low, close, volume) per bar
+        self.values = []             # Indicator tuples per bar
+        self.key = None
+        self.series = None
+
+    def append_bars(self, index, bars):
+        last = len(bars) - 1
+        for i, (ts, bar) in enumerate(zip(index, bars)):
+            if i == last:
+                self.before_last = copy.deepcopy(self.state)
+            self.values.append(self.state.update(*bar))
+            self.index.append(ts)
+            self.bars.append(bar)
+
+    def redo_last_bar(self):
+        """Drop the last bar so it can be re-appended with updated prices"""
+        self.state = self.before_last
+        self.before_last = None
+        self.index.pop()
+        self.bars.pop()
+        self.values.pop()
+
+    def trim(self, max_history: int):
+        excess = len(self.values) - max_history
+        if excess > 0:
+            del self.index[:excess]
+            del self.bars[:excess]
+            del self.values[:excess]
+
+
+class IndicatorCache:
+    """
+    Supporting-indicator cache keyed by (symbol, timeframe, frame fingerprint, window)
+
+    - Same key (every timestamp and price unchanged): the previously computed series
+      are returned as-is
+    - Same symbol/timeframe with new candles appended: only the new bars are pushed
+      through the cached StreamingIndicatorSet, provided the bars the frame shares
+      with the cached history are unchanged
+    - Otherwise (e.g. revised history): the frame is replayed from scratch
+
+    Each entry has its own lock, held from the key check until the new series
+    are stored, so concurrent requests for one symbol neither push bars twice
+    nor read series of another frame.
+    """
+
+    def __init__(self, max_entries: int = 128, max_history: int = 1000):
+        self.max_entries = max_entries
+        self.max_history = max_history
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'extensions': 0, 'rebuilds': 0}
+
+    def get_indicators(self, symbol: str, timeframe: str, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        """Return the supporting indicator series for `df` (DataFrame or OHLCV), reusing cached work where possible"""
+        df = as_bars(df)
+        n = len(df)
+        sma_window = min(200, n)
+        key = (symbol, timeframe, self._fingerprint(df), n)
+
+        with self._lock:
+            entry = self._entries.get((symbol, timeframe))
+            if entry is None:
+                entry = _CacheEntry(sma_window)
+                self._entries[(symbol, timeframe)] = entry
+            self._entries.move_to_end((symbol, timeframe))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        with entry.lock:
+            if entry.key == key:
+                self._count('hits')
+                return entry.series
+
+            bars = self._frame_bars(df)
+            try:
+                if not entry.values or entry.state.sma_window != sma_window or not self._extend(entry, df, bars):
+                    entry.reset(sma_window)
+                    entry.append_bars(df.index, bars)
+                    self._count('rebuilds')
+                else:
+                    self._count('extensions')
+            except Exception:
+                # Half-extended history must not be extended again
+                entry.reset(sma_window)
+                raise
+
+            entry.trim(max(self.max_history, n))
+            values = np.array(entry.values[-n:], dtype=float)
+            entry.series = {
+                name: pd.Series(values[:, col], index=df.index)
+                for col, name in enumerate(INDICATOR_NAMES)
+            }
+            # Set last, so the key never announces series that are not stored yet
+            entry.key = key
+            return entry.series
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _extend(self, entry: _CacheEntry, df: OHLCV, bars) -> bool:
+        """Append the bars of `df` that follow the cached history; False if the frames do not line up"""
+        cached_last = entry.index[-1]
+        pos = int(df.index.searchsorted(cached_last))
+        if pos >= len(df) or df.index[pos] != cached_last:
+            return False
+
+        # Cached history must cover every bar of the frame up to `pos`
+        start = len(entry.values) - (pos + 1)
+        if start < 0:
+            return False
+
+        # Bars before the cached last one are final: a revision means the history is stale
+        if entry.index[start:] != list(df.index[:pos + 1]) or entry.bars[start:-1] != bars[:pos]:
+            return False
+
+        if entry.bars[-1] != bars[pos]:
+            # The last cached candle was still forming when it was computed
+            if entry.before_last is None:
+                return False
+            entry.redo_last_bar()
+            pos -= 1
+
+        entry.append_bars(df.index[pos + 1:], bars[pos + 1:])
+        return True
+
+    @staticmethod
+    def _frame_bars(bars: OHLCV):
+        if bars.volume is not None:
+            volumes = bars.volume.tolist()
+        else:
+            volumes = [1000.0] * len(bars)
+        return list(zip(bars.high.tolist(), bars.low.tolist(), bars.close.tolist(), volumes))
+
+    @staticmethod
+    def _fingerprint(bars: OHLCV) -> int:
+        """Hash of every timestamp and input price of the frame"""
+        volume = bars.volume.tobytes() if bars.volume is not None else b''
+        return hash((bars.timestamps.tobytes(), bars.high.tobytes(), bars.low.tobytes(), bars.close.tobytes(), volume))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+indicator_cache = IndicatorCache()
@@ -0,0 +1,208 @@
+"""
+NumPy Indicator Kernels
+Vectorized implementations of the indicators used by AdvancedTechnicalAnalyzer.
+
+All kernels operate along the last axis, so a 2-D array of shape
+(symbols, bars) is processed in one pass. Outputs follow the `ta` library
+conventions (NaN warm-up for EMA/SMA/RSI/MACD/Stochastic, 0 warm-up for
+ATR/ADX); `ta` is only used as the reference in the parity tests.
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+
+def _linear_recurrence(u: np.ndarray, r: float, y0) -> np.ndarray:
+    """
+    Solve y[t] = r * y[t-1] + u[t] along the last axis, with y[-1] = y0.
+
+    The recursion is evaluated block-wise in closed form
+    (y[k] = r^(k+1) * y0 + r^k * cumsum(u[j] * r^-j)), with the block length
+    chosen so that r^-k stays small enough for float64 to remain exact.
+    """
+    u = np.asarray(u, dtype=float)
+    n = u.shape[-1]
+    out = np.empty_like(u)
+    if n == 0:
+        return out
+    if r == 0:
+        out[...] = u
+        return out
+
+    block = int(min(max(18.0 / -math.log(r), 1), 2048))
+    steps = np.arange(block)
+    powers = r ** steps
+    inverse_powers = r ** -steps.astype(float)
+
+    prev = np.asarray(y0, dtype=float)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        size = stop - start
+        p = powers[:size]
+        acc = np.cumsum(u[..., start:stop] * inverse_powers[:size], axis=-1)
+        out[..., start:stop] = p * (r * prev[..., None] + acc)
+        prev = out[..., stop - 1]
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    """ewm(alpha, adjust=False) seeded with the first value, without any warm-up mask"""
+    x = np.asarray(x, dtype=float)
+    out = np.empty_like(x)
+    if x.shape[-1] == 0:
+        return out
+    out[..., 0] = x[..., 0]
+    out[..., 1:] = _linear_recurrence(alpha * x[..., 1:], 1 - alpha, x[..., 0])
+    return out
+
+
+def _mask_warmup(values: np.ndarray, periods: int, fill=np.nan) -> np.ndarray:
+    values[..., :max(periods - 1, 0)] = fill
+    return values
+
+
+def ema(close: np.ndarray, window: int) -> np.ndarray:
+    """Exponential moving average (span=window, adjust=False), NaN for the first window-1 bars"""
+    return _mask_warmup(_ewm(close, 2.0 / (window + 1)), window)
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average, NaN for the first window-1 bars"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    n = values.shape[-1]
+    if window <= 0 or n < window:
+        return out
+    csum = np.cumsum(values, axis=-1)
+    out[..., window - 1] = csum[..., window - 1]
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    out[..., window - 1:] /= window
+    return out
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder RSI (ewm alpha=1/window); 100 when there were no losses"""
+    close = np.asarray(close, dtype=float)
+    change = np.zeros(close.shape)
+    change[..., 1:] = np.diff(close, axis=-1)
+    avg_gain = _ewm(np.where(change > 0, change, 0.0), 1.0 / window)
+    avg_loss = _ewm(np.where(change < 0, -change, 0.0), 1.0 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    return _mask_warmup(out, window)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD line and signal line; the signal EMA starts at the first valid MACD value"""
+    close = np.asarray(close, dtype=float)
+    line = _mask_warmup(_ewm(close, 2.0 / (fast + 1)) - _ewm(close, 2.0 / (slow + 1)), slow)
+    signal_line = np.full(close.shape, np.nan)
+    if close.shape[-1] >= slow:
+        signal_line[..., slow - 1:] = ema(line[..., slow - 1:], signal)
+    return line, signal_line
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling maximum over `window` bars, NaN for the first window-1 bars"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=-1).max(axis=-1)
+    return out
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling minimum over `window` bars, NaN for the first window-1 bars"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=-1).min(axis=-1)
+    return out
+
+
+def stoch_k(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Stochastic %K; NaN during warm-up and on a flat range"""
+    highest = rolling_max(high, window)
+    lowest = rolling_min(low, window)
+    price_range = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100 * (np.asarray(close, dtype=float) - lowest) / price_range
+    return np.where(price_range == 0, np.nan, out)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; the first bar has no previous close and uses high - low"""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    tr = high - low
+    prev_close = close[..., :-1]
+    tr[..., 1:] = np.maximum.reduce([
+        tr[..., 1:],
+        np.abs(high[..., 1:] - prev_close),
+        np.abs(low[..., 1:] - prev_close),
+    ])
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Average True Range: mean of the first `window` true ranges, then Wilder smoothing; 0 before"""
+    tr = true_range(high, low, close)
+    out = np.zeros(tr.shape)
+    if tr.shape[-1] < window:
+        return out
+    seed = tr[..., :window].mean(axis=-1)
+    out[..., window - 1] = seed
+    out[..., window:] = _linear_recurrence(tr[..., window:] / window, 1 - 1.0 / window, seed)
+    return out
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Average Directional Index
+
+    Wilder sums of TR, +DM and -DM start at bar 1; DX is available from bar
+    `window` and ADX from bar `2 * window - 1`. Earlier values are 0, as in `ta`.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    w = window
+    n = high.shape[-1]
+    out = np.zeros(high.shape)
+    if n < 2 * w:
+        return out
+
+    tr = true_range(high, low, close)
+    up_move = high[..., 1:] - high[..., :-1]
+    down_move = low[..., :-1] - low[..., 1:]
+    plus_dm = np.zeros(high.shape)
+    minus_dm = np.zeros(high.shape)
+    plus_dm[..., 1:] = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm[..., 1:] = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    r = 1 - 1.0 / w
+
+    def wilder_sum(values):
+        smoothed = np.empty(values[..., w:].shape)
+        seed = values[..., 1:w + 1].sum(axis=-1)
+        smoothed[..., 0] = seed
+        smoothed[..., 1:] = _linear_recurrence(values[..., w + 1:], r, seed)
+        return smoothed
+
+    # Bars w .. n-1
+    trs = wilder_sum(tr)
+    dip = wilder_sum(plus_dm)
+    din = wilder_sum(minus_dm)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus = np.where(trs != 0, 100 * dip / trs, 0.0)
+        di_minus = np.where(trs != 0, 100 * din / trs, 0.0)
+        di_sum = di_plus + di_minus
+        dx = np.where(di_sum != 0, 100 * np.abs(di_plus - di_minus) / di_sum, 0.0)
+
+    seed = dx[..., :w].mean(axis=-1)
+    out[..., 2 * w - 1] = seed
+    out[..., 2 * w:] = _linear_recurrence(dx[..., w:] / w, r, seed)
+    return out
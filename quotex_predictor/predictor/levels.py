@@ -0,0 +1,232 @@
+"""
+Support & Resistance Level Engine
+Clusters swing prices over long histories into weighted levels and answers
+nearest-level queries by bisection
+"""
+
+import bisect
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ohlcv import as_bars
+
+logger = logging.getLogger(__name__)
+
+# Bounds of the process-wide per-symbol engines: levels not touched within LEVEL_MAX_AGE of
+# the newest bar are dropped, and at most LEVEL_MAX_COUNT levels (the most touched) are kept per side
+LEVEL_MAX_AGE = pd.Timedelta(days=180)
+LEVEL_MAX_COUNT = 200
+
+
+def swing_point_masks(highs: np.ndarray, lows: np.ndarray, window: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized swing detection.
+
+    A bar is a swing high when its high is strictly greater than the highs of the
+    `window` bars on each side (swing low: strictly lower low). Bars without a
+    full window on both sides are never swings.
+    """
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    n = highs.shape[-1]
+    is_high = np.zeros(highs.shape, dtype=bool)
+    is_low = np.zeros(lows.shape, dtype=bool)
+
+    if n < 2 * window + 1:
+        return is_high, is_low
+
+    # Rolling max/min of the `window` bars ending at each position
+    high_windows = np.lib.stride_tricks.sliding_window_view(highs, window, axis=-1)
+    low_windows = np.lib.stride_tricks.sliding_window_view(lows, window, axis=-1)
+    rolling_max = high_windows.max(axis=-1)
+    rolling_min = low_windows.min(axis=-1)
+
+    centre = slice(window, n - window)
+    left_max = rolling_max[..., :n - 2 * window]       # bars i-window .. i-1
+    right_max = rolling_max[..., window + 1:]          # bars i+1 .. i+window
+    left_min = rolling_min[..., :n - 2 * window]
+    right_min = rolling_min[..., window + 1:]
+
+    is_high[..., centre] = (highs[..., centre] > left_max) & (highs[..., centre] > right_max)
+    is_low[..., centre] = (lows[..., centre] < left_min) & (lows[..., centre] < right_min)
+
+    return is_high, is_low
+
+
+class _LevelSide:
+    """Weighted price bins for one side (resistance or support) kept in sorted order"""
+
+    def __init__(self, bin_pct: float):
+        self._log_step = np.log1p(bin_pct)
+        self._bins: Dict[int, List[float]] = {}  # bin -> [weight, weighted price sum, last touch (ns)]
+        self.prices: List[float] = []
+        self.weights: List[float] = []
+
+    def add(self, prices: np.ndarray, weights: np.ndarray, times: np.ndarray):
+        """Add swing prices (touched at `times`, ns) to their bins and rebuild the sorted level arrays"""
+        if prices.size == 0:
+            return
+
+        bin_ids = np.floor(np.log(prices) / self._log_step).astype(np.int64)
+        unique_bins, inverse = np.unique(bin_ids, return_inverse=True)
+        weight_sums = np.bincount(inverse, weights=weights)
+        price_sums = np.bincount(inverse, weights=weights * prices)
+        last_touch = np.full(unique_bins.size, np.iinfo(np.int64).min)
+        np.maximum.at(last_touch, inverse, np.asarray(times, dtype=np.int64))
+
+        for bin_id, weight, price_sum, touched in zip(unique_bins.tolist(), weight_sums.tolist(),
+                                                      price_sums.tolist(), last_touch.tolist()):
+            acc = self._bins.get(bin_id)
+            if acc is None:
+                self._bins[bin_id] = [weight, price_sum, touched]
+            else:
+                acc[0] += weight
+                acc[1] += price_sum
+                acc[2] = max(acc[2], touched)
+
+        self._rebuild()
+
+    def prune(self, oldest: Optional[int] = None, max_levels: Optional[int] = None) -> int:
+        """Drop levels last touched before `oldest` (ns), then all but the `max_levels` most touched; returns the count dropped"""
+        before = len(self._bins)
+        if oldest is not None:
+            self._bins = {bin_id: acc for bin_id, acc in self._bins.items() if acc[2] >= oldest}
+        if max_levels is not None and len(self._bins) > max_levels:
+            # Most touches first, the most recently touched among equals
+            kept = sorted(self._bins.items(), key=lambda item: (item[1][0], item[1][2]), reverse=True)[:max_levels]
+            self._bins = dict(kept)
+        dropped = before - len(self._bins)
+        if dropped:
+            self._rebuild()
+        return dropped
+
+    def _rebuild(self):
+        # Bins are keyed by log-price, so sorting by bin id sorts by price
+        ordered = sorted(self._bins.items())
+        self.weights = [acc[0] for _, acc in ordered]
+        self.prices = [acc[1] / acc[0] for _, acc in ordered]
+
+    def nearest_above(self, price: float) -> Optional[int]:
+        pos = bisect.bisect_right(self.prices, price)
+        return pos if pos < len(self.prices) else None
+
+    def nearest_below(self, price: float) -> Optional[int]:
+        pos = bisect.bisect_left(self.prices, price) - 1
+        return pos if pos >= 0 else None
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class SupportResistanceEngine:
+    """
+    Histogram-clustered support/resistance levels
+
+    Swing highs are binned into resistance levels and swing lows into support
+    levels using log-price bins of width `bin_pct`. Each level is the weighted
+    mean of the swing prices in its bin and its weight is the number of touches.
+    Calling `update()` with a longer or newer frame only absorbs swings that were
+    confirmed since the previous call.
+
+    With `max_age`, levels not touched within that time of the newest bar are
+    dropped; with `max_levels`, only that many (the most touched) are kept per
+    side. Updates and queries hold the engine's lock, so concurrent requests for
+    one symbol neither absorb a swing twice nor read half-rebuilt levels.
+    """
+
+    def __init__(self, window: int = 3, bin_pct: float = 0.001, max_age: Optional[pd.Timedelta] = None,
+                 max_levels: Optional[int] = None):
+        self.window = window
+        self.bin_pct = bin_pct
+        self.max_age = max_age
+        self.max_levels = max_levels
+        self.resistance = _LevelSide(bin_pct)
+        self.support = _LevelSide(bin_pct)
+        self.last_bar_time = None  # Last bar whose swing status has been finalized
+        self.swings_absorbed = 0
+        self.levels_dropped = 0
+        self._lock = threading.Lock()
+
+    def update(self, df: pd.DataFrame):
+        """Absorb swings confirmed since the last update (`df` may also be OHLCV bars)"""
+        bars = as_bars(df)
+        n = len(bars)
+        if n < 2 * self.window + 1:
+            return
+
+        with self._lock:
+            # Only the tail after the last finalized bar needs scanning (plus the window on each side)
+            start = 0
+            if self.last_bar_time is not None:
+                processed = int(bars.index.searchsorted(self.last_bar_time, side='right'))
+                if processed >= n - self.window:
+                    return
+                start = max(processed - self.window, 0)
+
+            highs = bars.high[start:]
+            lows = bars.low[start:]
+            times = bars.timestamps[start:]
+            is_high, is_low = swing_point_masks(highs, lows, self.window)
+
+            # Positions before `processed` were already absorbed on a previous call
+            first_new = 0 if self.last_bar_time is None else self.window
+            is_high[:first_new] = False
+            is_low[:first_new] = False
+
+            high_prices = highs[is_high]
+            low_prices = lows[is_low]
+            self.resistance.add(high_prices, np.ones(high_prices.size), times[is_high])
+            self.support.add(low_prices, np.ones(low_prices.size), times[is_low])
+            self.swings_absorbed += int(high_prices.size + low_prices.size)
+
+            if self.max_age is not None or self.max_levels is not None:
+                oldest = int(bars.timestamps[-1]) - self.max_age.value if self.max_age is not None else None
+                self.levels_dropped += (self.resistance.prune(oldest, self.max_levels)
+                                        + self.support.prune(oldest, self.max_levels))
+
+            # Bars with a full right-hand window are final
+            self.last_bar_time = bars.index[n - self.window - 1]
+
+    def has_levels(self) -> bool:
+        with self._lock:
+            return bool(len(self.resistance) or len(self.support))
+
+    def nearest_levels(self, price: float) -> Dict[str, Any]:
+        """Nearest resistance above and support below `price`"""
+        with self._lock:
+            r_pos = self.resistance.nearest_above(price)
+            s_pos = self.support.nearest_below(price)
+            return {
+                'nearest_resistance': self.resistance.prices[r_pos] if r_pos is not None else None,
+                'resistance_weight': self.resistance.weights[r_pos] if r_pos is not None else 0,
+                'nearest_support': self.support.prices[s_pos] if s_pos is not None else None,
+                'support_weight': self.support.weights[s_pos] if s_pos is not None else 0,
+            }
+
+    def levels_around(self, price: float, count: int = 5) -> Tuple[List[float], List[float]]:
+        """Up to `count` resistance levels above and support levels below `price`, nearest first"""
+        with self._lock:
+            r_pos = bisect.bisect_right(self.resistance.prices, price)
+            s_pos = bisect.bisect_left(self.support.prices, price)
+            resistance = self.resistance.prices[r_pos:r_pos + count]
+            support = self.support.prices[max(s_pos - count, 0):s_pos][::-1]
+            return resistance, support
+
+
+_engines: Dict[Tuple[str, str], SupportResistanceEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_level_engine(symbol: str, timeframe: str = '1h', window: int = 3) -> SupportResistanceEngine:
+    """Process-wide level engine per symbol/timeframe so levels accumulate across calls (bounded by LEVEL_MAX_AGE/COUNT)"""
+    key = (symbol, timeframe)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = SupportResistanceEngine(window=window, max_age=LEVEL_MAX_AGE, max_levels=LEVEL_MAX_COUNT)
+            _engines[key] = engine
+        return engine
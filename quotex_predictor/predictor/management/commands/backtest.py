@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from predictor.backtesting import run_backtests, load_symbol_candles
+import json
+
+
+class Command(BaseCommand):
+    help = 'Walk-forward backtest of the technical analyzer over historical candles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='+', help='Symbols to backtest')
+        parser.add_argument('--data-dir', help='Directory with <SYMBOL>.csv candle files (default: stored PriceData)')
+        parser.add_argument('--timeframe', default='1m', help='Stored PriceData timeframe to replay')
+        parser.add_argument('--horizon', type=int, default=5, help='Minutes until each call is scored')
+        parser.add_argument('--step', type=int, default=None, help='Minutes between calls (default: horizon)')
+        parser.add_argument('--lookback', type=int, default=100, help='1h/4h candles passed to the analyzer')
+        parser.add_argument('--threshold', type=float, default=70.0,
+                            help='Confidence (percent) a call needs to count as a threshold signal')
+        parser.add_argument('--replay', action='store_true', help='Call analyze() per step instead of the feature matrix')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (0 = one per core)')
+        parser.add_argument('--output', help='Write the full report as JSON')
+
+    def handle(self, *args, **options):
+        candles = {}
+        for symbol in options['symbols']:
+            try:
+                candles[symbol] = load_symbol_candles(symbol, options['data_dir'], options['timeframe'])
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+
+            self.stdout.write(f"📊 {symbol}: {len(candles[symbol])} candles")
+
+        reports = run_backtests(
+            candles,
+            workers=options['workers'],
+            horizon_minutes=options['horizon'],
+            step_minutes=options['step'],
+            lookback=options['lookback'],
+            confidence_threshold=options['threshold'],
+            vectorized=not options['replay'],
+        )
+
+        for report in reports:
+            self.print_report(report)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(reports, f, indent=2, default=str)
+            self.stdout.write(f"💾 Report saved to {options['output']}")
+
+    def print_report(self, report):
+        symbol = report['symbol']
+        if 'error' in report:
+            self.stdout.write(self.style.ERROR(f"❌ {symbol}: {report['error']}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ {symbol}: {report['calls']} calls, {report['hit_rate']}% hit rate "
+            f"({report['bars']} bars in {report['elapsed_seconds']}s, {report['mode']})"
+        ))
+        for direction, row in report['by_direction'].items():
+            self.stdout.write(f"   {direction:<5} {row['calls']:>7} calls  {row['hit_rate']:>6.2f}%")
+        signals = report['threshold_signals']
+        self.stdout.write(
+            f"   Above {report['confidence_threshold']:g}%: {signals['calls']} calls, {signals['hit_rate']:.2f}%"
+        )
+
+        self.stdout.write("   Confidence   Calls    Hit %   Avg conf   Gap")
+        for row in report['calibration']:
+            self.stdout.write(
+                f"   {row['bucket']:<10} {row['calls']:>7} {row['hit_rate']:>8.2f} "
+                f"{row['avg_confidence']:>10.2f} {row['calibration_gap']:>6.2f}"
+            )
@@ -0,0 +1,103 @@
+from django.core.management.base import BaseCommand, CommandError
+from predictor.backtesting import load_symbol_candles
+from predictor.feature_matrix import COMPONENTS
+from predictor.weight_optimizer import (
+    OBJECTIVES, build_dataset, search, random_configs, grid_configs, write_profile
+)
+import time
+
+
+class Command(BaseCommand):
+    help = 'Search signal weights and confidence bonuses against realized outcomes and write a profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='+', help='Symbols whose history is used for the search')
+        parser.add_argument('--data-dir', help='Directory with <SYMBOL>.csv candle files (default: stored PriceData)')
+        parser.add_argument('--timeframe', default='1m', help='Stored PriceData timeframe to replay')
+        parser.add_argument('--horizon', type=int, default=5, help='Minutes until each call is scored')
+        parser.add_argument('--step', type=int, default=None, help='Minutes between calls (default: horizon)')
+        parser.add_argument('--lookback', type=int, default=100, help='1h/4h candles per analysis window')
+        parser.add_argument('--search', choices=['random', 'grid'], default='random')
+        parser.add_argument('--samples', type=int, default=2000, help='Random configurations to evaluate')
+        parser.add_argument('--spread', type=float, default=1.0, help='Random factors are drawn from [1 - spread, 1 + spread]')
+        parser.add_argument('--grid-components', default='htf_bias,bos,choch,fvg', help='Comma-separated components to grid over')
+        parser.add_argument('--grid-values', default='0,0.5,1,1.5,2', help='Comma-separated weight multipliers for the grid')
+        parser.add_argument('--objective', choices=OBJECTIVES, default='hit_rate')
+        parser.add_argument('--threshold', type=float, default=80.0, help='Confidence needed for a call to count as a signal')
+        parser.add_argument('--min-coverage', type=float, default=5.0, help='Minimum percent of calls that must be signals')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (0 = one per core)')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--top', type=int, default=5, help='Configurations to report')
+        parser.add_argument('--output', default='signal_profile.json', help='Profile file for the best configuration')
+        parser.add_argument('--profile-horizon', help="Store the result as this prediction horizon's weighting (e.g. 1m, 10m)")
+
+    def handle(self, *args, **options):
+        candles = {}
+        for symbol in options['symbols']:
+            try:
+                candles[symbol] = load_symbol_candles(symbol, options['data_dir'], options['timeframe'])
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"📊 {symbol}: {len(candles[symbol])} candles")
+
+        started = time.perf_counter()
+        dataset = build_dataset(
+            candles,
+            workers=options['workers'],
+            horizon_minutes=options['horizon'],
+            step_minutes=options['step'],
+            lookback=options['lookback'],
+        )
+        self.stdout.write(f"🧮 Feature matrix: {len(dataset['correct'])} calls in {time.perf_counter() - started:.1f}s")
+
+        if options['search'] == 'grid':
+            components = [name.strip() for name in options['grid_components'].split(',') if name.strip()]
+            unknown = [name for name in components if name not in COMPONENTS]
+            if unknown:
+                raise CommandError(f"Unknown components: {', '.join(unknown)}")
+            multipliers = [float(value) for value in options['grid_values'].split(',')]
+            weights, bonuses = grid_configs(components, multipliers, horizon=options['profile_horizon'])
+        else:
+            weights, bonuses = random_configs(options['samples'], options['seed'], options['spread'],
+                                              horizon=options['profile_horizon'])
+
+        started = time.perf_counter()
+        result = search(
+            dataset, weights, bonuses,
+            objective=options['objective'],
+            threshold=options['threshold'],
+            min_coverage=options['min_coverage'],
+            workers=options['workers'],
+            top=options['top'],
+            horizon=options['profile_horizon'],
+        )
+        elapsed = time.perf_counter() - started
+        rate = result['configs_evaluated'] / elapsed * 60 if elapsed > 0 else 0
+        self.stdout.write(f"🔍 {result['configs_evaluated']} configurations in {elapsed:.1f}s ({rate:.0f}/min)")
+
+        self.print_config('Current weights', result['baseline'])
+        for rank, config in enumerate(result['best'], 1):
+            self.print_config(f'#{rank}', config)
+
+        if not result['best']:
+            raise CommandError('No configuration met the coverage requirement')
+
+        write_profile(
+            options['output'], result,
+            {'symbols': options['symbols'], 'horizon_minutes': options['horizon']},
+            horizon=options['profile_horizon']
+        )
+        target = f" for the {options['profile_horizon']} horizon" if options['profile_horizon'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"💾 Best profile{target} saved to {options['output']} (set SIGNAL_PROFILE_PATH to use it)"
+        ))
+
+    def print_config(self, label, config):
+        self.stdout.write(
+            f"\n{label}: hit rate {config['hit_rate']:.2f}% on {config['signals']} signals "
+            f"({config['coverage']:.1f}% coverage), Brier {config['brier']:.4f}"
+        )
+        weights = ', '.join(f"{name}={value:.3f}" for name, value in config['weights'].items())
+        bonuses = ', '.join(f"{name}={value:.2f}" for name, value in config['bonuses'].items())
+        self.stdout.write(f"   weights: {weights}")
+        self.stdout.write(f"   bonuses: {bonuses}")
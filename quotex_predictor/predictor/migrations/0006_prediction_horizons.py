@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0005_chartupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accuracymetrics',
+            name='timeframe',
+            field=models.CharField(choices=[('5m', '5 Minutes'), ('1m', '1 Minute'), ('10m', '10 Minutes')], max_length=3),
+        ),
+        migrations.AlterField(
+            model_name='prediction',
+            name='timeframe',
+            field=models.CharField(choices=[('5m', '5 Minutes'), ('1m', '1 Minute'), ('10m', '10 Minutes')], max_length=3),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0006_prediction_horizons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceTick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('price', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('trading_pair', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='predictor.tradingpair')),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['trading_pair', 'timestamp'], name='predictor_p_trading_fd1210_idx')],
+            },
+        ),
+    ]
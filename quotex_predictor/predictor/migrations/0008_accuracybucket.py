@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0007_pricetick'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccuracyBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timeframe', models.CharField(choices=[('5m', '5 Minutes'), ('1m', '1 Minute'), ('10m', '10 Minutes')], max_length=3)),
+                ('hour', models.DateTimeField(help_text='Start of the hour (UTC) the predictions were made in')),
+                ('total_predictions', models.IntegerField(default=0)),
+                ('correct_predictions', models.IntegerField(default=0)),
+                ('trading_pair', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='predictor.tradingpair')),
+            ],
+            options={
+                'ordering': ['-hour'],
+                'indexes': [models.Index(fields=['hour'], name='predictor_a_hour_855622_idx')],
+                'unique_together': {('trading_pair', 'timeframe', 'hour')},
+            },
+        ),
+    ]
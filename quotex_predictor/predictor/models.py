@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from datetime import timedelta, timezone as dt_timezone
 import os
 
 
@@ -66,6 +67,20 @@ class PriceData(models.Model):
         return f"{self.trading_pair.symbol} - {self.timestamp} - {self.close_price}"
 
 
+class PriceTick(models.Model):
+    """Price observed for a trading pair at a moment, for point-in-time lookups"""
+    trading_pair = models.ForeignKey(TradingPair, on_delete=models.CASCADE)
+    timestamp = models.DateTimeField()
+    price = models.DecimalField(max_digits=20, decimal_places=8)
+
+    class Meta:
+        indexes = [models.Index(fields=['trading_pair', 'timestamp'])]
+        ordering = ['-timestamp']
+
+    def __str__(self):
+        return f"{self.trading_pair.symbol} - {self.timestamp} - {self.price}"
+
+
 class Prediction(models.Model):
     DIRECTION_CHOICES = [
         ('UP', 'Up'),
@@ -75,13 +90,14 @@ class Prediction(models.Model):
     TIMEFRAME_CHOICES = [
         ('5m', '5 Minutes'),  # Primary prediction timeframe
         ('1m', '1 Minute'),   # Legacy support
+        ('10m', '10 Minutes'),
     ]
 
     trading_pair = models.ForeignKey(TradingPair, on_delete=models.CASCADE)
     prediction_time = models.DateTimeField(default=timezone.now)
     direction = models.CharField(max_length=4, choices=DIRECTION_CHOICES)
     confidence = models.DecimalField(max_digits=5, decimal_places=2)
-    timeframe = models.CharField(max_length=2, choices=TIMEFRAME_CHOICES)
+    timeframe = models.CharField(max_length=3, choices=TIMEFRAME_CHOICES)
     current_price = models.DecimalField(max_digits=20, decimal_places=8)
     target_price = models.DecimalField(max_digits=20, decimal_places=8, null=True, blank=True)
     actual_price = models.DecimalField(max_digits=20, decimal_places=8, null=True, blank=True)
@@ -99,7 +115,7 @@ class Prediction(models.Model):
 
 class AccuracyMetrics(models.Model):
     trading_pair = models.ForeignKey(TradingPair, on_delete=models.CASCADE)
-    timeframe = models.CharField(max_length=2, choices=Prediction.TIMEFRAME_CHOICES)
+    timeframe = models.CharField(max_length=3, choices=Prediction.TIMEFRAME_CHOICES)
     total_predictions = models.IntegerField(default=0)
     correct_predictions = models.IntegerField(default=0)
     accuracy_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
@@ -109,4 +125,44 @@ class AccuracyMetrics(models.Model):
         unique_together = ['trading_pair', 'timeframe']
 
     def __str__(self):
-        return f"{self.trading_pair.symbol} - {self.timeframe} - {self.accuracy_percentage}%"
\ No newline at end of file
+        return f"{self.trading_pair.symbol} - {self.timeframe} - {self.accuracy_percentage}%"
+
+
+class AccuracyBucket(models.Model):
+    """Resolved and correct predictions of a trading pair and timeframe made within one hour"""
+    # Rolling windows /api/accuracy/ answers from buckets
+    WINDOWS = {
+        '1h': timedelta(hours=1),
+        '24h': timedelta(hours=24),
+        '7d': timedelta(days=7),
+    }
+
+    trading_pair = models.ForeignKey(TradingPair, on_delete=models.CASCADE)
+    timeframe = models.CharField(max_length=3, choices=Prediction.TIMEFRAME_CHOICES)
+    hour = models.DateTimeField(help_text="Start of the hour (UTC) the predictions were made in")
+    total_predictions = models.IntegerField(default=0)
+    correct_predictions = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['trading_pair', 'timeframe', 'hour']
+        indexes = [models.Index(fields=['hour'])]
+        ordering = ['-hour']
+
+    def __str__(self):
+        return f"{self.trading_pair.symbol} - {self.timeframe} - {self.hour} - {self.correct_predictions}/{self.total_predictions}"
+
+    @staticmethod
+    def hour_of(moment):
+        """Bucket start for a timestamp"""
+        return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def window_start(cls, window, now=None):
+        """
+        First bucket of a rolling window: the one containing `now` - window
+
+        Buckets are whole hours, so the buckets from it on cover between the
+        window and the window plus one hour; a bucket partly inside the window
+        counts in full.
+        """
+        return cls.hour_of((now or timezone.now()) - cls.WINDOWS[window])
@@ -0,0 +1,114 @@
+"""
+OHLCV Bars
+Compact candle container backed by contiguous NumPy arrays, so analysis
+internals index plain arrays instead of going through pandas per access
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+
+class OHLCV:
+    """
+    Candles as one contiguous array per field plus int64 timestamps (ns since epoch)
+
+    `volume` is None when the source had no volume column. The container answers
+    the small part of the DataFrame interface the analysis helpers rely on
+    (`len`, `empty`, `columns`, `index`, `bars['close']`), so the level engine,
+    indicator cache and analysis memo accept it unchanged.
+    """
+
+    __slots__ = ('open', 'high', 'low', 'close', 'volume', 'timestamps', 'tz', '_index')
+
+    def __init__(self, open, high, low, close, timestamps, volume=None, dtype=np.float64, tz=None):
+        self.open = np.ascontiguousarray(open, dtype=dtype)
+        self.high = np.ascontiguousarray(high, dtype=dtype)
+        self.low = np.ascontiguousarray(low, dtype=dtype)
+        self.close = np.ascontiguousarray(close, dtype=dtype)
+        self.volume = None if volume is None else np.ascontiguousarray(volume, dtype=dtype)
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.tz = tz
+        self._index = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype=np.float64) -> 'OHLCV':
+        """Adapter from a DatetimeIndex-ed frame with open/high/low/close (and optionally volume) columns"""
+        if isinstance(df, cls):
+            return df
+        index = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(df.index)
+        index = index.as_unit('ns')
+
+        # One 2-D conversion instead of a Series per column
+        names = [name for name in PRICE_FIELDS + ('volume',) if name in df.columns]
+        frame = df if len(names) == len(df.columns) else df[names]
+        values = frame.to_numpy(dtype=dtype)
+        column = {name: values[:, frame.columns.get_loc(name)] for name in names}
+        bars = cls(
+            column['open'], column['high'], column['low'], column['close'],
+            index.asi8, column.get('volume'), dtype, index.tz
+        )
+        bars._index = df.index if isinstance(df.index, pd.DatetimeIndex) else None
+        return bars
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = {name: getattr(self, name) for name in self.columns}
+        return pd.DataFrame(columns, index=self.index)
+
+    @property
+    def columns(self):
+        return PRICE_FIELDS + (('volume',) if self.volume is not None else ())
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Timestamps as a DatetimeIndex, built on first use"""
+        if self._index is None:
+            index = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'))
+            self._index = index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+        return self._index
+
+    @property
+    def empty(self) -> bool:
+        return len(self.close) == 0
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __getitem__(self, key):
+        """Field array by name (`bars['close']`), or a view of the bars for a slice"""
+        if isinstance(key, slice):
+            return OHLCV._view(self, key)
+        if key in self.columns:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def tail(self, n: int) -> 'OHLCV':
+        return self[max(len(self) - n, 0):]
+
+    def copy(self) -> 'OHLCV':
+        volume = None if self.volume is None else self.volume.copy()
+        return OHLCV(self.open.copy(), self.high.copy(), self.low.copy(), self.close.copy(),
+                     self.timestamps.copy(), volume, self.close.dtype, self.tz)
+
+    @staticmethod
+    def _view(bars: 'OHLCV', key: slice) -> 'OHLCV':
+        view = OHLCV.__new__(OHLCV)
+        for name in ('open', 'high', 'low', 'close', 'timestamps'):
+            setattr(view, name, getattr(bars, name)[key])
+        view.volume = None if bars.volume is None else bars.volume[key]
+        view.tz = bars.tz
+        view._index = None
+        return view
+
+
+def as_bars(data, dtype=np.float64) -> Optional[OHLCV]:
+    """OHLCV for a DataFrame (or an OHLCV, returned as is); None stays None"""
+    if data is None:
+        return None
+    return OHLCV.from_frame(data, dtype)
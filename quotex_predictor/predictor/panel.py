@@ -0,0 +1,126 @@
+"""
+Panel Analysis
+Analyzes many symbols in one vectorized pass: every symbol's frame becomes one
+row of 2-D OHLCV arrays, the feature matrix computes indicators, swing masks
+and candle features for all rows at once, and each row is then scored by
+AdvancedTechnicalAnalyzer's own blend.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .feature_matrix import FeatureMatrix, COMPONENTS, build_features
+from .ohlcv import OHLCV, as_bars
+from .technical_analysis import AdvancedTechnicalAnalyzer
+
+logger = logging.getLogger(__name__)
+
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def panel_stack(frames: List[OHLCV]) -> Dict[str, np.ndarray]:
+    """(symbols, bars) float64 array per field for equally long frames; missing volume is 1000 like analyze()"""
+    def field(bars, name):
+        values = getattr(bars, name)
+        return np.full(len(bars), 1000.0) if values is None else values
+
+    return {name: np.stack([field(bars, name) for bars in frames]).astype(float) for name in PANEL_FIELDS}
+
+
+def analyze_panel(frames_1h: Dict[str, Any], frames_4h: Optional[Dict[str, Any]] = None,
+                  analyzer: AdvancedTechnicalAnalyzer = None, lookback: Optional[int] = None,
+                  horizons: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Direction and confidence per symbol, as the stateless analyze() would return them
+
+    `frames_1h` / `frames_4h` map symbol to a DataFrame or OHLCV bars; a symbol
+    without a 4H frame uses its 1H frame, like analyze(). With `lookback` only the
+    latest `lookback` bars of each frame are used. Symbols whose frames have the
+    same lengths share one vectorized pass (normally the whole universe).
+
+    Results carry direction, confidence, meets_threshold, current_price,
+    signal_breakdown, horizons and confluence_factors; the per-component detail
+    of analyze(debug=True) is not produced.
+    """
+    analyzer = analyzer or AdvancedTechnicalAnalyzer()
+    frames_4h = frames_4h or {}
+    horizons = list(horizons or analyzer.prediction_horizons)
+
+    groups = defaultdict(list)
+    results = {}
+    for symbol, frame in frames_1h.items():
+        try:
+            bars_1h = as_bars(frame)
+            bars_4h = as_bars(frames_4h.get(symbol))
+            if bars_4h is None or bars_4h.empty:
+                bars_4h = bars_1h
+            if lookback:
+                bars_1h, bars_4h = bars_1h.tail(lookback), bars_4h.tail(lookback)
+        except Exception as e:
+            logger.error(f"Panel frame error for {symbol}: {e}")
+            results[symbol] = analyzer._get_default_analysis()
+            continue
+
+        if len(bars_1h) < 50:
+            results[symbol] = analyzer._get_default_analysis()
+            continue
+        groups[(len(bars_1h), len(bars_4h))].append((symbol, bars_1h, bars_4h))
+
+    for members in groups.values():
+        try:
+            features = build_features(
+                panel_stack([bars_1h for _, bars_1h, _ in members]),
+                panel_stack([bars_4h for _, _, bars_4h in members]),
+                analyzer.component_lookbacks
+            )
+        except Exception as e:
+            logger.error(f"Panel analysis error: {e}")
+            for symbol, _, _ in members:
+                results[symbol] = analyzer._get_default_analysis()
+            continue
+
+        for row, (symbol, bars_1h, _) in enumerate(members):
+            results[symbol] = _score_row(analyzer, features, row, float(bars_1h.close[-1]),
+                                         float(bars_1h.close[-5]), horizons)
+
+    return {symbol: results[symbol] for symbol in frames_1h}
+
+
+def _score_row(analyzer: AdvancedTechnicalAnalyzer, features: FeatureMatrix, row: int,
+               current_price: float, reference_close: float, horizons: List[str]) -> Dict[str, Any]:
+    """Blend one row of the feature matrix with the analyzer's weights, bonuses and horizons"""
+    directions = features.direction[row]
+    votes = {
+        name: ('UP' if directions[col] > 0 else 'DOWN', float(features.strength[row, col]))
+        for col, name in enumerate(COMPONENTS)
+        if directions[col] != 0
+    }
+    fallback_direction = 'UP' if features.fallback[row] > 0 else 'DOWN'
+    fallback = {'reference_close': reference_close, 'direction': fallback_direction}
+
+    blend = analyzer._horizon_profile(analyzer.prediction_timeframe)
+    components = analyzer._weigh(votes, blend['weights'])
+    direction, confidence = analyzer._blend_signals(components, fallback_direction, blend['bonuses'])
+
+    def fired(name):
+        return directions[features.column(name)] != 0
+
+    return {
+        'direction': direction,
+        'confidence': round(confidence, 1),
+        'meets_threshold': confidence >= analyzer.min_confidence_threshold,
+        'current_price': current_price,
+        'prediction_timeframe': analyzer.prediction_timeframe,
+        'analysis_timeframes': analyzer.analysis_timeframes,
+        'signal_breakdown': analyzer._signal_breakdown(votes, components, fallback),
+        'horizons': analyzer._blend_horizons(votes, fallback_direction, horizons),
+        'confluence_factors': {
+            'htf_ltf_alignment': bool(directions[features.column('htf_bias')] == directions[features.column('ltf_structure')]),
+            'structure_signals': bool(fired('bos') or fired('choch')),
+            'liquidity_signals': bool(fired('fvg')),
+            'level_proximity': bool(fired('support_resistance')),
+        }
+    }
@@ -0,0 +1,176 @@
+"""
+Point-in-time Price Index
+Observed prices per symbol as sorted timestamp/price arrays, so "what was the
+price at (or just before) T?" is a binary search instead of a network call.
+Observations are also stored as PriceTick rows, so a resolver in another
+process loads the range it needs with one indexed query per symbol.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A price observed longer than this before T does not describe T
+MAX_TICK_AGE = timedelta(minutes=2)
+
+
+def to_ns(timestamps) -> np.ndarray:
+    """int64 ns since epoch (UTC) of a timestamp or a sequence of them; naive values are taken as UTC"""
+    index = pd.DatetimeIndex(pd.to_datetime(np.atleast_1d(np.asarray(timestamps, dtype=object)), utc=True))
+    return index.as_unit('ns').asi8
+
+
+def prices_at(times: np.ndarray, prices: np.ndarray, targets: np.ndarray, max_age_ns: Optional[int] = None) -> np.ndarray:
+    """
+    Price at or just before each target time (NaN when there is none)
+
+    `times` (ns, sorted ascending) and `prices` are the observations; with
+    `max_age_ns`, observations older than that before a target do not count.
+    """
+    targets = np.asarray(targets, dtype=np.int64)
+    result = np.full(targets.shape, np.nan)
+    if not len(times):
+        return result
+    positions = np.searchsorted(times, targets, side='right') - 1
+    found = positions >= 0
+    if max_age_ns is not None:
+        found &= targets - times[np.maximum(positions, 0)] <= max_age_ns
+    result[found] = prices[positions[found]]
+    return result
+
+
+class PriceSeries:
+    """Observations of one symbol, sorted by time; later observations at the same time win"""
+
+    __slots__ = ('times', 'prices', 'max_points', '_pending')
+
+    def __init__(self, max_points: int = 100_000):
+        self.times = np.empty(0, dtype=np.int64)
+        self.prices = np.empty(0)
+        self.max_points = max_points
+        self._pending = []
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self.times)
+
+    def extend(self, times: np.ndarray, prices: np.ndarray):
+        # Merged on the next lookup, so single ticks are not one concatenation each
+        self._pending.append((np.asarray(times, dtype=np.int64), np.asarray(prices, dtype=float)))
+
+    def _merge(self):
+        if not self._pending:
+            return
+        times = np.concatenate([self.times] + [times for times, _ in self._pending])
+        prices = np.concatenate([self.prices] + [prices for _, prices in self._pending])
+        self._pending = []
+
+        if np.any(np.diff(times) <= 0):
+            # Stable sort keeps arrival order among equal times; the last of each run is kept
+            order = np.argsort(times, kind='stable')
+            times, prices = times[order], prices[order]
+            keep = np.r_[times[1:] != times[:-1], True]
+            times, prices = times[keep], prices[keep]
+        self.times, self.prices = times[-self.max_points:], prices[-self.max_points:]
+
+    def at(self, targets: np.ndarray, max_age_ns: Optional[int] = None) -> np.ndarray:
+        self._merge()
+        return prices_at(self.times, self.prices, targets, max_age_ns)
+
+
+class PriceIndex:
+    """
+    Per-symbol PriceSeries, persisted as PriceTick rows
+
+    record() keeps an observation in memory and stores it; load() reads the
+    stored observations of a time range, e.g. those other processes recorded.
+    """
+
+    def __init__(self, max_points: int = 100_000):
+        self.max_points = max_points
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _get(self, symbol: str) -> PriceSeries:
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = PriceSeries(self.max_points)
+        return series
+
+    def record(self, symbol: str, timestamp, price: float, persist: bool = True):
+        """One observation of `symbol`"""
+        self.record_many(symbol, [timestamp], [price], persist)
+
+    def record_many(self, symbol: str, timestamps, prices, persist: bool = True):
+        try:
+            times = to_ns(timestamps)
+            prices = np.asarray(prices, dtype=float)
+            with self._lock:
+                self._get(symbol).extend(times, prices)
+            if persist:
+                self._persist(symbol, times, prices)
+        except Exception as e:
+            logger.error(f"Price index record error for {symbol}: {e}")
+
+    def _persist(self, symbol: str, times: np.ndarray, prices: np.ndarray):
+        from decimal import Decimal
+        from .models import PriceTick, TradingPair
+
+        trading_pair = TradingPair.objects.filter(symbol=symbol).first()
+        if trading_pair is None:
+            return
+        stamps = pd.DatetimeIndex(times.view('datetime64[ns]')).tz_localize('UTC')
+        PriceTick.objects.bulk_create([
+            PriceTick(trading_pair=trading_pair, timestamp=stamp.to_pydatetime(), price=Decimal(str(price)))
+            for stamp, price in zip(stamps, prices.tolist())
+        ])
+
+    def load(self, symbol: str, start, end) -> int:
+        """Read the stored observations of `symbol` between `start` and `end` into memory; returns the row count"""
+        from .models import PriceTick
+
+        try:
+            rows = list(PriceTick.objects.filter(
+                trading_pair__symbol=symbol, timestamp__gte=start, timestamp__lte=end
+            ).order_by('timestamp', 'pk').values_list('timestamp', 'price'))
+            if rows:
+                stamps, prices = zip(*rows)
+                with self._lock:
+                    self._get(symbol).extend(to_ns(stamps), np.array(prices, dtype=float))
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Price index load error for {symbol}: {e}")
+            return 0
+
+    def prices_at(self, symbol: str, timestamps, max_age: Optional[timedelta] = MAX_TICK_AGE) -> np.ndarray:
+        """Price of `symbol` at or just before each timestamp, NaN where the index cannot tell"""
+        targets = to_ns(timestamps)
+        max_age_ns = int(max_age.total_seconds() * 1e9) if max_age is not None else None
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is None:
+                return np.full(targets.shape, np.nan)
+            return series.at(targets, max_age_ns)
+
+    def price_at(self, symbol: str, timestamp, max_age: Optional[timedelta] = MAX_TICK_AGE) -> Optional[float]:
+        price = self.prices_at(symbol, [timestamp], max_age)[0]
+        return None if np.isnan(price) else float(price)
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._series)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Observations held in memory per symbol"""
+        with self._lock:
+            return {symbol: len(series) for symbol, series in self._series.items()}
+
+
+# Global price index instance
+price_index = PriceIndex()
@@ -0,0 +1,127 @@
+"""
+Analysis Profiling
+Per-stage timing of the analysis pipeline, aggregated into process-wide histograms
+"""
+
+import contextlib
+import logging
+import threading
+import time
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds: 0.01 ms doubling up to ~10 s
+BUCKET_BOUNDS_MS = tuple(0.01 * 2 ** k for k in range(21))
+
+
+def profiling_enabled() -> bool:
+    """settings.ANALYSIS_PROFILING, False outside a configured Django process"""
+    try:
+        from django.conf import settings
+        return bool(getattr(settings, 'ANALYSIS_PROFILING', False))
+    except Exception:
+        return False
+
+
+class StageTimer:
+    """Accumulated wall time and call count per named stage of one analysis"""
+
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            seconds, calls = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (seconds + elapsed, calls + 1)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Milliseconds and calls per stage, slowest first"""
+        ordered = sorted(self.stages.items(), key=lambda item: -item[1][0])
+        return {name: {'ms': round(seconds * 1000, 3), 'calls': calls} for name, (seconds, calls) in ordered}
+
+
+class _NullTimer:
+    """Stand-in when profiling is off; every stage is the same no-op context"""
+
+    enabled = False
+    stages = {}
+    _stage = contextlib.nullcontext()
+
+    def stage(self, name: str):
+        return self._stage
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {}
+
+
+NULL_TIMER = _NullTimer()
+
+
+class StageHistograms:
+    """
+    Process-wide latency histograms per stage
+
+    Each analysis contributes its per-stage totals to log-spaced buckets, so
+    percentiles are bucket upper bounds (within a factor of two).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, stages: Dict[str, tuple]):
+        with self._lock:
+            for name, (seconds, _) in stages.items():
+                ms = seconds * 1000
+                entry = self._stages.get(name)
+                if entry is None:
+                    entry = {'counts': [0] * (len(BUCKET_BOUNDS_MS) + 1), 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+                    self._stages[name] = entry
+                bucket = next((i for i, bound in enumerate(BUCKET_BOUNDS_MS) if ms <= bound), len(BUCKET_BOUNDS_MS))
+                entry['counts'][bucket] += 1
+                entry['count'] += 1
+                entry['total_ms'] += ms
+                entry['max_ms'] = max(entry['max_ms'], ms)
+
+    def _percentile(self, entry: Dict[str, Any], q: float) -> float:
+        target = q * entry['count']
+        cumulative = 0
+        for i, count in enumerate(entry['counts']):
+            cumulative += count
+            if cumulative >= target:
+                return min(BUCKET_BOUNDS_MS[i], entry['max_ms']) if i < len(BUCKET_BOUNDS_MS) else entry['max_ms']
+        return entry['max_ms']
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean, p50/p90/p99 and max (ms) per stage, by total time spent"""
+        with self._lock:
+            stages = {name: dict(entry, counts=list(entry['counts'])) for name, entry in self._stages.items()}
+
+        ordered = sorted(stages.items(), key=lambda item: -item[1]['total_ms'])
+        return {
+            name: {
+                'count': entry['count'],
+                'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+                'p50_ms': round(self._percentile(entry, 0.50), 3),
+                'p90_ms': round(self._percentile(entry, 0.90), 3),
+                'p99_ms': round(self._percentile(entry, 0.99), 3),
+                'max_ms': round(entry['max_ms'], 3),
+                'total_ms': round(entry['total_ms'], 1),
+            }
+            for name, entry in ordered
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+stage_histograms = StageHistograms()
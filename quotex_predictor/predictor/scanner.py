@@ -0,0 +1,185 @@
+"""
+Market Scanner
+Latest direction and confidence of every active pair, ranked in a heap, so
+"which pairs have a qualifying setup right now?" is one read instead of one
+analysis per symbol. Only symbols whose candles changed are fetched and
+rescored, all of them in one panel pass.
+"""
+
+import heapq
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from .analysis_cache import candle_key, current_key
+from .ohlcv import as_bars
+from .panel import analyze_panel
+from .technical_analysis import AdvancedTechnicalAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+class MarketScanner:
+    """
+    Per-symbol scores with a top-k ranking
+
+    Scores are keyed like analysis_cache, by the last closed candle of each
+    timeframe: a symbol is fetched at most once per candle close and rescored
+    only when its fetched candles differ from the scored ones. The ranking is a
+    max-heap on confidence with lazy deletion; replaced scores stay in the heap
+    until they surface and are dropped.
+    """
+
+    def __init__(self, analyzer: AdvancedTechnicalAnalyzer = None, horizons: List[str] = None):
+        self.analyzer = analyzer or AdvancedTechnicalAnalyzer()
+        self.timeframes = list(self.analyzer.analysis_timeframes)
+        self.horizons = list(horizons or self.analyzer.prediction_horizons)
+        self._entries = {}
+        self._checked = {}
+        self._versions = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.stats = {'fetched': 0, 'rescored': 0, 'unchanged': 0}
+
+    def stale_symbols(self, symbols: List[str], now=None) -> List[str]:
+        """Symbols with a candle close since they were last fetched"""
+        with self._lock:
+            return [symbol for symbol in symbols
+                    if self._checked.get(symbol) != current_key(symbol, self.timeframes, now)]
+
+    def refresh(self, symbols: List[str], data_manager=None, limit: int = 100, now=None) -> List[str]:
+        """
+        Bring the scores of `symbols` up to date and drop every other symbol
+
+        Stale symbols are fetched through `data_manager` (a DataSourceManager,
+        created on demand); returns the symbols that were rescored.
+        """
+        with self._refresh_lock:
+            self.retain(symbols)
+            stale = self.stale_symbols(symbols, now)
+            if not stale:
+                return []
+
+            if data_manager is None:
+                from .data_sources import DataSourceManager
+                data_manager = DataSourceManager()
+
+            frames_1h, frames_4h = {}, {}
+            for symbol in stale:
+                try:
+                    data = data_manager.get_multi_timeframe_data(symbol, self.timeframes, limit)
+                except Exception as e:
+                    logger.error(f"Scanner fetch error for {symbol}: {e}")
+                    data = None
+                self.stats['fetched'] += 1
+                # Checked even without data, so a failing source is retried at the next close, not per read
+                with self._lock:
+                    self._checked[symbol] = current_key(symbol, self.timeframes, now)
+                if data and '1h' in data:
+                    frames_1h[symbol] = data['1h']
+                    if data.get('4h') is not None:
+                        frames_4h[symbol] = data['4h']
+                else:
+                    logger.warning(f"Scanner has no price data for {symbol}")
+
+            return self.update(frames_1h, frames_4h)
+
+    def update(self, frames_1h: Dict[str, Any], frames_4h: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Rescore the symbols whose candles differ from their stored score; returns them"""
+        frames_4h = frames_4h or {}
+        changed_1h, changed_4h, keys = {}, {}, {}
+        for symbol, frame in frames_1h.items():
+            try:
+                bars_1h, bars_4h = as_bars(frame), as_bars(frames_4h.get(symbol))
+                key = candle_key(symbol, {'1h': bars_1h, '4h': bars_4h})
+            except Exception as e:
+                logger.error(f"Scanner frame error for {symbol}: {e}")
+                continue
+            with self._lock:
+                entry = self._entries.get(symbol)
+            if entry is not None and entry['key'] == key:
+                self.stats['unchanged'] += 1
+                continue
+            changed_1h[symbol], keys[symbol] = bars_1h, key
+            if bars_4h is not None:
+                changed_4h[symbol] = bars_4h
+
+        if not changed_1h:
+            return []
+
+        results = analyze_panel(changed_1h, changed_4h, self.analyzer, horizons=self.horizons)
+        with self._lock:
+            for symbol, result in results.items():
+                self._store(symbol, keys[symbol], changed_1h[symbol], result)
+            self._compact()
+        self.stats['rescored'] += len(results)
+        return list(results)
+
+    def _store(self, symbol: str, key, bars, result: Dict[str, Any]):
+        version = self._versions.get(symbol, 0) + 1
+        self._versions[symbol] = version
+        self._entries[symbol] = {
+            'key': key,
+            'symbol': symbol,
+            'direction': result['direction'],
+            'confidence': result['confidence'],
+            'meets_threshold': result['meets_threshold'],
+            'current_price': result['current_price'],
+            'horizons': result.get('horizons', {}),
+            'confluence_factors': result.get('confluence_factors', {}),
+            'candle_time': pd.Timestamp(bars.index[-1]).isoformat() if len(bars) else None,
+        }
+        heapq.heappush(self._heap, (-result['confidence'], symbol, version))
+
+    def retain(self, symbols: List[str]):
+        """Forget every symbol not in `symbols` (e.g. pairs that were deactivated)"""
+        keep = set(symbols)
+        with self._lock:
+            for symbol in [symbol for symbol in self._entries if symbol not in keep]:
+                del self._entries[symbol]
+                self._versions[symbol] += 1
+            for symbol in [symbol for symbol in self._checked if symbol not in keep]:
+                del self._checked[symbol]
+            self._compact()
+
+    def _compact(self):
+        """Rebuild the heap once replaced scores outnumber live ones"""
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [(-entry['confidence'], symbol, self._versions[symbol])
+                          for symbol, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, k: int = 10, direction: str = None, qualifying_only: bool = True) -> List[Dict[str, Any]]:
+        """Up to `k` best-scored symbols, highest confidence first"""
+        ranked, live = [], []
+        with self._lock:
+            while self._heap and len(ranked) < k:
+                item = heapq.heappop(self._heap)
+                _, symbol, version = item
+                if self._versions.get(symbol) != version or symbol not in self._entries:
+                    continue
+                live.append(item)
+                entry = self._entries[symbol]
+                if qualifying_only and not entry['meets_threshold']:
+                    continue
+                if direction and entry['direction'] != direction:
+                    continue
+                ranked.append({name: value for name, value in entry.items() if name != 'key'})
+            for item in live:
+                heapq.heappush(self._heap, item)
+        return ranked
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'symbols': len(self._entries),
+                'qualifying': sum(entry['meets_threshold'] for entry in self._entries.values()),
+                **self.stats
+            }
+
+
+# Global scanner instance
+market_scanner = MarketScanner()
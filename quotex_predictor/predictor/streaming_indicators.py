@@ -0,0 +1,408 @@
+"""
+Streaming Indicators
+Stateful O(1)-per-bar implementations of the indicators used by
+AdvancedTechnicalAnalyzer, numerically matching the `ta` library
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """
+    Base class for streaming indicators
+
+    Subclasses implement `_step()` (one bar in, one value out) and list the
+    attributes that make up their state in `_state_fields`. The current value is
+    available as `value` and the last `history_size` values as `history`.
+    """
+
+    _state_fields: Tuple[str, ...] = ()
+
+    def __init__(self, history_size: int = 500):
+        self.history_size = history_size
+        self.history = deque(maxlen=history_size)
+        self.count = 0
+        self.value = NAN
+
+    def _record(self, value: float) -> float:
+        self.count += 1
+        self.value = value
+        self.history.append(value)
+        return value
+
+    def get_state(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot of the indicator state"""
+        state = {
+            'type': type(self).__name__,
+            'history_size': self.history_size,
+            'count': self.count,
+            'value': self.value,
+            'history': list(self.history),
+        }
+        for field in self._state_fields:
+            value = getattr(self, field)
+            if isinstance(value, deque):
+                value = list(value)
+            elif isinstance(value, StreamingIndicator):
+                value = value.get_state()
+            elif isinstance(value, _RollingExtreme):
+                value = value.get_state()
+            state[field] = value
+        return state
+
+    def set_state(self, state: Dict[str, Any]):
+        """Restore a snapshot produced by `get_state()`"""
+        self.history_size = state['history_size']
+        self.history = deque(state['history'], maxlen=self.history_size)
+        self.count = state['count']
+        self.value = state['value']
+        for field in self._state_fields:
+            current = getattr(self, field)
+            value = state[field]
+            if isinstance(current, deque):
+                value = deque(value, maxlen=current.maxlen)
+            elif isinstance(current, (StreamingIndicator, _RollingExtreme)):
+                current.set_state(value)
+                continue
+            setattr(self, field, value)
+
+
+class _RollingExtreme:
+    """Rolling max (or min) over a fixed window using a monotonic deque, amortized O(1)"""
+
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self.items = deque()  # (position, value), values monotonic
+
+    def update(self, value: float) -> float:
+        position = self.count
+        self.count += 1
+        if self.mode == 'max':
+            while self.items and self.items[-1][1] <= value:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= value:
+                self.items.pop()
+        self.items.append((position, value))
+        if self.items[0][0] <= position - self.window:
+            self.items.popleft()
+        return self.items[0][1]
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.window
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'window': self.window, 'mode': self.mode, 'count': self.count,
+                'items': [list(item) for item in self.items]}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.window = state['window']
+        self.mode = state['mode']
+        self.count = state['count']
+        self.items = deque(tuple(item) for item in state['items'])
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential moving average (span-based, adjust=False); NaN until `window` bars"""
+
+    _state_fields = ('window', 'ema')
+
+    def __init__(self, window: int, history_size: int = 500):
+        super().__init__(history_size)
+        self.window = window
+        self.ema = None
+
+    def update(self, close: float) -> float:
+        if self.ema is None:
+            self.ema = close
+        else:
+            alpha = 2.0 / (self.window + 1)
+            self.ema = alpha * close + (1 - alpha) * self.ema
+        return self._record(self.ema if self.count + 1 >= self.window else NAN)
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple moving average with a running sum; NaN until `window` bars"""
+
+    _state_fields = ('window', 'values', 'total')
+
+    # Re-sum the window periodically so floating point drift cannot accumulate
+    RESYNC_EVERY = 4096
+
+    def __init__(self, window: int, history_size: int = 500):
+        super().__init__(history_size)
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        if (self.count + 1) % self.RESYNC_EVERY == 0:
+            self.total = sum(self.values)
+        return self._record(self.total / self.window if len(self.values) == self.window else NAN)
+
+
+class StreamingRSI(StreamingIndicator):
+    """Wilder RSI (ewm alpha=1/window); the first bar contributes a zero change"""
+
+    _state_fields = ('window', 'prev_close', 'avg_gain', 'avg_loss')
+
+    def __init__(self, window: int = 14, history_size: int = 500):
+        super().__init__(history_size)
+        self.window = window
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float:
+        change = 0.0 if self.prev_close is None else close - self.prev_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self.prev_close is None:
+            self.avg_gain, self.avg_loss = gain, loss
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.window
+            self.avg_loss += (loss - self.avg_loss) / self.window
+        self.prev_close = close
+
+        rsi = NAN
+        if self.count + 1 >= self.window:
+            rsi = 100.0 if self.avg_loss == 0 else 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        return self._record(rsi)
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line (fast EMA - slow EMA) with its signal line; `value` is the MACD line"""
+
+    _state_fields = ('fast', 'slow', 'signal', 'macd_signal')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9, history_size: int = 500):
+        super().__init__(history_size)
+        self.fast = StreamingEMA(fast, history_size=1)
+        self.slow = StreamingEMA(slow, history_size=1)
+        # The signal EMA starts at the first valid MACD value
+        self.signal = StreamingEMA(signal, history_size=history_size)
+        self.macd_signal = NAN
+
+    def update(self, close: float) -> float:
+        self.fast.update(close)
+        slow = self.slow.update(close)
+        macd = NAN
+        if slow == slow:  # Slow EMA past its warm-up
+            macd = self.fast.ema - self.slow.ema
+            self.macd_signal = self.signal.update(macd)
+        return self._record(macd)
+
+    @property
+    def signal_history(self):
+        return self.signal.history
+
+
+class StreamingStochastic(StreamingIndicator):
+    """Stochastic %K over `window` bars; NaN during warm-up or on a flat range"""
+
+    _state_fields = ('window', 'highest', 'lowest')
+
+    def __init__(self, window: int = 14, history_size: int = 500):
+        super().__init__(history_size)
+        self.window = window
+        self.highest = _RollingExtreme(window, 'max')
+        self.lowest = _RollingExtreme(window, 'min')
+
+    def update(self, high: float, low: float, close: float) -> float:
+        highest = self.highest.update(high)
+        lowest = self.lowest.update(low)
+        stoch_k = NAN
+        if self.highest.full and highest != lowest:
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+        return self._record(stoch_k)
+
+
+def _true_range(high: float, low: float, prev_close: Optional[float]) -> float:
+    if prev_close is None:
+        return high - low
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range: mean of the first `window` true ranges, then Wilder smoothing; 0 before"""
+
+    _state_fields = ('window', 'prev_close', 'tr_sum', 'atr')
+
+    def __init__(self, window: int = 14, history_size: int = 500):
+        super().__init__(history_size)
+        self.window = window
+        self.prev_close = None
+        self.tr_sum = 0.0
+        self.atr = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        w = self.window
+        i = self.count
+        tr = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+
+        atr = 0.0
+        if i < w:
+            self.tr_sum += tr
+            if i == w - 1:
+                self.atr = self.tr_sum / w
+                atr = self.atr
+        else:
+            self.atr = (self.atr * (w - 1) + tr) / w
+            atr = self.atr
+        return self._record(atr)
+
+
+class StreamingADX(StreamingIndicator):
+    """
+    Average Directional Index
+
+    Wilder sums of TR, +DM and -DM start at bar 1; DX is available from bar
+    `window` and ADX (their average, then Wilder smoothing) from bar
+    `2 * window - 1`. Earlier values are 0, as in `ta`.
+    """
+
+    _state_fields = ('window', 'prev_high', 'prev_low', 'prev_close', 'trs', 'dip', 'din', 'dx_sum', 'adx')
+
+    def __init__(self, window: int = 14, history_size: int = 500):
+        super().__init__(history_size)
+        self.window = window
+        self.prev_high = None
+        self.prev_low = None
+        self.prev_close = None
+        self.trs = 0.0
+        self.dip = 0.0
+        self.din = 0.0
+        self.dx_sum = 0.0
+        self.adx = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        w = self.window
+        i = self.count
+        adx = 0.0
+
+        if i >= 1:
+            tr = _true_range(high, low, self.prev_close)
+            up_move = high - self.prev_high
+            down_move = self.prev_low - low
+            plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+            minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+            if i <= w:
+                self.trs += tr
+                self.dip += plus_dm
+                self.din += minus_dm
+            else:
+                self.trs = self.trs - self.trs / w + tr
+                self.dip = self.dip - self.dip / w + plus_dm
+                self.din = self.din - self.din / w + minus_dm
+
+            if i >= w:
+                di_plus = 100 * self.dip / self.trs if self.trs != 0 else 0.0
+                di_minus = 100 * self.din / self.trs if self.trs != 0 else 0.0
+                di_sum = di_plus + di_minus
+                dx = 100 * abs(di_plus - di_minus) / di_sum if di_sum != 0 else 0.0
+                if i < 2 * w - 1:
+                    self.dx_sum += dx
+                elif i == 2 * w - 1:
+                    self.adx = (self.dx_sum + dx) / w
+                    adx = self.adx
+                else:
+                    self.adx = (self.adx * (w - 1) + dx) / w
+                    adx = self.adx
+
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        return self._record(adx)
+
+
+INDICATOR_NAMES = (
+    'ema_21', 'ema_50', 'sma_200', 'rsi', 'macd', 'macd_signal',
+    'stoch_k', 'adx', 'atr', 'volume_sma',
+)
+
+
+class StreamingIndicatorSet:
+    """
+    The supporting indicator set of AdvancedTechnicalAnalyzer for one symbol,
+    updated one bar at a time
+    """
+
+    def __init__(self, sma_window: int = 200, history_size: int = 500):
+        self.sma_window = sma_window
+        self.history_size = history_size
+        self.ema_21 = StreamingEMA(21, history_size)
+        self.ema_50 = StreamingEMA(50, history_size)
+        self.sma_200 = StreamingSMA(sma_window, history_size)
+        self.rsi = StreamingRSI(14, history_size)
+        self.macd = StreamingMACD(12, 26, 9, history_size)
+        self.stoch_k = StreamingStochastic(14, history_size)
+        self.adx = StreamingADX(14, history_size)
+        self.atr = StreamingATR(14, history_size)
+        self.volume_sma = StreamingSMA(20, history_size)
+
+    def update(self, high: float, low: float, close: float, volume: float = 1000.0) -> Tuple[float, ...]:
+        """Add one bar; returns the values in INDICATOR_NAMES order"""
+        macd = self.macd.update(close)
+        return (
+            self.ema_21.update(close),
+            self.ema_50.update(close),
+            self.sma_200.update(close),
+            self.rsi.update(close),
+            macd,
+            self.macd.macd_signal,
+            self.stoch_k.update(high, low, close),
+            self.adx.update(high, low, close),
+            self.atr.update(high, low, close),
+            self.volume_sma.update(volume),
+        )
+
+    @property
+    def values(self) -> Dict[str, float]:
+        """Current value of every indicator"""
+        return {
+            'ema_21': self.ema_21.value,
+            'ema_50': self.ema_50.value,
+            'sma_200': self.sma_200.value,
+            'rsi': self.rsi.value,
+            'macd': self.macd.value,
+            'macd_signal': self.macd.macd_signal,
+            'stoch_k': self.stoch_k.value,
+            'adx': self.adx.value,
+            'atr': self.atr.value,
+            'volume_sma': self.volume_sma.value,
+        }
+
+    def _indicators(self) -> Dict[str, StreamingIndicator]:
+        return {
+            'ema_21': self.ema_21, 'ema_50': self.ema_50, 'sma_200': self.sma_200,
+            'rsi': self.rsi, 'macd': self.macd, 'stoch_k': self.stoch_k,
+            'adx': self.adx, 'atr': self.atr, 'volume_sma': self.volume_sma,
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot of every indicator"""
+        return {
+            'sma_window': self.sma_window,
+            'history_size': self.history_size,
+            'indicators': {name: ind.get_state() for name, ind in self._indicators().items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingIndicatorSet':
+        """Rebuild an indicator set from `get_state()` output"""
+        indicator_set = cls(sma_window=state['sma_window'], history_size=state['history_size'])
+        for name, indicator in indicator_set._indicators().items():
+            indicator.set_state(state['indicators'][name])
+        return indicator_set
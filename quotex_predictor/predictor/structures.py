@@ -0,0 +1,201 @@
+"""
+Analysis Structures
+Compact containers for the swing points, fair value gaps, supply/demand zones,
+order blocks and divergences the analyzer components produce: a collection keeps one NumPy
+array per field and builds `__slots__` records only for the items accessed.
+Both convert to JSON explicitly through `to_json()`.
+"""
+
+import logging
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _native(value):
+    """JSON-native form of a record value"""
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class Record:
+    """One item of a collection; fields are the class's `__slots__`"""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {name: _native(getattr(self, name)) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class SwingPoint(Record):
+    __slots__ = ('index', 'price', 'time')
+
+
+class FairValueGap(Record):
+    __slots__ = ('type', 'upper', 'lower', 'index', 'filled')
+
+
+class SupplyDemandZone(Record):
+    __slots__ = ('type', 'upper', 'lower', 'strength', 'index')
+
+
+class OrderBlock(Record):
+    __slots__ = ('type', 'upper', 'lower', 'index', 'strength', 'tested')
+
+
+class Divergence(Record):
+    __slots__ = ('type', 'indicator', 'start', 'end', 'price_start', 'price_end',
+                 'oscillator_start', 'oscillator_end')
+
+
+class RecordArray:
+    """
+    Struct-of-arrays collection of `record` items
+
+    Fields are read as arrays (`gaps.upper`); an integer index returns one
+    record, a slice or boolean mask another collection sharing the arrays.
+    """
+
+    record = Record
+    __slots__ = ('fields',)
+
+    def __init__(self, **fields):
+        self.fields = {name: np.asarray(fields[name]) for name in self.record.__slots__}
+
+    @classmethod
+    def empty(cls, **kwargs) -> 'RecordArray':
+        return cls(**{name: np.empty(0) for name in cls.record.__slots__}, **kwargs)
+
+    def _subset(self, fields: Dict[str, np.ndarray]) -> 'RecordArray':
+        return type(self)(**fields)
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'fields':
+            raise AttributeError(name)
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self) -> int:
+        return len(self.fields[self.record.__slots__[0]])
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.record(*(self._value(name, key) for name in self.record.__slots__))
+        return self._subset({name: values[key] for name, values in self.fields.items()})
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def _value(self, name: str, i: int):
+        return self.fields[name][i]
+
+    def _json_column(self, name: str) -> List:
+        return self.fields[name].tolist()
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """List of plain dicts, one conversion per field rather than per value"""
+        names = self.record.__slots__
+        return [dict(zip(names, row)) for row in zip(*(self._json_column(name) for name in names))]
+
+    @classmethod
+    def from_json(cls, items: List[Dict[str, Any]]) -> 'RecordArray':
+        """Collection from to_json() output (collections without time fields)"""
+        if not items:
+            return cls.empty()
+        return cls(**{name: [item[name] for item in items] for name in cls.record.__slots__})
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} items)"
+
+
+class TimedRecordArray(RecordArray):
+    """Collection whose `time_fields` hold timestamps as ns since epoch, shown in the frame's timezone"""
+
+    time_fields = ()
+    __slots__ = ('tz',)
+
+    def __init__(self, tz=None, **fields):
+        super().__init__(**fields)
+        self.tz = tz
+
+    @classmethod
+    def empty(cls, tz=None) -> 'TimedRecordArray':
+        return cls(tz=tz, **{name: np.empty(0, dtype=np.int64 if name in cls.time_fields else float)
+                             for name in cls.record.__slots__})
+
+    def _subset(self, fields: Dict[str, np.ndarray]) -> 'TimedRecordArray':
+        return type(self)(tz=self.tz, **fields)
+
+    def _times(self, stamps) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(np.asarray(stamps, dtype=np.int64).view('datetime64[ns]'))
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+
+    def _value(self, name: str, i: int):
+        if name in self.time_fields:
+            return self._times(self.fields[name][i:i + 1 or None])[0]
+        return self.fields[name][i]
+
+    def _json_column(self, name: str) -> List:
+        if name in self.time_fields:
+            return [stamp.isoformat() for stamp in self._times(self.fields[name])]
+        return self.fields[name].tolist()
+
+
+class SwingPoints(TimedRecordArray):
+    """Swing highs or lows: bar position, price and timestamp"""
+
+    record = SwingPoint
+    time_fields = ('time',)
+    __slots__ = ()
+
+
+class FairValueGaps(RecordArray):
+    record = FairValueGap
+    __slots__ = ()
+
+
+class SupplyDemandZones(RecordArray):
+    record = SupplyDemandZone
+    __slots__ = ()
+
+
+class OrderBlocks(RecordArray):
+    record = OrderBlock
+    __slots__ = ()
+
+
+class Divergences(TimedRecordArray):
+    """Price/oscillator divergences between two swings, from the `start` swing's time to the `end` swing's"""
+
+    record = Divergence
+    time_fields = ('start', 'end')
+    __slots__ = ()
+
+    @classmethod
+    def concat(cls, parts: List['Divergences'], tz=None) -> 'Divergences':
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty(tz)
+        return cls(tz=parts[0].tz, **{name: np.concatenate([part.fields[name] for part in parts])
+                                      for name in cls.record.__slots__})
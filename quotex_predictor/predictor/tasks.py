@@ -1,84 +1,232 @@
 from django.utils import timezone
-from datetime import timedelta
-from .models import Prediction, AccuracyMetrics
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, F, Min, Max, Count, DecimalField, ExpressionWrapper
+from django.db.models.functions import TruncHour
+from .models import Prediction, AccuracyMetrics, AccuracyBucket, TradingPair, PriceTick
 from .data_sources import DataSourceManager
+from .scanner import market_scanner
+from .price_index import price_index, MAX_TICK_AGE
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def resolve_pending_predictions():
+# How long after prediction_time a prediction of each timeframe is resolved
+RESOLVE_AFTER = {
+    '1m': timedelta(minutes=1),
+    '5m': timedelta(minutes=5),
+    '10m': timedelta(minutes=10),
+}
+DEFAULT_RESOLVE_AFTER = timedelta(minutes=1)
+
+# Predictions per bulk_update statement (and per page read)
+RESOLVE_CHUNK_SIZE = 500
+
+RESOLVED_FIELDS = ['actual_price', 'is_correct', 'is_resolved']
+
+# Hourly accuracy buckets older than this are dropped by reconcile_accuracy_buckets
+BUCKET_RETENTION_DAYS = 30
+
+# A prediction still without a price this long after its resolve time is closed as unresolvable
+# (is_resolved with no actual price or outcome, never counted)
+UNRESOLVABLE_AFTER = timedelta(days=1)
+
+# PriceTick rows older than this are deleted by prune_price_ticks; must exceed UNRESOLVABLE_AFTER
+PRICE_TICK_RETENTION_DAYS = 7
+
+
+def due_predictions(now=None):
+    """Unresolved predictions whose timeframe has elapsed, with their trading pair joined"""
+    now = now or timezone.now()
+    due = Q(prediction_time__lte=now - DEFAULT_RESOLVE_AFTER) & ~Q(timeframe__in=list(RESOLVE_AFTER))
+    for timeframe, delay in RESOLVE_AFTER.items():
+        due |= Q(timeframe=timeframe, prediction_time__lte=now - delay)
+    return Prediction.objects.filter(due, is_resolved=False).select_related('trading_pair')
+
+
+def fetch_resolution_prices(symbols, data_manager=None):
+    """Latest close per symbol (None when no source has data), one source-chain fetch each"""
+    data_manager = data_manager or DataSourceManager()
+    prices = {}
+    for symbol in symbols:
+        try:
+            current_data = data_manager.get_price_data(symbol, '1h', 1)
+            if current_data is not None and not current_data.empty:
+                prices[symbol] = float(current_data['close'].iloc[-1])
+            else:
+                prices[symbol] = None
+        except Exception as e:
+            logger.error(f"Error fetching resolution price for {symbol}: {e}")
+            prices[symbol] = None
+    return prices
+
+
+def resolve_predictions_bulk(now=None, data_manager=None, chunk_size=RESOLVE_CHUNK_SIZE, index=None):
     """
-    Resolve pending predictions that have expired
-    This function can be called periodically to update prediction statuses
+    Resolve every due prediction against the price at its resolve time
+    
+    Prices come from the point-in-time price index: the stored observations of
+    each symbol's due range are loaded with one query, then each prediction is
+    priced at prediction_time + its timeframe. One the index cannot price is
+    resolved at the live price (fetched once per symbol) only while its resolve
+    time is at most MAX_TICK_AGE ago; otherwise it stays pending for a later run
+    ('no_price'), and once UNRESOLVABLE_AFTER has passed it is closed without an
+    outcome ('unresolvable') and not counted.
+    
+    Due predictions are read in primary-key pages of `chunk_size` and written
+    back with one bulk_update per page, together with one incremental update
+    per AccuracyMetrics row and AccuracyBucket the page touches. Each page
+    claims its rows first (select_for_update(skip_locked=True), still
+    unresolved), so concurrent resolvers never write or count a prediction
+    twice; rows another resolver got first are reported as 'skipped'.
     """
-    try:
-        now = timezone.now()
-        data_manager = DataSourceManager()
-        resolved_count = 0
+    now = now or timezone.now()
+    index = index or price_index
+    stats = {'resolved': 0, 'correct': 0, 'no_price': 0, 'unresolvable': 0, 'skipped': 0, 'symbols': 0,
+             'indexed': 0, 'live': 0}
+    due = due_predictions(now)
+    
+    ranges = list(due.order_by().values('trading_pair__symbol').annotate(
+        first=Min('prediction_time'), last=Max('prediction_time')
+    ))
+    if not ranges:
+        return stats
+    stats['symbols'] = len(ranges)
+    longest = max([DEFAULT_RESOLVE_AFTER, *RESOLVE_AFTER.values()])
+    for row in ranges:
+        index.load(row['trading_pair__symbol'], row['first'] - MAX_TICK_AGE, row['last'] + longest)
+    
+    live_prices = {}
+    
+    def live_price(symbol):
+        if symbol not in live_prices:
+            live_prices.update(fetch_resolution_prices([symbol], data_manager))
+            if live_prices[symbol] is not None:
+                index.record(symbol, now, live_prices[symbol])
+        return live_prices[symbol]
+    
+    last_pk = 0
+    while True:
+        page = list(due.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+        if not page:
+            break
+        last_pk = page[-1].pk
         
-        # Get all pending predictions
-        pending_predictions = Prediction.objects.filter(is_resolved=False)
+        # One vectorized lookup per symbol in the page
+        resolve_times = [
+            prediction.prediction_time + RESOLVE_AFTER.get(prediction.timeframe, DEFAULT_RESOLVE_AFTER)
+            for prediction in page
+        ]
+        by_symbol = {}
+        for row, prediction in enumerate(page):
+            by_symbol.setdefault(prediction.trading_pair.symbol, []).append(row)
+        indexed = [None] * len(page)
+        for symbol, rows in by_symbol.items():
+            prices = index.prices_at(symbol, [resolve_times[row] for row in rows])
+            for row, price in zip(rows, prices.tolist()):
+                indexed[row] = None if price != price else price
         
-        for prediction in pending_predictions:
-            try:
-                # Calculate when this prediction should be resolved
-                if prediction.timeframe == '1m':
-                    resolve_time = prediction.prediction_time + timedelta(minutes=1)
-                elif prediction.timeframe == '5m':
-                    resolve_time = prediction.prediction_time + timedelta(minutes=5)
+        priced = []  # (prediction, is_correct, priced from the index)
+        unresolvable = []
+        for row, prediction in enumerate(page):
+            actual_price = indexed[row]
+            overdue = now - resolve_times[row]
+            if actual_price is None and overdue <= MAX_TICK_AGE:
+                # The live price still describes the resolve time
+                actual_price = live_price(prediction.trading_pair.symbol)
+            if actual_price is None:
+                # Not a miss: left unresolved until a price is available, closed without an outcome after the cutoff
+                if overdue > UNRESOLVABLE_AFTER:
+                    prediction.actual_price = None
+                    prediction.is_correct = None
+                    prediction.is_resolved = True
+                    unresolvable.append(prediction)
                 else:
-                    resolve_time = prediction.prediction_time + timedelta(minutes=1)
-                
-                # Check if enough time has passed
-                if now >= resolve_time:
-                    # Get current price to compare with prediction
-                    current_data = data_manager.get_price_data(
-                        prediction.trading_pair.symbol, 
-                        '1h', 
-                        1
-                    )
-                    
-                    if current_data is not None and not current_data.empty:
-                        actual_price = float(current_data['close'].iloc[-1])
-                        original_price = float(prediction.current_price)
-                        
-                        # Determine if prediction was correct
-                        price_change = actual_price - original_price
-                        
-                        if prediction.direction == 'UP':
-                            is_correct = price_change > 0
-                        else:  # DOWN
-                            is_correct = price_change < 0
-                        
-                        # Update prediction
-                        prediction.actual_price = actual_price
-                        prediction.is_correct = is_correct
-                        prediction.is_resolved = True
-                        prediction.save()
-                        
-                        resolved_count += 1
-                        
-                        # Update accuracy metrics
-                        update_accuracy_metrics(prediction)
-                        
-                        logger.info(
-                            f"Resolved prediction {prediction.id}: "
-                            f"{prediction.trading_pair.symbol} {prediction.direction} "
-                            f"- {'CORRECT' if is_correct else 'INCORRECT'}"
-                        )
-                    else:
-                        # If we can't get price data, mark as resolved but unknown
-                        prediction.is_resolved = True
-                        prediction.save()
-                        logger.warning(f"No price data for prediction {prediction.id}")
-                        
-            except Exception as e:
-                logger.error(f"Error resolving prediction {prediction.id}: {e}")
+                    stats['no_price'] += 1
                 continue
+            
+            # Correct when the price moved the predicted way
+            price_change = actual_price - float(prediction.current_price)
+            if prediction.direction == 'UP':
+                is_correct = price_change > 0
+            else:  # DOWN
+                is_correct = price_change < 0
+            
+            prediction.actual_price = actual_price
+            prediction.is_correct = is_correct
+            prediction.is_resolved = True
+            priced.append((prediction, is_correct, indexed[row] is not None))
         
-        logger.info(f"Resolved {resolved_count} predictions")
-        return resolved_count
+        # Outcomes and their metric counts commit together, so a crash cannot leave the counters off
+        with transaction.atomic():
+            # Claim the rows first: rows another resolver holds or already resolved are left to it,
+            # so no outcome is written or counted twice
+            claimed = set(Prediction.objects.select_for_update(skip_locked=True).filter(
+                pk__in=[prediction.pk for prediction, _, _ in priced] + [prediction.pk for prediction in unresolvable],
+                is_resolved=False
+            ).values_list('pk', flat=True))
+            stats['skipped'] += len(priced) + len(unresolvable) - len(claimed)
+            priced = [item for item in priced if item[0].pk in claimed]
+            unresolvable = [prediction for prediction in unresolvable if prediction.pk in claimed]
+            
+            Prediction.objects.bulk_update(
+                [prediction for prediction, _, _ in priced] + unresolvable, RESOLVED_FIELDS
+            )
+            count_outcomes([(prediction, is_correct) for prediction, is_correct, _ in priced])
+        
+        stats['unresolvable'] += len(unresolvable)
+        for _, is_correct, from_index in priced:
+            stats['resolved'] += 1
+            stats['correct'] += is_correct
+            stats['indexed' if from_index else 'live'] += 1
+    
+    if stats['no_price']:
+        logger.warning(f"No price for {stats['no_price']} due predictions; left pending")
+    if stats['unresolvable']:
+        logger.warning(f"Closed {stats['unresolvable']} predictions without an outcome: no price within {UNRESOLVABLE_AFTER}")
+    if stats['skipped']:
+        logger.info(f"{stats['skipped']} due predictions were resolved by another resolver")
+    return stats
+
+
+def record_prices(data_manager=None):
+    """
+    Record the live price of every active pair into the price index
+    The resolve_predictions command runs it first; run that every minute so
+    predictions resolve at their exact resolve time
+    """
+    try:
+        symbols = list(TradingPair.objects.filter(is_active=True).values_list('symbol', flat=True))
+        now = timezone.now()
+        recorded = 0
+        for symbol, price in fetch_resolution_prices(symbols, data_manager).items():
+            if price is not None:
+                price_index.record(symbol, now, price)
+                recorded += 1
+        
+        logger.info(f"Recorded prices of {recorded} of {len(symbols)} pairs")
+        return recorded
+        
+    except Exception as e:
+        logger.error(f"Error in record_prices: {e}")
+        return 0
+
+
+def resolve_pending_predictions():
+    """
+    Resolve pending predictions that have expired
+    This function can be called periodically to update prediction statuses
+    """
+    try:
+        stats = resolve_predictions_bulk()
+        
+        logger.info(
+            f"Resolved {stats['resolved']} predictions across {stats['symbols']} symbols "
+            f"({stats['correct']} correct, {stats['indexed']} priced from the index)"
+        )
+        return stats['resolved']
         
     except Exception as e:
         logger.error(f"Error in resolve_pending_predictions: {e}")
@@ -86,7 +234,7 @@ def resolve_pending_predictions():
 
 
 def update_accuracy_metrics(prediction):
-    """Update accuracy metrics for a trading pair and timeframe"""
+    """Recount accuracy metrics for one trading pair and timeframe (O(resolved predictions); prefer apply_accuracy_deltas)"""
     try:
         metrics, created = AccuracyMetrics.objects.get_or_create(
             trading_pair=prediction.trading_pair,
@@ -102,7 +250,8 @@ def update_accuracy_metrics(prediction):
         resolved_predictions = Prediction.objects.filter(
             trading_pair=prediction.trading_pair,
             timeframe=prediction.timeframe,
-            is_resolved=True
+            is_resolved=True,
+            is_correct__isnull=False
         )
         
         total = resolved_predictions.count()
@@ -123,6 +272,192 @@ def update_accuracy_metrics(prediction):
         logger.error(f"Error updating accuracy metrics: {e}")
 
 
+def count_outcomes(outcomes):
+    """
+    Add resolved predictions to the lifetime AccuracyMetrics and hourly AccuracyBuckets
+    `outcomes` is a list of (prediction, is_correct) pairs
+    """
+    deltas, bucket_deltas = {}, {}
+    for prediction, is_correct in outcomes:
+        key = (prediction.trading_pair_id, prediction.timeframe)
+        bucket_key = key + (AccuracyBucket.hour_of(prediction.prediction_time),)
+        for counts, counts_key in ((deltas, key), (bucket_deltas, bucket_key)):
+            resolved, correct = counts.get(counts_key, (0, 0))
+            counts[counts_key] = (resolved + 1, correct + bool(is_correct))
+    apply_accuracy_deltas(deltas)
+    apply_bucket_deltas(bucket_deltas)
+
+
+def apply_accuracy_deltas(deltas):
+    """
+    Add newly resolved predictions to AccuracyMetrics without recounting
+    
+    `deltas` maps (trading_pair_id, timeframe) to (resolved, correct) counts.
+    Each row is one UPDATE with F-expressions, so concurrent resolvers cannot
+    lose each other's counts. Deltas are not idempotent: pass only predictions
+    this caller resolved itself (resolve_predictions_bulk claims its rows before
+    counting them). reconcile_accuracy_metrics corrects any drift.
+    """
+    for (trading_pair_id, timeframe), (resolved, correct) in deltas.items():
+        if not resolved:
+            continue
+        try:
+            rows = AccuracyMetrics.objects.filter(trading_pair_id=trading_pair_id, timeframe=timeframe)
+            changes = {
+                'total_predictions': F('total_predictions') + resolved,
+                'correct_predictions': F('correct_predictions') + correct,
+                # Right-hand sides see the old counts, so the new ratio is spelled out
+                'accuracy_percentage': ExpressionWrapper(
+                    (F('correct_predictions') + correct) * 100.0 / (F('total_predictions') + resolved),
+                    output_field=DecimalField(max_digits=5, decimal_places=2)
+                ),
+                'last_updated': timezone.now(),
+            }
+            if not rows.update(**changes):
+                # First outcome for this pair/timeframe: create the row, then count into it
+                AccuracyMetrics.objects.get_or_create(trading_pair_id=trading_pair_id, timeframe=timeframe)
+                rows.update(**changes)
+        except Exception as e:
+            logger.error(f"Error applying accuracy deltas for pair {trading_pair_id} ({timeframe}): {e}")
+
+
+def apply_bucket_deltas(deltas):
+    """
+    Add newly resolved predictions to their AccuracyBuckets
+    `deltas` maps (trading_pair_id, timeframe, hour) to (resolved, correct) counts
+    """
+    for (trading_pair_id, timeframe, hour), (resolved, correct) in deltas.items():
+        if not resolved:
+            continue
+        try:
+            rows = AccuracyBucket.objects.filter(trading_pair_id=trading_pair_id, timeframe=timeframe, hour=hour)
+            changes = {
+                'total_predictions': F('total_predictions') + resolved,
+                'correct_predictions': F('correct_predictions') + correct,
+            }
+            if not rows.update(**changes):
+                AccuracyBucket.objects.get_or_create(trading_pair_id=trading_pair_id, timeframe=timeframe, hour=hour)
+                rows.update(**changes)
+        except Exception as e:
+            logger.error(f"Error applying bucket deltas for pair {trading_pair_id} ({timeframe}, {hour}): {e}")
+
+
+def reconcile_accuracy_metrics():
+    """
+    Recount AccuracyMetrics from the resolved predictions and correct any drift
+    Run this periodically (e.g. daily); the resolver itself only adds deltas
+    """
+    try:
+        with transaction.atomic():
+            # Rows are locked first, so resolvers wait instead of adding to counts being replaced
+            existing = {
+                (metrics.trading_pair_id, metrics.timeframe): metrics
+                for metrics in AccuracyMetrics.objects.select_for_update()
+            }
+            counts = {
+                (row['trading_pair_id'], row['timeframe']): (row['total'], row['correct'])
+                for row in Prediction.objects.filter(is_resolved=True, is_correct__isnull=False).order_by().values(
+                    'trading_pair_id', 'timeframe'
+                ).annotate(total=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+            }
+            
+            now = timezone.now()
+            corrected, missing = [], []
+            for key in set(existing) | set(counts):
+                total, correct = counts.get(key, (0, 0))
+                accuracy = round(correct / total * 100, 2) if total > 0 else 0
+                metrics = existing.get(key)
+                if metrics is None:
+                    missing.append(AccuracyMetrics(
+                        trading_pair_id=key[0], timeframe=key[1], total_predictions=total,
+                        correct_predictions=correct, accuracy_percentage=accuracy
+                    ))
+                elif (metrics.total_predictions, metrics.correct_predictions) != (total, correct):
+                    metrics.total_predictions = total
+                    metrics.correct_predictions = correct
+                    metrics.accuracy_percentage = accuracy
+                    metrics.last_updated = now
+                    corrected.append(metrics)
+            
+            AccuracyMetrics.objects.bulk_update(
+                corrected, ['total_predictions', 'correct_predictions', 'accuracy_percentage', 'last_updated']
+            )
+            AccuracyMetrics.objects.bulk_create(missing)
+        
+        logger.info(f"Reconciled accuracy metrics: {len(corrected)} corrected, {len(missing)} created")
+        return len(corrected) + len(missing)
+        
+    except Exception as e:
+        logger.error(f"Error in reconcile_accuracy_metrics: {e}")
+        return 0
+
+
+def reconcile_accuracy_buckets(days=BUCKET_RETENTION_DAYS):
+    """
+    Recount the AccuracyBuckets of the last `days` days from the resolved predictions
+    and delete older buckets; returns the number of buckets written
+    """
+    try:
+        since = AccuracyBucket.hour_of(timezone.now() - timedelta(days=days))
+        with transaction.atomic():
+            existing = {
+                (bucket.trading_pair_id, bucket.timeframe, bucket.hour): bucket
+                for bucket in AccuracyBucket.objects.select_for_update().filter(hour__gte=since)
+            }
+            counts = {
+                (row['trading_pair_id'], row['timeframe'], row['bucket']): (row['total'], row['correct'])
+                for row in Prediction.objects.filter(
+                    is_resolved=True, is_correct__isnull=False, prediction_time__gte=since
+                ).order_by().annotate(
+                    bucket=TruncHour('prediction_time', tzinfo=dt_timezone.utc)
+                ).values('trading_pair_id', 'timeframe', 'bucket').annotate(
+                    total=Count('id'), correct=Count('id', filter=Q(is_correct=True))
+                )
+            }
+            
+            corrected, missing = [], []
+            for key in set(existing) | set(counts):
+                total, correct = counts.get(key, (0, 0))
+                bucket = existing.get(key)
+                if bucket is None:
+                    missing.append(AccuracyBucket(
+                        trading_pair_id=key[0], timeframe=key[1], hour=key[2],
+                        total_predictions=total, correct_predictions=correct
+                    ))
+                elif (bucket.total_predictions, bucket.correct_predictions) != (total, correct):
+                    bucket.total_predictions = total
+                    bucket.correct_predictions = correct
+                    corrected.append(bucket)
+            
+            AccuracyBucket.objects.bulk_update(corrected, ['total_predictions', 'correct_predictions'])
+            AccuracyBucket.objects.bulk_create(missing)
+            expired, _ = AccuracyBucket.objects.filter(hour__lt=since).delete()
+        
+        logger.info(
+            f"Reconciled accuracy buckets: {len(corrected)} corrected, {len(missing)} created, {expired} expired"
+        )
+        return len(corrected) + len(missing)
+        
+    except Exception as e:
+        logger.error(f"Error in reconcile_accuracy_buckets: {e}")
+        return 0
+
+
+def prune_price_ticks(days=PRICE_TICK_RETENTION_DAYS):
+    """
+    Delete PriceTick rows older than `days` days; returns the number deleted
+    Every prediction is resolved or closed long before its ticks expire
+    """
+    try:
+        deleted, _ = PriceTick.objects.filter(timestamp__lt=timezone.now() - timedelta(days=days)).delete()
+        logger.info(f"Pruned {deleted} price ticks older than {days} days")
+        return deleted
+        
+    except Exception as e:
+        logger.error(f"Error in prune_price_ticks: {e}")
+        return 0
+
+
 def simulate_realistic_outcomes():
     """
     Simulate realistic trading outcomes for demo purposes
@@ -131,6 +466,7 @@ def simulate_realistic_outcomes():
     try:
         pending_predictions = Prediction.objects.filter(is_resolved=False)
         resolved_count = 0
+        outcomes = []
         
         for prediction in pending_predictions:
             try:
@@ -141,6 +477,8 @@ def simulate_realistic_outcomes():
                     resolve_time = prediction.prediction_time + timedelta(minutes=1)
                 elif prediction.timeframe == '5m':
                     resolve_time = prediction.prediction_time + timedelta(minutes=5)
+                elif prediction.timeframe == '10m':
+                    resolve_time = prediction.prediction_time + timedelta(minutes=10)
                 else:
                     resolve_time = prediction.prediction_time + timedelta(minutes=1)
                 
@@ -184,8 +522,8 @@ def simulate_realistic_outcomes():
                     
                     resolved_count += 1
                     
-                    # Update accuracy metrics
-                    update_accuracy_metrics(prediction)
+                    # Counted into accuracy metrics once all outcomes are simulated
+                    outcomes.append((prediction, is_correct))
                     
                     logger.info(
                         f"Simulated outcome for prediction {prediction.id}: "
@@ -197,9 +535,27 @@ def simulate_realistic_outcomes():
                 logger.error(f"Error simulating outcome for prediction {prediction.id}: {e}")
                 continue
         
+        count_outcomes(outcomes)
         logger.info(f"Simulated outcomes for {resolved_count} predictions")
         return resolved_count
         
     except Exception as e:
         logger.error(f"Error in simulate_realistic_outcomes: {e}")
-        return 0
\ No newline at end of file
+        return 0
+
+
+def scan_market():
+    """
+    Rescore active pairs whose candles closed since the last scan
+    Call this periodically (e.g. each minute) so /api/scanner/ reads never wait on a fetch
+    """
+    try:
+        symbols = list(TradingPair.objects.filter(is_active=True).values_list('symbol', flat=True))
+        rescored = market_scanner.refresh(symbols, limit=settings.ANALYSIS_HISTORY_BARS)
+        
+        logger.info(f"Market scan rescored {len(rescored)} of {len(symbols)} pairs")
+        return len(rescored)
+        
+    except Exception as e:
+        logger.error(f"Error in scan_market: {e}")
+        return 0
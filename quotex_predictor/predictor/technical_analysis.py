@@ -1,12 +1,125 @@
 import pandas as pd
 import numpy as np
-import ta
 from typing import Dict, Any, List, Tuple
+import copy
+import json
 import logging
+import math
 from datetime import datetime, timedelta
+from .levels import SupportResistanceEngine, get_level_engine, swing_point_masks
+from .indicator_cache import indicator_cache
+from .analysis_cache import analysis_cache, candle_key
+from .profiling import StageTimer, NULL_TIMER, profiling_enabled, stage_histograms
+from .ohlcv import OHLCV, as_bars
+from .structures import SwingPoints, FairValueGaps, SupplyDemandZones, OrderBlocks
+from .divergence import (divergence_masks, divergence_signal, find_divergences, latest_divergence,
+                         get_divergence_engine)
+from . import indicators as kernels
 
 logger = logging.getLogger(__name__)
 
+# Blend weight of each signal component; a firing component contributes weight * strength
+SIGNAL_WEIGHTS = {
+    'htf_bias': 0.30,
+    'bos': 0.25,
+    'choch': 0.20,
+    'fvg': 0.15,
+    'support_resistance': 0.15,
+    'supply_demand': 0.10,
+    'order_blocks': 0.12,
+    'ict_concepts': 0.10,
+    'smart_money': 0.08,
+    'smart_money_divergence': 0.07,
+    'qmlr': 0.08,
+    'traditional': 0.05,
+    'ltf_structure': 0.05,
+}
+
+# Confidence = 70 + consensus + min(total weight * weight_scale, weight_cap) + mtf + structure
+CONFIDENCE_BONUSES = {
+    'consensus': 40.0,      # Scales (majority share - 0.5), up to 20 points
+    'weight_scale': 30.0,
+    'weight_cap': 20.0,
+    'mtf': 5.0,             # HTF and LTF bias agree
+    'structure': 5.0,       # BOS or CHoCH detected
+}
+
+# Typical cost (ms per 100-bar frame) of each component; with the blend weight this sets
+# the evaluation order, so cheap high-weight components can rule out a setup early
+COMPONENT_COSTS = {
+    'htf_bias': 0.36,
+    'bos': 0.17,
+    'choch': 0.13,
+    'fvg': 0.02,
+    'support_resistance': 0.13,
+    'supply_demand': 0.04,
+    'order_blocks': 0.03,
+    'ict_concepts': 0.14,
+    'smart_money': 0.13,
+    'smart_money_divergence': 0.4,
+    'qmlr': 0.17,
+    'traditional': 0.69,
+    'ltf_structure': 0.35,
+}
+
+# Bars of the primary frame (4H for htf_bias) each component looks at; None = the whole frame.
+# Structure components scan in linear time and want deep history; the zone scanners and
+# indicators only need recent bars (EMA/Wilder smoothing has converged well within 1000).
+COMPONENT_LOOKBACKS = {
+    'htf_bias': None,
+    'ltf_structure': None,
+    'bos': None,
+    'choch': None,
+    'ict_concepts': None,
+    'smart_money': None,
+    'support_resistance': None,
+    'smart_money_divergence': 1000,
+    'qmlr': None,
+    'fvg': 100,
+    'supply_demand': 1000,
+    'order_blocks': 1000,
+    'traditional': 1000,
+}
+
+# Most recent structures kept per scan; older ones never influence the signal
+MAX_SWINGS = 10
+MAX_ZONES = 10
+
+_profile_cache = {}
+
+
+def load_signal_profile(path: str) -> Dict[str, Any]:
+    """Load a weight/bonus profile written by `manage.py optimize_weights`"""
+    with open(path) as f:
+        profile = json.load(f)
+    return {
+        'weights': {**SIGNAL_WEIGHTS, **profile.get('weights', {})},
+        'bonuses': {**CONFIDENCE_BONUSES, **profile.get('bonuses', {})},
+        'horizons': profile.get('horizons', {}),
+        'lookbacks': profile.get('lookbacks', {}),
+    }
+
+
+def get_signal_profile() -> Dict[str, Any]:
+    """Profile configured by settings.SIGNAL_PROFILE_PATH, or the built-in weights"""
+    try:
+        from django.conf import settings
+        path = getattr(settings, 'SIGNAL_PROFILE_PATH', '')
+    except Exception:
+        path = ''
+    
+    if not path:
+        return {'weights': dict(SIGNAL_WEIGHTS), 'bonuses': dict(CONFIDENCE_BONUSES), 'horizons': {}, 'lookbacks': {}}
+    
+    if path not in _profile_cache:
+        try:
+            _profile_cache[path] = load_signal_profile(path)
+        except Exception as e:
+            logger.error(f"Signal profile load error ({path}): {e}")
+            _profile_cache[path] = {'weights': dict(SIGNAL_WEIGHTS), 'bonuses': dict(CONFIDENCE_BONUSES), 'horizons': {},
+                                    'lookbacks': {}}
+    return _profile_cache[path]
+
 
 class AdvancedTechnicalAnalyzer:
     """
@@ -25,29 +138,119 @@ class AdvancedTechnicalAnalyzer:
     - Quantified Market Logic & Reasoning (QMLR)
     """
     
-    def __init__(self):
+    def __init__(self, profile: Dict[str, Any] = None):
         self.min_confidence_threshold = 70.0  # Professional trading confidence level
         self.prediction_timeframe = '5m'  # Always predict 5-minute direction
+        self.prediction_horizons = ['5m']  # Horizons analyze() blends by default
         self.analysis_timeframes = ['1h', '4h']  # Use 1H and 4H for analysis
         
-    def analyze(self, df_1h: pd.DataFrame, df_4h: pd.DataFrame = None) -> Dict[str, Any]:
+        # Signal blend weights and confidence bonuses (see optimize_weights)
+        profile = profile or get_signal_profile()
+        self.signal_weights = {**SIGNAL_WEIGHTS, **profile.get('weights', {})}
+        self.confidence_bonuses = {**CONFIDENCE_BONUSES, **profile.get('bonuses', {})}
+        
+        # Horizons with their own profile section override the base blend
+        self.horizon_profiles = {
+            horizon: {
+                'weights': {**self.signal_weights, **section.get('weights', {})},
+                'bonuses': {**self.confidence_bonuses, **section.get('bonuses', {})},
+            }
+            for horizon, section in profile.get('horizons', {}).items()
+        }
+        
+        # Most blend weight per unit of cost first
+        self.evaluation_order = sorted(
+            SIGNAL_WEIGHTS, key=lambda name: -self.signal_weights[name] / COMPONENT_COSTS[name]
+        )
+        
+        # Per-component lookback in bars (see COMPONENT_LOOKBACKS)
+        self.component_lookbacks = {**COMPONENT_LOOKBACKS, **profile.get('lookbacks', {})}
+        
+        # Stage timer of the analysis in progress (see profiling)
+        self._timer = NULL_TIMER
+        
+        # Per-frame results (swing points, trend strength) shared by the components of one analysis
+        self._frame_memo = None
+        
+    def analyze(self, df_1h: pd.DataFrame, df_4h: pd.DataFrame = None, symbol: str = None,
+                debug: bool = False, horizons: List[str] = None, complete: bool = False,
+                timer: StageTimer = None) -> Dict[str, Any]:
         """
         Perform advanced multi-timeframe analysis for 5-minute direction prediction
         
         Args:
-            df_1h: 1-hour timeframe data (primary analysis)
-            df_4h: 4-hour timeframe data (higher timeframe bias)
+            df_1h: 1-hour timeframe data (primary analysis), a DataFrame or OHLCV bars
+            df_4h: 4-hour timeframe data (higher timeframe bias), a DataFrame or OHLCV bars
+            symbol: Trading pair symbol, enables per-symbol state shared across calls
+            debug: Return full component detail (indicator series, swing/gap/zone lists)
+                   instead of the compact latest-value summary
+            horizons: Prediction horizons (e.g. ['1m', '5m', '10m']) to blend from the same
+                      component pass, each with its own weighting; reported under 'horizons'
+            complete: Evaluate every component even once the confidence threshold is out
+                      of reach, so the result can be cached and re-priced (always done
+                      for results stored in analysis_cache)
+            timer: Collect stage timings here instead of in a fresh timer; the caller
+                   records them (a worker process returns them to its parent)
+        
+        Frames are converted to OHLCV bars once here; every component works on the
+        raw arrays.
+        
+        Stage timings are collected for debug requests (returned under 'timings') and,
+        with settings.ANALYSIS_PROFILING, for every call; both feed stage_histograms.
         """
+        record = timer is None
+        if record:
+            timer = StageTimer() if debug or profiling_enabled() else NULL_TIMER
+        self._timer = timer
+        self._frame_memo = {}
+        try:
+            with timer.stage('total'):
+                analysis_result = self._analyze(df_1h, df_4h, symbol, debug, horizons, complete)
+        finally:
+            self._timer = NULL_TIMER
+            self._frame_memo = None
+        
+        if timer.enabled:
+            if record:
+                stage_histograms.record(timer.stages)
+            if debug:
+                analysis_result['timings'] = timer.summary()
+        
+        return analysis_result
+    
+    def _analyze(self, df_1h: pd.DataFrame, df_4h: pd.DataFrame, symbol: str, debug: bool,
+                 horizons: List[str], complete: bool = False) -> Dict[str, Any]:
         try:
             if df_1h is None or df_1h.empty or len(df_1h) < 50:
                 return self._get_default_analysis()
             
+            df_1h, df_4h = as_bars(df_1h), as_bars(df_4h)
+            horizons = list(horizons or self.prediction_horizons)
+            
+            # Until a 1H/4H candle closes, reuse the stored analysis and only re-price it
+            cache_key = candle_key(symbol, {'1h': df_1h, '4h': df_4h}) if symbol and not debug else None
+            if cache_key is not None:
+                cached = analysis_cache.get(cache_key)
+                if cached is not None:
+                    with self._timer.stage('cache_refresh'):
+                        return self.refresh_analysis(cached, float(df_1h.close[-1]), symbol, horizons)
+            
             # Use 4H data if available, otherwise use 1H for both
             if df_4h is None or df_4h.empty:
-                df_4h = df_1h.copy()
+                df_4h = df_1h
             
-            # Perform multi-timeframe analysis
-            analysis_result = self._perform_advanced_analysis(df_1h, df_4h)
+            # Perform multi-timeframe analysis; a result that is cached is re-priced until the
+            # candle closes, so it needs every component and may not stop early
+            analysis_result = self._perform_advanced_analysis(
+                df_1h, df_4h, symbol, horizons, early_exit=not complete and cache_key is None
+            )
+            
+            if not debug:
+                with self._timer.stage('compact'):
+                    analysis_result['advanced_analysis'] = self.compact_analysis(analysis_result['advanced_analysis'])
+            
+            if cache_key is not None and 'components' in analysis_result['signal_breakdown']:
+                analysis_cache.put(cache_key, analysis_result)
             
             return analysis_result
             
@@ -55,57 +258,171 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"Advanced technical analysis error: {e}")
             return self._get_default_analysis()
     
-    def _perform_advanced_analysis(self, df_1h: pd.DataFrame, df_4h: pd.DataFrame) -> Dict[str, Any]:
-        """Comprehensive multi-timeframe market structure analysis"""
+    def _perform_advanced_analysis(self, df_1h: OHLCV, df_4h: OHLCV, symbol: str = None,
+                                   horizons: List[str] = None, early_exit: bool = True) -> Dict[str, Any]:
+        """
+        Comprehensive multi-timeframe market structure analysis
+        
+        Components run in `evaluation_order`. With `early_exit`, after each one the
+        highest confidence still reachable is bounded for every horizon; once all
+        bounds fall below min_confidence_threshold the remaining components are
+        skipped. The bound is at least 70, so this only happens above the default
+        threshold.
+        """
         try:
-            # 1. Market Structure Analysis (Higher Timeframe Bias)
-            htf_bias = self._analyze_market_structure(df_4h, '4H')
-            ltf_structure = self._analyze_market_structure(df_1h, '1H')
-            
-            # 2. Break of Structure Detection
-            bos_signals = self._detect_break_of_structure(df_1h)
-            
-            # 3. Fair Value Gap Analysis
-            fvg_signals = self._analyze_fair_value_gaps(df_1h)
-            
-            # 4. Support & Resistance Levels
-            sr_levels = self._identify_support_resistance(df_1h)
-            
-            # 5. Demand & Supply Zone Analysis
-            supply_demand = self._analyze_supply_demand_zones(df_1h)
-            
-            # 6. Change of Character Detection
-            choch_signals = self._detect_change_of_character(df_1h)
-            
-            # 7. Traditional Technical Indicators (Supporting Evidence)
-            traditional_indicators = self._calculate_supporting_indicators(df_1h)
-            
-            # 8. Generate Final Prediction
-            prediction = self._generate_advanced_prediction(
-                htf_bias, ltf_structure, bos_signals, fvg_signals, 
-                sr_levels, supply_demand, choch_signals, traditional_indicators, df_1h, df_4h
-            )
+            horizons = list(horizons or self.prediction_horizons)
+            blends = {
+                horizon: self._horizon_profile(horizon)
+                for horizon in dict.fromkeys([self.prediction_timeframe] + horizons)
+            }
+            evaluators = self._component_evaluators(df_1h, df_4h, symbol)
+            details = {}
+            votes = {}  # name -> (direction, strength)
+            pending = list(self.evaluation_order)
+            
+            while pending:
+                name = pending.pop(0)
+                with self._timer.stage(name):
+                    details[name] = evaluators[name]()
+                    vote = self._component_vote(name, details[name], df_1h)
+                if vote:
+                    votes[name] = vote
+                
+                if early_exit and pending:
+                    bounds = {
+                        horizon: self._confidence_upper_bound(votes, pending, blend)
+                        for horizon, blend in blends.items()
+                    }
+                    if max(bounds.values()) < self.min_confidence_threshold:
+                        return self._get_no_setup_analysis(df_1h, details, votes, pending, bounds, horizons)
             
-            return prediction
+            with self._timer.stage('blend'):
+                return self._generate_advanced_prediction(details, votes, df_1h, horizons)
             
         except Exception as e:
             logger.error(f"Advanced analysis error: {e}")
             return self._get_default_analysis()
     
-    def _analyze_market_structure(self, df: pd.DataFrame, timeframe: str) -> Dict[str, Any]:
+    def _component_evaluators(self, df_1h: OHLCV, df_4h: OHLCV, symbol: str = None) -> Dict[str, Any]:
+        """Deferred evaluation of every signal component on this frame, each within its lookback"""
+        views = {}
+        
+        def recent(bars: OHLCV, name: str) -> OHLCV:
+            # One view per (frame, lookback), so components with equal lookbacks share swing points
+            lookback = self.component_lookbacks.get(name)
+            if not lookback or lookback >= len(bars):
+                return bars
+            key = (id(bars), lookback)
+            if key not in views:
+                views[key] = bars.tail(lookback)
+            return views[key]
+        
+        return {
+            'htf_bias': lambda: self._analyze_market_structure(recent(df_4h, 'htf_bias'), '4H'),  # Higher timeframe bias
+            'ltf_structure': lambda: self._analyze_market_structure(recent(df_1h, 'ltf_structure'), '1H'),
+            'bos': lambda: self._detect_break_of_structure(recent(df_1h, 'bos')),
+            'choch': lambda: self._detect_change_of_character(recent(df_1h, 'choch')),
+            'fvg': lambda: self._analyze_fair_value_gaps(recent(df_1h, 'fvg')),
+            'support_resistance': lambda: self._identify_support_resistance(recent(df_1h, 'support_resistance'), symbol),
+            'supply_demand': lambda: self._analyze_supply_demand_zones(recent(df_1h, 'supply_demand')),
+            'order_blocks': lambda: self._analyze_order_blocks(recent(df_1h, 'order_blocks')),
+            'ict_concepts': lambda: self._analyze_ict_concepts(recent(df_1h, 'ict_concepts')),
+            'smart_money': lambda: self._analyze_smart_money_concepts(recent(df_1h, 'smart_money')),
+            'smart_money_divergence': lambda: self._analyze_smart_money_divergence(recent(df_1h, 'smart_money_divergence'), symbol),
+            'qmlr': lambda: self._analyze_qmlr(recent(df_1h, 'qmlr'), recent(df_4h, 'qmlr')),
+            'traditional': lambda: self._calculate_supporting_indicators(recent(df_1h, 'traditional'), symbol),  # Supporting evidence
+        }
+    
+    def _component_vote(self, name: str, detail: Dict[str, Any], bars: OHLCV) -> Tuple[str, float]:
+        """(direction, strength in [0, 1]) of a component that fired, otherwise None"""
+        # Market structure: trend bias of the 4H / 1H frame
+        if name in ('htf_bias', 'ltf_structure'):
+            if detail['bias'] == 'NEUTRAL':
+                return None
+            return ('UP' if detail['bias'] == 'BULLISH' else 'DOWN'), detail['strength']
+        
+        # Structure breaks (BOS, CHoCH)
+        if name in ('bos', 'choch'):
+            if not detail['detected']:
+                return None
+            return ('UP' if detail['type'].startswith('BULLISH') else 'DOWN'), min(detail['strength'], 1.0)
+        
+        # Traditional indicators only confirm
+        if name == 'traditional':
+            signal, strength = self._analyze_traditional_confirmation(detail, bars)
+            return (signal, strength) if signal else None
+        
+        if not detail['signal']:
+            return None
+        direction = 'UP' if detail['signal'] == 'BULLISH' else 'DOWN'
+        
+        if name == 'support_resistance':
+            # Weight based on proximity to level
+            proximity_factor = 1.0 / (min(detail.get('resistance_distance', 1), detail.get('support_distance', 1)) + 0.1)
+            return direction, min(proximity_factor, 1.0)
+        if name in ('fvg', 'supply_demand'):
+            return direction, 1.0
+        return direction, detail['strength']
+    
+    def _horizon_profile(self, horizon: str) -> Dict[str, Dict[str, float]]:
+        """Weights and bonuses used to blend `horizon`"""
+        return self.horizon_profiles.get(horizon, {'weights': self.signal_weights, 'bonuses': self.confidence_bonuses})
+    
+    def _weigh(self, votes: Dict[str, Tuple[str, float]], weights: Dict[str, float]) -> Dict[str, Tuple[str, float]]:
+        """(direction, weight * strength) per firing component, in SIGNAL_WEIGHTS order"""
+        return {name: (votes[name][0], weights[name] * votes[name][1]) for name in SIGNAL_WEIGHTS if name in votes}
+    
+    def _confidence_upper_bound(self, votes: Dict[str, Tuple[str, float]], pending: List[str],
+                                blend: Dict[str, Dict[str, float]]) -> float:
+        """
+        Highest confidence `blend` can still reach if every pending component
+        fires at full strength with the current majority
+        """
+        signals = [signal for signal, _ in votes.values()]
+        majority = max(signals.count('UP'), signals.count('DOWN'))
+        total = len(signals) + len(pending)
+        if total == 0:
+            return 70.0
+        
+        weights, bonuses = blend['weights'], blend['bonuses']
+        consensus_ratio = (majority + len(pending)) / total
+        total_weight = (
+            sum(weights[name] * strength for name, (_, strength) in votes.items())
+            + sum(weights[name] for name in pending)
+        )
+        
+        htf_signal = votes.get('htf_bias', (None, 0))[0]
+        ltf_signal = votes.get('ltf_structure', (None, 0))[0]
+        mtf_possible = (
+            ('htf_bias' in pending and ('ltf_structure' in pending or ltf_signal)) or
+            (htf_signal and ('ltf_structure' in pending or ltf_signal == htf_signal))
+        )
+        structure_possible = any(name in votes or name in pending for name in ('bos', 'choch'))
+        
+        bound = (
+            70.0
+            + (consensus_ratio - 0.5) * bonuses['consensus']
+            + min(total_weight * bonuses['weight_scale'], bonuses['weight_cap'])
+            + (bonuses['mtf'] if mtf_possible else 0)
+            + (bonuses['structure'] if structure_possible else 0)
+        )
+        return float(max(70.0, min(95.0, bound)))
+    
+    def _analyze_market_structure(self, bars: OHLCV, timeframe: str) -> Dict[str, Any]:
         """Analyze overall market structure and trend direction"""
         try:
-            if len(df) < 20:
+            bars = as_bars(bars)
+            if len(bars) < 20:
                 return {'bias': 'NEUTRAL', 'strength': 0, 'trend': 'SIDEWAYS'}
             
             # Calculate swing highs and lows
-            swing_highs, swing_lows = self._identify_swing_points(df)
+            swing_highs, swing_lows = self._identify_swing_points(bars)
             
             # Determine trend direction
-            trend_direction = self._determine_trend_direction(df, swing_highs, swing_lows)
+            trend_direction = self._determine_trend_direction(bars, swing_highs, swing_lows)
             
             # Calculate trend strength
-            trend_strength = self._calculate_trend_strength(df)
+            trend_strength = self._calculate_trend_strength(bars)
             
             # Market structure bias
             if trend_direction == 'BULLISH' and trend_strength > 0.6:
@@ -128,52 +445,59 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"Market structure analysis error: {e}")
             return {'bias': 'NEUTRAL', 'strength': 0, 'trend': 'SIDEWAYS'}
     
-    def _identify_swing_points(self, df: pd.DataFrame, window: int = 5) -> Tuple[List, List]:
-        """Identify swing highs and lows"""
+    def _identify_swing_points(self, bars: OHLCV, window: int = 5) -> Tuple[SwingPoints, SwingPoints]:
+        """Identify swing highs and lows (the last MAX_SWINGS of each)"""
         try:
-            highs = df['high'].values
-            lows = df['low'].values
-            
-            swing_highs = []
-            swing_lows = []
-            
-            for i in range(window, len(df) - window):
-                # Swing High: Current high is higher than surrounding highs
-                if all(highs[i] > highs[j] for j in range(i-window, i)) and \
-                   all(highs[i] > highs[j] for j in range(i+1, i+window+1)):
-                    swing_highs.append({'index': i, 'price': highs[i], 'time': df.index[i]})
-                
-                # Swing Low: Current low is lower than surrounding lows
-                if all(lows[i] < lows[j] for j in range(i-window, i)) and \
-                   all(lows[i] < lows[j] for j in range(i+1, i+window+1)):
-                    swing_lows.append({'index': i, 'price': lows[i], 'time': df.index[i]})
-            
-            return swing_highs[-10:], swing_lows[-10:]  # Keep last 10 swings
+            return self._memoized(('swing_points', window), bars, lambda: self._scan_swing_points(bars, window))
             
         except Exception as e:
             logger.error(f"Swing point identification error: {e}")
-            return [], []
+            return SwingPoints.empty(), SwingPoints.empty()
+    
+    def _scan_swing_points(self, bars: OHLCV, window: int) -> Tuple[SwingPoints, SwingPoints]:
+        """One linear pass over the frame; only the positions of the last swings are kept"""
+        with self._timer.stage('swing_points'):
+            highs = bars.high
+            lows = bars.low
+            
+            # Swing High: high strictly above the `window` highs on each side (Swing Low: strictly below)
+            is_high, is_low = swing_point_masks(highs, lows, window)
+            
+            high_positions = np.flatnonzero(is_high)[-MAX_SWINGS:]
+            low_positions = np.flatnonzero(is_low)[-MAX_SWINGS:]
+            swing_highs = SwingPoints(index=high_positions, price=highs[high_positions],
+                                      time=bars.timestamps[high_positions], tz=bars.tz)
+            swing_lows = SwingPoints(index=low_positions, price=lows[low_positions],
+                                     time=bars.timestamps[low_positions], tz=bars.tz)
+            return swing_highs, swing_lows
     
-    def _determine_trend_direction(self, df: pd.DataFrame, swing_highs: List, swing_lows: List) -> str:
+    def _memoized(self, key: Tuple, bars: OHLCV, compute):
+        """`compute()` once per frame within an analysis (always recomputed outside analyze())"""
+        if self._frame_memo is None:
+            return compute()
+        key = key + (id(bars),)
+        if key not in self._frame_memo:
+            # Keep the frame referenced so its id cannot be reused within the analysis
+            self._frame_memo[key] = (bars, compute())
+        return self._frame_memo[key][1]
+    
+    def _determine_trend_direction(self, bars: OHLCV, swing_highs: SwingPoints, swing_lows: SwingPoints) -> str:
         """Determine overall trend direction based on swing points"""
         try:
             if len(swing_highs) < 2 or len(swing_lows) < 2:
                 return 'SIDEWAYS'
             
-            # Check for Higher Highs and Higher Lows (Bullish)
-            recent_highs = swing_highs[-3:] if len(swing_highs) >= 3 else swing_highs
-            recent_lows = swing_lows[-3:] if len(swing_lows) >= 3 else swing_lows
+            # Steps between the last three swing highs / lows
+            high_steps = np.diff(swing_highs.price[-3:])
+            low_steps = np.diff(swing_lows.price[-3:])
             
-            higher_highs = all(recent_highs[i]['price'] > recent_highs[i-1]['price'] 
-                             for i in range(1, len(recent_highs)))
-            higher_lows = all(recent_lows[i]['price'] > recent_lows[i-1]['price'] 
-                            for i in range(1, len(recent_lows)))
+            # Check for Higher Highs and Higher Lows (Bullish)
+            higher_highs = bool(np.all(high_steps > 0))
+            higher_lows = bool(np.all(low_steps > 0))
             
             # Check for Lower Highs and Lower Lows (Bearish)
-            lower_highs = all(recent_highs[i]['price'] < recent_highs[i-1]['price'] 
-                            for i in range(1, len(recent_highs)))
-            lower_lows = all(recent_lows[i]['price'] < recent_lows[i-1]['price'] 
-                           for i in range(1, len(recent_lows)))
+            lower_highs = bool(np.all(high_steps < 0))
+            lower_lows = bool(np.all(low_steps < 0))
             
             if higher_highs and higher_lows:
                 return 'BULLISH'
@@ -186,25 +510,29 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"Trend direction error: {e}")
             return 'SIDEWAYS'
     
-    def _calculate_trend_strength(self, df: pd.DataFrame) -> float:
+    def _calculate_trend_strength(self, bars: OHLCV) -> float:
         """Calculate trend strength using multiple factors"""
+        return self._memoized(('trend_strength',), bars, lambda: self._trend_strength(bars))
+    
+    def _trend_strength(self, bars: OHLCV) -> float:
+        """ADX, 20-bar momentum and recent volume, combined"""
         try:
             # ADX for trend strength
-            adx = ta.trend.adx(df['high'], df['low'], df['close'], window=14)
-            current_adx = adx.iloc[-1] if not adx.empty else 25
+            adx = kernels.adx(bars.high, bars.low, bars.close, window=14)
+            current_adx = adx[-1] if adx.size else 25
             
             # Normalize ADX to 0-1 scale
             adx_strength = min(current_adx / 50, 1.0)
             
             # Price momentum
-            price_change = (df['close'].iloc[-1] - df['close'].iloc[-20]) / df['close'].iloc[-20]
+            price_change = (bars.close[-1] - bars.close[-20]) / bars.close[-20]
             momentum_strength = min(abs(price_change) * 10, 1.0)
             
             # Volume confirmation (if available)
             volume_strength = 0.5  # Default
-            if 'volume' in df.columns and not df['volume'].empty:
-                recent_volume = df['volume'].tail(5).mean()
-                avg_volume = df['volume'].mean()
+            if bars.volume is not None and len(bars.volume):
+                recent_volume = bars.volume[-5:].mean()
+                avg_volume = bars.volume.mean()
                 volume_strength = min(recent_volume / avg_volume, 2.0) / 2.0
             
             # Combined strength
@@ -215,220 +543,226 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"Trend strength calculation error: {e}")
             return 0.5
     
-    def _detect_break_of_structure(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _detect_break_of_structure(self, bars: OHLCV) -> Dict[str, Any]:
         """Detect Break of Structure (BOS) patterns"""
         try:
-            swing_highs, swing_lows = self._identify_swing_points(df)
+            bars = as_bars(bars)
+            swing_highs, swing_lows = self._identify_swing_points(bars)
             
             if len(swing_highs) < 2 or len(swing_lows) < 2:
                 return {'detected': False, 'type': None, 'strength': 0}
             
-            current_price = df['close'].iloc[-1]
-            
-            # Bullish BOS: Price breaks above recent swing high
-            recent_high = max(swing_highs[-3:], key=lambda x: x['price']) if len(swing_highs) >= 3 else swing_highs[-1]
-            bullish_bos = current_price > recent_high['price'] * 1.001  # 0.1% buffer
+            current_price = bars.close[-1]
             
-            # Bearish BOS: Price breaks below recent swing low
-            recent_low = min(swing_lows[-3:], key=lambda x: x['price']) if len(swing_lows) >= 3 else swing_lows[-1]
-            bearish_bos = current_price < recent_low['price'] * 0.999  # 0.1% buffer
+            # Reference levels: highest of the recent swing highs, lowest of the recent swing lows
+            recent_high = swing_highs.price[-3:].max() if len(swing_highs) >= 3 else swing_highs.price[-1]
+            recent_low = swing_lows.price[-3:].min() if len(swing_lows) >= 3 else swing_lows.price[-1]
             
-            if bullish_bos:
-                strength = min((current_price - recent_high['price']) / recent_high['price'] * 100, 1.0)
-                return {'detected': True, 'type': 'BULLISH_BOS', 'strength': strength}
-            elif bearish_bos:
-                strength = min((recent_low['price'] - current_price) / recent_low['price'] * 100, 1.0)
-                return {'detected': True, 'type': 'BEARISH_BOS', 'strength': strength}
-            
-            return {'detected': False, 'type': None, 'strength': 0}
+            bos = self._bos_signal(current_price, recent_high, recent_low)
+            bos['reference_high'] = recent_high
+            bos['reference_low'] = recent_low
+            return bos
             
         except Exception as e:
             logger.error(f"BOS detection error: {e}")
             return {'detected': False, 'type': None, 'strength': 0}
     
-    def _analyze_fair_value_gaps(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _bos_signal(self, current_price: float, recent_high: float, recent_low: float) -> Dict[str, Any]:
+        """Break of structure of `current_price` against the reference swing levels"""
+        # Bullish BOS: Price breaks above recent swing high
+        if current_price > recent_high * 1.001:  # 0.1% buffer
+            strength = min((current_price - recent_high) / recent_high * 100, 1.0)
+            return {'detected': True, 'type': 'BULLISH_BOS', 'strength': strength}
+        
+        # Bearish BOS: Price breaks below recent swing low
+        if current_price < recent_low * 0.999:  # 0.1% buffer
+            strength = min((recent_low - current_price) / recent_low * 100, 1.0)
+            return {'detected': True, 'type': 'BEARISH_BOS', 'strength': strength}
+        
+        return {'detected': False, 'type': None, 'strength': 0}
+    
+    def _analyze_fair_value_gaps(self, bars: OHLCV) -> Dict[str, Any]:
         """Analyze Fair Value Gaps (FVG) - imbalances in price action"""
         try:
-            if len(df) < 10:
-                return {'gaps': [], 'active_gap': None, 'signal': None}
-            
-            gaps = []
-            current_price = df['close'].iloc[-1]
-            
-            # Look for gaps in recent candles
-            for i in range(2, min(len(df), 50)):  # Check last 50 candles
-                # Bullish FVG: Gap between candle[i-2].low and candle[i].high
-                if df['low'].iloc[i-2] > df['high'].iloc[i]:
-                    gap = {
-                        'type': 'BULLISH_FVG',
-                        'upper': df['low'].iloc[i-2],
-                        'lower': df['high'].iloc[i],
-                        'index': i,
-                        'filled': current_price > df['low'].iloc[i-2]
-                    }
-                    gaps.append(gap)
-                
-                # Bearish FVG: Gap between candle[i].low and candle[i-2].high
-                elif df['high'].iloc[i-2] < df['low'].iloc[i]:
-                    gap = {
-                        'type': 'BEARISH_FVG',
-                        'upper': df['low'].iloc[i],
-                        'lower': df['high'].iloc[i-2],
-                        'index': i,
-                        'filled': current_price < df['high'].iloc[i-2]
-                    }
-                    gaps.append(gap)
-            
-            # Find most relevant unfilled gap
-            unfilled_gaps = [gap for gap in gaps if not gap['filled']]
-            active_gap = None
-            signal = None
-            
-            if unfilled_gaps:
-                # Get closest gap to current price
-                active_gap = min(unfilled_gaps, 
-                               key=lambda g: min(abs(current_price - g['upper']), 
-                                                abs(current_price - g['lower'])))
-                
-                # Generate signal based on gap proximity
-                if active_gap['type'] == 'BULLISH_FVG' and current_price < active_gap['upper']:
-                    signal = 'BULLISH'  # Price likely to move up to fill gap
-                elif active_gap['type'] == 'BEARISH_FVG' and current_price > active_gap['lower']:
-                    signal = 'BEARISH'  # Price likely to move down to fill gap
+            bars = as_bars(bars)
+            if len(bars) < 10:
+                return {'gaps': FairValueGaps.empty(), 'active_gap': None, 'signal': None}
+            
+            highs, lows = bars.high, bars.low
+            current_price = bars.close[-1]
+            
+            # Look for gaps in recent candles: candle i against candle i-2
+            i = np.arange(2, min(len(bars), 50))  # Check last 50 candles
+            # Bullish FVG: Gap between candle[i-2].low and candle[i].high
+            bullish = lows[i-2] > highs[i]
+            # Bearish FVG: Gap between candle[i].low and candle[i-2].high
+            bearish = ~bullish & (highs[i-2] < lows[i])
+            found = bullish | bearish
+            i, bullish = i[found], bullish[found]
+            
+            gaps = FairValueGaps(
+                type=np.where(bullish, 'BULLISH_FVG', 'BEARISH_FVG'),
+                upper=np.where(bullish, lows[i-2], lows[i]),
+                lower=np.where(bullish, highs[i], highs[i-2]),
+                index=i,
+                filled=np.zeros(len(i), dtype=bool)
+            )
             
             return {
+                **self._fvg_signal(gaps, current_price),
                 'gaps': gaps[-5:],  # Keep last 5 gaps
-                'active_gap': active_gap,
-                'signal': signal,
-                'unfilled_count': len(unfilled_gaps)
+                'all_gaps': gaps
             }
             
         except Exception as e:
             logger.error(f"FVG analysis error: {e}")
-            return {'gaps': [], 'active_gap': None, 'signal': None}
+            return {'gaps': FairValueGaps.empty(), 'active_gap': None, 'signal': None}
+    
+    def _fvg_signal(self, gaps: FairValueGaps, current_price: float) -> Dict[str, Any]:
+        """Marks `gaps` filled at `current_price`; the closest unfilled gap and its proximity signal"""
+        bullish = gaps.type == 'BULLISH_FVG'
+        gaps.filled[:] = np.where(bullish, current_price > gaps.upper, current_price < gaps.lower)
+        
+        # Find most relevant unfilled gap
+        unfilled_gaps = gaps[~gaps.filled]
+        active_gap = None
+        signal = None
+        
+        if len(unfilled_gaps):
+            # Get closest gap to current price
+            distance = np.minimum(np.abs(current_price - unfilled_gaps.upper),
+                                  np.abs(current_price - unfilled_gaps.lower))
+            active_gap = unfilled_gaps[int(np.argmin(distance))]
+            
+            # Generate signal based on gap proximity
+            if active_gap.type == 'BULLISH_FVG' and current_price < active_gap.upper:
+                signal = 'BULLISH'  # Price likely to move up to fill gap
+            elif active_gap.type == 'BEARISH_FVG' and current_price > active_gap.lower:
+                signal = 'BEARISH'  # Price likely to move down to fill gap
+        
+        return {'active_gap': active_gap, 'signal': signal, 'unfilled_count': len(unfilled_gaps)}
     
-    def _identify_support_resistance(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Identify key support and resistance levels"""
+    def _identify_support_resistance(self, bars: OHLCV, symbol: str = None) -> Dict[str, Any]:
+        """Identify key support and resistance levels from clustered swing points"""
         try:
-            swing_highs, swing_lows = self._identify_swing_points(df, window=3)
-            current_price = df['close'].iloc[-1]
-            
-            # Extract price levels
-            resistance_levels = [point['price'] for point in swing_highs]
-            support_levels = [point['price'] for point in swing_lows]
+            bars = as_bars(bars)
+            # Per-symbol engines accumulate levels across calls, otherwise cluster this frame only
+            engine = get_level_engine(symbol, '1h') if symbol else SupportResistanceEngine(window=3)
+            engine.update(bars)
+            current_price = float(bars.close[-1])
             
-            # Find nearest levels
-            resistance_above = [r for r in resistance_levels if r > current_price]
-            support_below = [s for s in support_levels if s < current_price]
+            # Nearest levels by bisection over the sorted level prices
+            levels = engine.nearest_levels(current_price)
+            nearest_resistance = levels['nearest_resistance']
+            nearest_support = levels['nearest_support']
             
-            nearest_resistance = min(resistance_above) if resistance_above else None
-            nearest_support = max(support_below) if support_below else None
-            
-            # Calculate distance to levels (as percentage)
-            resistance_distance = ((nearest_resistance - current_price) / current_price * 100) if nearest_resistance else float('inf')
-            support_distance = ((current_price - nearest_support) / current_price * 100) if nearest_support else float('inf')
-            
-            # Generate signals based on proximity to levels
-            signal = None
-            if nearest_support and support_distance < 0.5:  # Within 0.5% of support
-                signal = 'BULLISH'  # Bounce from support expected
-            elif nearest_resistance and resistance_distance < 0.5:  # Within 0.5% of resistance
-                signal = 'BEARISH'  # Rejection from resistance expected
+            resistance_levels, support_levels = engine.levels_around(current_price)
             
             return {
                 'nearest_resistance': nearest_resistance,
                 'nearest_support': nearest_support,
-                'resistance_distance': resistance_distance,
-                'support_distance': support_distance,
-                'signal': signal,
-                'all_resistance': resistance_levels[-5:],
-                'all_support': support_levels[-5:]
+                **self._sr_signal(current_price, nearest_resistance, nearest_support),
+                'resistance_weight': levels['resistance_weight'],
+                'support_weight': levels['support_weight'],
+                'all_resistance': resistance_levels,
+                'all_support': support_levels
             }
             
         except Exception as e:
             logger.error(f"Support/Resistance identification error: {e}")
             return {'nearest_resistance': None, 'nearest_support': None, 'signal': None}
     
-    def _analyze_supply_demand_zones(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _sr_signal(self, current_price: float, nearest_resistance: float, nearest_support: float) -> Dict[str, Any]:
+        """Distance (percent) of `current_price` to the nearest levels and the proximity signal"""
+        resistance_distance = ((nearest_resistance - current_price) / current_price * 100) if nearest_resistance else float('inf')
+        support_distance = ((current_price - nearest_support) / current_price * 100) if nearest_support else float('inf')
+        
+        # Generate signals based on proximity to levels
+        signal = None
+        if nearest_support and support_distance < 0.5:  # Within 0.5% of support
+            signal = 'BULLISH'  # Bounce from support expected
+        elif nearest_resistance and resistance_distance < 0.5:  # Within 0.5% of resistance
+            signal = 'BEARISH'  # Rejection from resistance expected
+        
+        return {'resistance_distance': resistance_distance, 'support_distance': support_distance, 'signal': signal}
+    
+    def _analyze_supply_demand_zones(self, bars: OHLCV) -> Dict[str, Any]:
         """Analyze supply and demand zones"""
         try:
-            zones = []
-            current_price = df['close'].iloc[-1]
-            
-            # Look for strong moves that create zones
-            for i in range(10, len(df) - 5):
-                # Strong bullish move (demand zone creation)
-                if (df['close'].iloc[i] - df['open'].iloc[i]) / df['open'].iloc[i] > 0.01:  # 1% move
-                    zone = {
-                        'type': 'DEMAND',
-                        'upper': df['high'].iloc[i-2:i+1].max(),
-                        'lower': df['low'].iloc[i-2:i+1].min(),
-                        'strength': (df['close'].iloc[i] - df['open'].iloc[i]) / df['open'].iloc[i],
-                        'index': i
-                    }
-                    zones.append(zone)
-                
-                # Strong bearish move (supply zone creation)
-                elif (df['open'].iloc[i] - df['close'].iloc[i]) / df['open'].iloc[i] > 0.01:  # 1% move
-                    zone = {
-                        'type': 'SUPPLY',
-                        'upper': df['high'].iloc[i-2:i+1].max(),
-                        'lower': df['low'].iloc[i-2:i+1].min(),
-                        'strength': (df['open'].iloc[i] - df['close'].iloc[i]) / df['open'].iloc[i],
-                        'index': i
-                    }
-                    zones.append(zone)
-            
-            # Find active zones (price is near them)
-            active_zones = []
-            for zone in zones[-10:]:  # Check last 10 zones
-                if zone['lower'] <= current_price <= zone['upper']:
-                    active_zones.append(zone)
+            bars = as_bars(bars)
+            opens, highs, lows, closes = bars.open, bars.high, bars.low, bars.close
+            current_price = closes[-1]
+            
+            # Strong moves (1% bodies) create zones: bullish -> demand, bearish -> supply
+            rise = (closes - opens) / opens
+            fall = (opens - closes) / opens
+            demand = rise > 0.01
+            candidates = np.flatnonzero((demand | (fall > 0.01))[10:max(len(bars) - 5, 10)]) + 10
+            
+            # Only the most recent zones can be active; older ones are just counted
+            i = candidates[-MAX_ZONES:]
+            zones = SupplyDemandZones(
+                type=np.where(demand[i], 'DEMAND', 'SUPPLY'),
+                upper=np.maximum.reduce([highs[i-2], highs[i-1], highs[i]]),
+                lower=np.minimum.reduce([lows[i-2], lows[i-1], lows[i]]),
+                strength=np.where(demand[i], rise[i], fall[i]),
+                index=i
+            )
             
-            # Generate signal
-            signal = None
-            if active_zones:
-                strongest_zone = max(active_zones, key=lambda z: z['strength'])
-                if strongest_zone['type'] == 'DEMAND':
-                    signal = 'BULLISH'
-                elif strongest_zone['type'] == 'SUPPLY':
-                    signal = 'BEARISH'
+            # Only the last 10 zones can be active
+            recent_zones = zones[-10:]
             
             return {
+                **self._zone_signal(recent_zones, current_price),
                 'zones': zones[-5:],
-                'active_zones': active_zones,
-                'signal': signal,
-                'zone_count': len(zones)
+                'recent_zones': recent_zones,
+                'zone_count': int(candidates.size)
             }
             
         except Exception as e:
             logger.error(f"Supply/Demand analysis error: {e}")
-            return {'zones': [], 'active_zones': [], 'signal': None}
+            return {'zones': SupplyDemandZones.empty(), 'active_zones': SupplyDemandZones.empty(), 'signal': None}
+    
+    def _zone_signal(self, recent_zones: SupplyDemandZones, current_price: float) -> Dict[str, Any]:
+        """Zones containing `current_price` and the signal of the strongest one"""
+        # Find active zones (price is near them)
+        active_zones = recent_zones[(recent_zones.lower <= current_price) & (current_price <= recent_zones.upper)]
+        
+        # Generate signal
+        signal = None
+        if len(active_zones):
+            strongest_zone = active_zones[int(np.argmax(active_zones.strength))]
+            if strongest_zone.type == 'DEMAND':
+                signal = 'BULLISH'
+            elif strongest_zone.type == 'SUPPLY':
+                signal = 'BEARISH'
+        
+        return {'active_zones': active_zones, 'signal': signal}
     
-    def _detect_change_of_character(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _detect_change_of_character(self, bars: OHLCV) -> Dict[str, Any]:
         """Detect Change of Character (CHoCH) - trend reversal signals"""
         try:
-            swing_highs, swing_lows = self._identify_swing_points(df)
+            swing_highs, swing_lows = self._identify_swing_points(as_bars(bars))
             
             if len(swing_highs) < 3 or len(swing_lows) < 3:
                 return {'detected': False, 'type': None, 'strength': 0}
             
             # Bullish CHoCH: Break of previous lower high
-            recent_highs = swing_highs[-3:]
+            recent_highs = swing_highs.price[-3:]
             if len(recent_highs) >= 2:
-                if recent_highs[-1]['price'] > recent_highs[-2]['price']:
+                if recent_highs[-1] > recent_highs[-2]:
                     # Check if this breaks the pattern of lower highs
-                    if len(recent_highs) >= 3 and recent_highs[-2]['price'] < recent_highs[-3]['price']:
-                        strength = (recent_highs[-1]['price'] - recent_highs[-2]['price']) / recent_highs[-2]['price']
+                    if len(recent_highs) >= 3 and recent_highs[-2] < recent_highs[-3]:
+                        strength = (recent_highs[-1] - recent_highs[-2]) / recent_highs[-2]
                         return {'detected': True, 'type': 'BULLISH_CHOCH', 'strength': strength}
             
             # Bearish CHoCH: Break of previous higher low
-            recent_lows = swing_lows[-3:]
+            recent_lows = swing_lows.price[-3:]
             if len(recent_lows) >= 2:
-                if recent_lows[-1]['price'] < recent_lows[-2]['price']:
+                if recent_lows[-1] < recent_lows[-2]:
                     # Check if this breaks the pattern of higher lows
-                    if len(recent_lows) >= 3 and recent_lows[-2]['price'] > recent_lows[-3]['price']:
-                        strength = (recent_lows[-2]['price'] - recent_lows[-1]['price']) / recent_lows[-2]['price']
+                    if len(recent_lows) >= 3 and recent_lows[-2] > recent_lows[-3]:
+                        strength = (recent_lows[-2] - recent_lows[-1]) / recent_lows[-2]
                         return {'detected': True, 'type': 'BEARISH_CHOCH', 'strength': strength}
             
             return {'detected': False, 'type': None, 'strength': 0}
@@ -437,39 +771,46 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"CHoCH detection error: {e}")
             return {'detected': False, 'type': None, 'strength': 0}
     
-    def _calculate_supporting_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_supporting_indicators(self, bars: OHLCV, symbol: str = None) -> Dict[str, Any]:
         """Calculate supporting technical indicators for confirmation"""
         indicators = {}
         
         try:
-            close = df['close']
-            high = df['high']
-            low = df['low']
-            volume = df.get('volume', pd.Series([1000] * len(df)))
+            bars = as_bars(bars)
+            # Per-symbol cache: unchanged candles cost nothing, new candles extend the series
+            if symbol:
+                return indicator_cache.get_indicators(symbol, '1h', bars)
             
-            # Key Moving Averages for trend confirmation
-            indicators['ema_21'] = ta.trend.ema_indicator(close, window=21)
-            indicators['ema_50'] = ta.trend.ema_indicator(close, window=50)
-            indicators['sma_200'] = ta.trend.sma_indicator(close, window=min(200, len(df)))
+            close = bars.close
+            high = bars.high
+            low = bars.low
+            volume = bars.volume if bars.volume is not None else np.full(len(bars), 1000.0)
+            
+            def series(values):
+                return pd.Series(values, index=bars.index)
             
-            # RSI for momentum
-            indicators['rsi'] = ta.momentum.rsi(close, window=14)
+            # Key Moving Averages for trend confirmation
+            indicators['ema_21'] = series(kernels.ema(close, 21))
+            indicators['ema_50'] = series(kernels.ema(close, 50))
+            indicators['sma_200'] = series(kernels.sma(close, min(200, len(bars))))
             
-            # MACD for trend confirmation
-            indicators['macd'] = ta.trend.macd(close)
-            indicators['macd_signal'] = ta.trend.macd_signal(close)
+            # RSI for momentum, MACD for trend confirmation (shared with the divergence engine)
+            oscillators = self._oscillator_arrays(bars)
+            indicators['rsi'] = series(oscillators['rsi'])
+            indicators['macd'] = series(oscillators['macd'])
+            indicators['macd_signal'] = series(oscillators['macd_signal'])
             
             # Stochastic for entry timing
-            indicators['stoch_k'] = ta.momentum.stoch(high, low, close, window=14)
+            indicators['stoch_k'] = series(kernels.stoch_k(high, low, close, 14))
             
             # ADX for trend strength
-            indicators['adx'] = ta.trend.adx(high, low, close, window=14)
+            indicators['adx'] = series(kernels.adx(high, low, close, 14))
             
             # ATR for volatility
-            indicators['atr'] = ta.volatility.average_true_range(high, low, close, window=14)
+            indicators['atr'] = series(kernels.atr(high, low, close, 14))
             
             # Volume analysis (using simple moving average)
-            indicators['volume_sma'] = volume.rolling(window=20).mean()
+            indicators['volume_sma'] = series(kernels.sma(volume, 20))
             
             return indicators
             
@@ -477,8 +818,8 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"Supporting indicators calculation error: {e}")
             return {}
     
-    def _generate_advanced_prediction(self, htf_bias, ltf_structure, bos_signals, fvg_signals, 
-                                    sr_levels, supply_demand, choch_signals, traditional_indicators, df, df_4h) -> Dict[str, Any]:
+    def _generate_advanced_prediction(self, details: Dict[str, Any], votes: Dict[str, Tuple[str, float]],
+                                    bars: OHLCV, horizons: List[str] = None) -> Dict[str, Any]:
         """
         Generate advanced 5-minute direction prediction using professional trading analysis
         
@@ -490,193 +831,16 @@ class AdvancedTechnicalAnalyzer:
         5. Traditional Indicators (confirmation)
         """
         try:
-            current_price = float(df['close'].iloc[-1])
-            signals = []
-            confidence_weights = []
-            analysis_details = {}
-            
-            # 1. HIGHER TIMEFRAME BIAS (Highest Weight - 30%)
-            htf_signal = None
-            htf_weight = 0
-            
-            if htf_bias['bias'] == 'BULLISH':
-                htf_signal = 'UP'
-                htf_weight = 0.30 * htf_bias['strength']
-            elif htf_bias['bias'] == 'BEARISH':
-                htf_signal = 'DOWN'
-                htf_weight = 0.30 * htf_bias['strength']
-            else:
-                htf_signal = 'NEUTRAL'
-                htf_weight = 0.10
-            
-            if htf_signal != 'NEUTRAL':
-                signals.append(htf_signal)
-                confidence_weights.append(htf_weight)
-            
-            analysis_details['htf_bias'] = htf_bias
-            
-            # 2. BREAK OF STRUCTURE ANALYSIS (25%)
-            if bos_signals['detected']:
-                bos_direction = 'UP' if bos_signals['type'] == 'BULLISH_BOS' else 'DOWN'
-                bos_weight = 0.25 * min(bos_signals['strength'], 1.0)
-                signals.append(bos_direction)
-                confidence_weights.append(bos_weight)
-            
-            analysis_details['bos'] = bos_signals
-            
-            # 3. CHANGE OF CHARACTER ANALYSIS (20%)
-            if choch_signals['detected']:
-                choch_direction = 'UP' if choch_signals['type'] == 'BULLISH_CHOCH' else 'DOWN'
-                choch_weight = 0.20 * min(choch_signals['strength'], 1.0)
-                signals.append(choch_direction)
-                confidence_weights.append(choch_weight)
-            
-            analysis_details['choch'] = choch_signals
-            
-            # 4. FAIR VALUE GAP ANALYSIS (15%)
-            if fvg_signals['signal']:
-                fvg_direction = 'UP' if fvg_signals['signal'] == 'BULLISH' else 'DOWN'
-                fvg_weight = 0.15
-                signals.append(fvg_direction)
-                confidence_weights.append(fvg_weight)
-            
-            analysis_details['fvg'] = fvg_signals
-            
-            # 5. SUPPORT/RESISTANCE LEVELS (15%)
-            if sr_levels['signal']:
-                sr_direction = 'UP' if sr_levels['signal'] == 'BULLISH' else 'DOWN'
-                # Weight based on proximity to level
-                proximity_factor = 1.0 / (min(sr_levels.get('resistance_distance', 1), 
-                                             sr_levels.get('support_distance', 1)) + 0.1)
-                sr_weight = 0.15 * min(proximity_factor, 1.0)
-                signals.append(sr_direction)
-                confidence_weights.append(sr_weight)
-            
-            analysis_details['support_resistance'] = sr_levels
-            
-            # 6. SUPPLY/DEMAND ZONES (10%)
-            if supply_demand['signal']:
-                sd_direction = 'UP' if supply_demand['signal'] == 'BULLISH' else 'DOWN'
-                sd_weight = 0.10
-                signals.append(sd_direction)
-                confidence_weights.append(sd_weight)
-            
-            analysis_details['supply_demand'] = supply_demand
-            
-            # 7. ORDER BLOCK ANALYSIS (12%)
-            order_block_signals = self._analyze_order_blocks(df_1h)
-            if order_block_signals['signal']:
-                ob_direction = 'UP' if order_block_signals['signal'] == 'BULLISH' else 'DOWN'
-                ob_weight = 0.12 * order_block_signals['strength']
-                signals.append(ob_direction)
-                confidence_weights.append(ob_weight)
-            
-            analysis_details['order_blocks'] = order_block_signals
-            
-            # 8. ICT CONCEPTS ANALYSIS (10%)
-            ict_signals = self._analyze_ict_concepts(df_1h)
-            if ict_signals['signal']:
-                ict_direction = 'UP' if ict_signals['signal'] == 'BULLISH' else 'DOWN'
-                ict_weight = 0.10 * ict_signals['strength']
-                signals.append(ict_direction)
-                confidence_weights.append(ict_weight)
-            
-            analysis_details['ict_concepts'] = ict_signals
-            
-            # 9. SMART MONEY CONCEPTS (8%)
-            smc_signals = self._analyze_smart_money_concepts(df_1h)
-            if smc_signals['signal']:
-                smc_direction = 'UP' if smc_signals['signal'] == 'BULLISH' else 'DOWN'
-                smc_weight = 0.08 * smc_signals['strength']
-                signals.append(smc_direction)
-                confidence_weights.append(smc_weight)
-            
-            analysis_details['smart_money'] = smc_signals
-            
-            # 10. SMART MONEY DIVERGENCE (7%)
-            smd_signals = self._analyze_smart_money_divergence(df_1h)
-            if smd_signals['signal']:
-                smd_direction = 'UP' if smd_signals['signal'] == 'BULLISH' else 'DOWN'
-                smd_weight = 0.07 * smd_signals['strength']
-                signals.append(smd_direction)
-                confidence_weights.append(smd_weight)
-            
-            analysis_details['smart_money_divergence'] = smd_signals
-            
-            # 11. QMLR ANALYSIS (8%)
-            qmlr_signals = self._analyze_qmlr(df_1h, df_4h)
-            if qmlr_signals['signal']:
-                qmlr_direction = 'UP' if qmlr_signals['signal'] == 'BULLISH' else 'DOWN'
-                qmlr_weight = 0.08 * qmlr_signals['strength']
-                signals.append(qmlr_direction)
-                confidence_weights.append(qmlr_weight)
-            
-            analysis_details['qmlr'] = qmlr_signals
-            
-            # 12. TRADITIONAL INDICATORS CONFIRMATION (5%)
-            traditional_signal, traditional_weight = self._analyze_traditional_confirmation(traditional_indicators, df)
-            if traditional_signal:
-                signals.append(traditional_signal)
-                confidence_weights.append(traditional_weight * 0.05)
-            
-            analysis_details['traditional'] = traditional_indicators
-            
-            # 8. MARKET STRUCTURE CONFLUENCE
-            ltf_signal = None
-            if ltf_structure['bias'] != 'NEUTRAL':
-                ltf_signal = 'UP' if ltf_structure['bias'] == 'BULLISH' else 'DOWN'
-                ltf_weight = 0.05 * ltf_structure['strength']
-                signals.append(ltf_signal)
-                confidence_weights.append(ltf_weight)
-            
-            analysis_details['ltf_structure'] = ltf_structure
+            current_price = float(bars.close[-1])
+            analysis_details = {name: details[name] for name in SIGNAL_WEIGHTS}
+            blend = self._horizon_profile(self.prediction_timeframe)
+            components = self._weigh(votes, blend['weights'])  # name -> (direction, weight)
             
             # PREDICTION LOGIC
-            if not signals:
-                # Fallback to basic trend analysis
-                if len(df) >= 5:
-                    recent_trend = (df['close'].iloc[-1] - df['close'].iloc[-5]) / df['close'].iloc[-5]
-                    direction = 'UP' if recent_trend > 0 else 'DOWN'
-                    confidence = 70.0
-                else:
-                    direction = 'UP'
-                    confidence = 70.0
-            else:
-                # Count signals
-                up_signals = signals.count('UP')
-                down_signals = signals.count('DOWN')
-                
-                # Determine direction
-                if up_signals > down_signals:
-                    direction = 'UP'
-                elif down_signals > up_signals:
-                    direction = 'DOWN'
-                else:
-                    # Tie-breaker: use HTF bias
-                    direction = htf_signal if htf_signal != 'NEUTRAL' else 'UP'
-                
-                # Calculate confidence based on signal strength and confluence
-                base_confidence = 70.0
-                
-                # Signal consensus bonus
-                total_signals = len(signals)
-                consensus_ratio = max(up_signals, down_signals) / total_signals if total_signals > 0 else 0.5
-                consensus_bonus = (consensus_ratio - 0.5) * 40  # Up to 20 points bonus
-                
-                # Weight-based confidence
-                total_weight = sum(confidence_weights)
-                weight_bonus = min(total_weight * 30, 20)  # Up to 20 points from weights
-                
-                # Multiple timeframe confirmation
-                mtf_bonus = 5 if htf_bias['bias'] != 'NEUTRAL' and ltf_structure['bias'] == htf_bias['bias'] else 0
-                
-                # Structure confirmation bonus
-                structure_bonus = 0
-                if bos_signals['detected'] or choch_signals['detected']:
-                    structure_bonus = 5
-                
-                confidence = base_confidence + consensus_bonus + weight_bonus + mtf_bonus + structure_bonus
-                confidence = max(70.0, min(95.0, confidence))  # Cap between 70-95%
+            # Fallback to basic trend analysis when no component fires
+            fallback = {'reference_close': float(bars.close[-5]) if len(bars) >= 5 else None}
+            fallback_direction = fallback['direction'] = self._fallback_direction(current_price, fallback['reference_close'])
+            direction, confidence = self._blend_signals(components, fallback_direction, blend['bonuses'])
             
             # Check if prediction meets professional standards
             meets_threshold = confidence >= self.min_confidence_threshold
@@ -688,25 +852,21 @@ class AdvancedTechnicalAnalyzer:
                 'current_price': current_price,
                 'prediction_timeframe': self.prediction_timeframe,
                 'analysis_timeframes': self.analysis_timeframes,
-                'signal_breakdown': {
-                    'up_signals': signals.count('UP'),
-                    'down_signals': signals.count('DOWN'),
-                    'total_signals': len(signals),
-                    'signal_weights': confidence_weights
-                },
+                'signal_breakdown': self._signal_breakdown(votes, components, fallback),
+                'horizons': self._blend_horizons(votes, fallback_direction, horizons or self.prediction_horizons),
                 'advanced_analysis': analysis_details,
                 'confluence_factors': {
-                    'htf_ltf_alignment': htf_bias['bias'] == ltf_structure['bias'],
-                    'structure_signals': bos_signals['detected'] or choch_signals['detected'],
-                    'liquidity_signals': fvg_signals['signal'] is not None,
-                    'level_proximity': sr_levels['signal'] is not None
+                    'htf_ltf_alignment': details['htf_bias']['bias'] == details['ltf_structure']['bias'],
+                    'structure_signals': details['bos']['detected'] or details['choch']['detected'],
+                    'liquidity_signals': details['fvg']['signal'] is not None,
+                    'level_proximity': details['support_resistance']['signal'] is not None
                 }
             }
             
         except Exception as e:
             logger.error(f"Advanced prediction generation error: {e}")
             # Fallback prediction
-            current_price = float(df['close'].iloc[-1]) if not df.empty else 1.0
+            current_price = float(bars.close[-1]) if not bars.empty else 1.0
             return {
                 'direction': 'UP',
                 'confidence': 70.0,
@@ -719,11 +879,207 @@ class AdvancedTechnicalAnalyzer:
                 'confluence_factors': {}
             }
     
-    def _analyze_traditional_confirmation(self, indicators: Dict[str, Any], df: pd.DataFrame) -> Tuple[str, float]:
+    def _fallback_direction(self, current_price: float, reference_close: float = None) -> str:
+        """Direction of the move from the close 4 bars back, used when no component fires"""
+        if reference_close is None:
+            return 'UP'
+        return 'UP' if current_price > reference_close else 'DOWN'
+    
+    def _blend_signals(self, components: Dict[str, Tuple[str, float]], fallback_direction: str,
+                       bonuses: Dict[str, float] = None) -> Tuple[str, float]:
+        """
+        Direction and confidence from the firing components
+        
+        `components` maps component name to (direction, weight) for every component
+        that produced a signal. With no signals the fallback direction is used at
+        base confidence.
+        """
+        if not components:
+            return fallback_direction, 70.0
+        
+        signals = [signal for signal, _ in components.values()]
+        up_signals = signals.count('UP')
+        down_signals = signals.count('DOWN')
+        
+        # Determine direction
+        if up_signals > down_signals:
+            direction = 'UP'
+        elif down_signals > up_signals:
+            direction = 'DOWN'
+        else:
+            # Tie-breaker: use HTF bias
+            direction = components['htf_bias'][0] if 'htf_bias' in components else 'UP'
+        
+        # Calculate confidence based on signal strength and confluence
+        base_confidence = 70.0
+        bonuses = bonuses or self.confidence_bonuses
+        
+        # Signal consensus bonus
+        consensus_ratio = max(up_signals, down_signals) / len(signals)
+        consensus_bonus = (consensus_ratio - 0.5) * bonuses['consensus']
+        
+        # Weight-based confidence
+        total_weight = sum(weight for _, weight in components.values())
+        weight_bonus = min(total_weight * bonuses['weight_scale'], bonuses['weight_cap'])
+        
+        # Multiple timeframe confirmation (HTF bias and LTF structure agree)
+        htf_signal = components.get('htf_bias', (None, 0))[0]
+        mtf_bonus = bonuses['mtf'] if htf_signal and components.get('ltf_structure', (None, 0))[0] == htf_signal else 0
+        
+        # Structure confirmation bonus
+        structure_bonus = bonuses['structure'] if 'bos' in components or 'choch' in components else 0
+        
+        confidence = base_confidence + consensus_bonus + weight_bonus + mtf_bonus + structure_bonus
+        return direction, float(max(70.0, min(95.0, confidence)))  # Cap between 70-95%
+    
+    def _blend_horizons(self, votes: Dict[str, Tuple[str, float]], fallback_direction: str,
+                        horizons: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Direction and confidence per prediction horizon from one set of component votes"""
+        results = {}
+        for horizon in horizons:
+            blend = self._horizon_profile(horizon)
+            direction, confidence = self._blend_signals(
+                self._weigh(votes, blend['weights']), fallback_direction, blend['bonuses']
+            )
+            results[horizon] = {
+                'direction': direction,
+                'confidence': round(confidence, 1),
+                'meets_threshold': confidence >= self.min_confidence_threshold
+            }
+        return results
+    
+    def _signal_breakdown(self, votes: Dict[str, Tuple[str, float]], components: Dict[str, Tuple[str, float]],
+                          fallback: Dict[str, Any]) -> Dict[str, Any]:
+        """Signal counts plus per-component direction, strength and primary-horizon weight, and the fallback"""
+        signals = [signal for signal, _ in components.values()]
+        return {
+            'up_signals': signals.count('UP'),
+            'down_signals': signals.count('DOWN'),
+            'total_signals': len(signals),
+            'signal_weights': [float(weight) for _, weight in components.values()],
+            'components': {
+                name: {'direction': signal, 'strength': float(votes[name][1]), 'weight': float(weight)}
+                for name, (signal, weight) in components.items()
+            },
+            'fallback': fallback
+        }
+    
+    def refresh_analysis(self, analysis: Dict[str, Any], current_price: float, symbol: str = None,
+                         horizons: List[str] = None) -> Dict[str, Any]:
+        """
+        Re-evaluate the price-dependent parts of a compact analysis at `current_price`
+        
+        Every vote that depends on where the price sits against stored levels is
+        re-priced: break of structure, support/resistance proximity, filled and
+        unfilled fair value gaps, supply/demand and order block proximity, the
+        ICT liquidity grab, the EMA position of the traditional confirmation and
+        the fallback direction. The blend is then recomputed for `horizons`
+        (default: the stored ones). Votes read from candles alone (structure,
+        CHoCH, SMC, divergences, QMLR, indicator values) keep their stored signal
+        until the next candle closes. With `symbol`, nearest levels come from the
+        symbol's level engine.
+        """
+        try:
+            refreshed = copy.deepcopy(analysis)
+            refreshed['current_price'] = float(current_price)
+            
+            breakdown = refreshed.get('signal_breakdown', {})
+            details = refreshed.get('advanced_analysis', {})
+            if 'components' not in breakdown:
+                return refreshed
+            
+            votes = {name: (item['direction'], item['strength']) for name, item in breakdown['components'].items()}
+            
+            def revote(name, detail):
+                votes.pop(name, None)
+                vote = self._component_vote(name, detail, None)
+                if vote:
+                    votes[name] = vote
+            
+            bos = details.get('bos')
+            if bos and bos.get('reference_high') is not None and bos.get('reference_low') is not None:
+                bos.update(self._bos_signal(current_price, bos['reference_high'], bos['reference_low']))
+                revote('bos', bos)
+            
+            sr_levels = details.get('support_resistance')
+            if sr_levels is not None:
+                if symbol:
+                    engine = get_level_engine(symbol, '1h')
+                    if engine.has_levels():
+                        sr_levels.update(engine.nearest_levels(current_price))
+                sr = self._sr_signal(current_price, sr_levels.get('nearest_resistance'), sr_levels.get('nearest_support'))
+                revote('support_resistance', sr)
+                sr_levels.update({
+                    key: (value if not isinstance(value, float) or np.isfinite(value) else None)
+                    for key, value in sr.items()
+                })
+            
+            fvg = details.get('fvg')
+            if fvg and 'gaps' in fvg:
+                gaps = FairValueGaps.from_json(fvg['gaps'])
+                fvg_signal = self._fvg_signal(gaps, current_price)
+                fvg.update(self._compact_fvg(fvg_signal, gaps))
+                revote('fvg', fvg)
+            
+            supply_demand = details.get('supply_demand')
+            if supply_demand and 'recent_zones' in supply_demand:
+                zone_signal = self._zone_signal(SupplyDemandZones.from_json(supply_demand['recent_zones']), current_price)
+                supply_demand.update(signal=zone_signal['signal'], active_zone_count=len(zone_signal['active_zones']))
+                revote('supply_demand', supply_demand)
+            
+            order_blocks = details.get('order_blocks')
+            if order_blocks and 'recent_blocks' in order_blocks:
+                block_signal = self._order_block_signal(OrderBlocks.from_json(order_blocks['recent_blocks']), current_price)
+                order_blocks.update(signal=block_signal['signal'], strength=float(block_signal['strength']),
+                                    active_block_count=len(block_signal['active_blocks']))
+                revote('order_blocks', order_blocks)
+            
+            ict = details.get('ict_concepts')
+            if ict and 'previous_close' in ict:
+                ict.update(self._liquidity_grab_signal(current_price, ict.get('recent_high'), ict.get('recent_low'),
+                                                       ict['previous_close']))
+                revote('ict_concepts', ict)
+            
+            traditional = details.get('traditional')
+            if traditional:
+                signal, strength = self._traditional_vote(traditional, current_price)
+                votes.pop('traditional', None)
+                if signal:
+                    votes['traditional'] = (signal, strength)
+            
+            fallback = breakdown.get('fallback')
+            if fallback:
+                fallback['direction'] = self._fallback_direction(current_price, fallback.get('reference_close'))
+                fallback_direction = fallback['direction']
+            else:
+                fallback_direction = refreshed['direction']
+            
+            blend = self._horizon_profile(self.prediction_timeframe)
+            components = self._weigh(votes, blend['weights'])
+            direction, confidence = self._blend_signals(components, fallback_direction, blend['bonuses'])
+            
+            refreshed['direction'] = direction
+            refreshed['confidence'] = round(confidence, 1)
+            refreshed['meets_threshold'] = confidence >= self.min_confidence_threshold
+            refreshed['signal_breakdown'] = self._signal_breakdown(votes, components, fallback)
+            refreshed['horizons'] = self._blend_horizons(
+                votes, fallback_direction, horizons or list(refreshed.get('horizons') or self.prediction_horizons)
+            )
+            confluence = refreshed.get('confluence_factors', {})
+            confluence['structure_signals'] = 'bos' in components or 'choch' in components
+            confluence['liquidity_signals'] = bool(fvg and fvg.get('signal') is not None)
+            confluence['level_proximity'] = 'support_resistance' in components
+            
+            return refreshed
+            
+        except Exception as e:
+            logger.error(f"Analysis refresh error: {e}")
+            return analysis
+    
+    def _analyze_traditional_confirmation(self, indicators: Dict[str, Any], bars: OHLCV) -> Tuple[str, float]:
         """Analyze traditional indicators for confirmation"""
         try:
-            signals = []
-            current_price = df['close'].iloc[-1]
+            current_price = as_bars(bars).close[-1]
             
             # Helper function
             def safe_get(indicator_name, default=0):
@@ -735,24 +1091,41 @@ class AdvancedTechnicalAnalyzer:
                 except:
                     return default
             
+            return self._traditional_vote(
+                {name: safe_get(name, None) for name in ('rsi', 'macd', 'macd_signal', 'ema_21', 'ema_50', 'stoch_k')},
+                current_price
+            )
+                
+        except Exception as e:
+            logger.error(f"Traditional confirmation analysis error: {e}")
+            return None, 0
+    
+    def _traditional_vote(self, latest: Dict[str, float], current_price: float) -> Tuple[str, float]:
+        """Consensus of the latest indicator values (None when unavailable) at `current_price`"""
+        try:
+            signals = []
+            
+            def value(name, default):
+                return default if latest.get(name) is None else latest[name]
+            
             # RSI analysis
-            rsi = safe_get('rsi', 50)
+            rsi = value('rsi', 50)
             if rsi < 30:
                 signals.append('UP')
             elif rsi > 70:
                 signals.append('DOWN')
             
             # MACD analysis
-            macd = safe_get('macd', 0)
-            macd_signal = safe_get('macd_signal', 0)
+            macd = value('macd', 0)
+            macd_signal = value('macd_signal', 0)
             if macd > macd_signal:
                 signals.append('UP')
             else:
                 signals.append('DOWN')
             
             # EMA analysis
-            ema_21 = safe_get('ema_21', current_price)
-            ema_50 = safe_get('ema_50', current_price)
+            ema_21 = value('ema_21', current_price)
+            ema_50 = value('ema_50', current_price)
             
             if current_price > ema_21 > ema_50:
                 signals.append('UP')
@@ -760,7 +1133,7 @@ class AdvancedTechnicalAnalyzer:
                 signals.append('DOWN')
             
             # Stochastic
-            stoch = safe_get('stoch_k', 50)
+            stoch = value('stoch_k', 50)
             if stoch < 20:
                 signals.append('UP')
             elif stoch > 80:
@@ -806,127 +1179,258 @@ class AdvancedTechnicalAnalyzer:
 
 
 
-    def _analyze_order_blocks(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def compact_analysis(self, details: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce full component detail to latest scalar values and summary fields
+        
+        The result only holds JSON-native types (NaN/inf become None), so it can be
+        returned and stored without a recursive clean-up pass.
+        """
+        def scalar(value):
+            if value is None or isinstance(value, (bool, str)):
+                return value
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return None
+            return value if np.isfinite(value) else None
+        
+        def structure(data):
+            swing_highs = data.get('swing_highs', [])
+            swing_lows = data.get('swing_lows', [])
+            return {
+                'bias': data.get('bias'),
+                'trend': data.get('trend'),
+                'strength': scalar(data.get('strength')),
+                'timeframe': data.get('timeframe'),
+                'swing_high_count': len(swing_highs),
+                'swing_low_count': len(swing_lows),
+                'last_swing_high': scalar(swing_highs.price[-1]) if len(swing_highs) else None,
+                'last_swing_low': scalar(swing_lows.price[-1]) if len(swing_lows) else None
+            }
+        
+        def signal_fields(data, *keys):
+            return {key: scalar(data.get(key)) for key in keys if key in data}
+        
+        try:
+            if not details:
+                return {}
+            
+            compact = {}
+            
+            if 'htf_bias' in details:
+                compact['htf_bias'] = structure(details['htf_bias'])
+            if 'ltf_structure' in details:
+                compact['ltf_structure'] = structure(details['ltf_structure'])
+            
+            for key in ('bos', 'choch'):
+                if key in details:
+                    compact[key] = signal_fields(details[key], 'detected', 'type', 'strength',
+                                                 'reference_high', 'reference_low')
+            
+            # Zones are kept with their signals so refresh_analysis can re-price them
+            if 'fvg' in details:
+                compact['fvg'] = self._compact_fvg(details['fvg'], details['fvg'].get('all_gaps'))
+            
+            if 'support_resistance' in details:
+                compact['support_resistance'] = signal_fields(
+                    details['support_resistance'],
+                    'nearest_resistance', 'nearest_support', 'resistance_distance',
+                    'support_distance', 'resistance_weight', 'support_weight', 'signal'
+                )
+            
+            if 'supply_demand' in details:
+                supply_demand = details['supply_demand']
+                compact['supply_demand'] = {
+                    'signal': supply_demand.get('signal'),
+                    'zone_count': supply_demand.get('zone_count', 0),
+                    'active_zone_count': len(supply_demand.get('active_zones', []))
+                }
+                if 'recent_zones' in supply_demand:
+                    compact['supply_demand']['recent_zones'] = supply_demand['recent_zones'].to_json()
+            
+            if 'order_blocks' in details:
+                order_blocks = details['order_blocks']
+                compact['order_blocks'] = {
+                    'signal': order_blocks.get('signal'),
+                    'strength': scalar(order_blocks.get('strength')),
+                    'active_block_count': len(order_blocks.get('active_blocks', []))
+                }
+                if 'recent_blocks' in order_blocks:
+                    compact['order_blocks']['recent_blocks'] = order_blocks['recent_blocks'].to_json()
+            
+            if 'ict_concepts' in details:
+                compact['ict_concepts'] = signal_fields(details['ict_concepts'], 'signal', 'strength', 'liquidity_grab',
+                                                        'recent_high', 'recent_low', 'previous_close')
+            if 'smart_money' in details:
+                compact['smart_money'] = signal_fields(details['smart_money'], 'signal', 'strength', 'structure_break')
+            if 'smart_money_divergence' in details:
+                compact['smart_money_divergence'] = signal_fields(
+                    details['smart_money_divergence'], 'signal', 'strength', 'type', 'divergence_detected'
+                )
+            if 'qmlr' in details:
+                qmlr = details['qmlr']
+                compact['qmlr'] = {
+                    'signal': qmlr.get('signal'),
+                    'strength': scalar(qmlr.get('strength')),
+                    'factors': list(qmlr.get('factors', []))
+                }
+            
+            if 'traditional' in details:
+                compact['traditional'] = {
+                    name: scalar(values.iloc[-1]) if hasattr(values, 'iloc') and len(values) > 0 else scalar(values)
+                    for name, values in details['traditional'].items()
+                }
+            
+            return compact
+            
+        except Exception as e:
+            logger.error(f"Compact analysis error: {e}")
+            return {}
+    
+    def _compact_fvg(self, fvg: Dict[str, Any], gaps: FairValueGaps = None) -> Dict[str, Any]:
+        """Compact FVG signal; with `gaps`, every scanned gap for re-pricing"""
+        active_gap = fvg.get('active_gap')
+        compact = {
+            'signal': fvg.get('signal'),
+            'unfilled_count': fvg.get('unfilled_count', 0),
+            'active_gap': {
+                'type': str(active_gap.type),
+                'upper': float(active_gap.upper),
+                'lower': float(active_gap.lower)
+            } if active_gap else None
+        }
+        if gaps is not None:
+            compact['gaps'] = gaps.to_json()
+        return compact
+    
+    def _analyze_order_blocks(self, bars: OHLCV) -> Dict[str, Any]:
         """Analyze Order Blocks - institutional buying/selling zones"""
         try:
-            current_price = df['close'].iloc[-1]
-            order_blocks = []
-            
-            # Look for strong moves that create order blocks
-            for i in range(20, len(df) - 5):
-                # Bullish Order Block: Strong move up after consolidation
-                if (df['close'].iloc[i] - df['open'].iloc[i]) / df['open'].iloc[i] > 0.015:  # 1.5% move
-                    # Find the last down candle before the move
-                    for j in range(i-1, max(0, i-10), -1):
-                        if df['close'].iloc[j] < df['open'].iloc[j]:
-                            ob = {
-                                'type': 'BULLISH_OB',
-                                'upper': df['high'].iloc[j],
-                                'lower': df['low'].iloc[j],
-                                'index': j,
-                                'strength': (df['close'].iloc[i] - df['open'].iloc[i]) / df['open'].iloc[i],
-                                'tested': False
-                            }
-                            order_blocks.append(ob)
-                            break
-                
-                # Bearish Order Block: Strong move down after consolidation
-                elif (df['open'].iloc[i] - df['close'].iloc[i]) / df['open'].iloc[i] > 0.015:  # 1.5% move
-                    for j in range(i-1, max(0, i-10), -1):
-                        if df['close'].iloc[j] > df['open'].iloc[j]:
-                            ob = {
-                                'type': 'BEARISH_OB',
-                                'upper': df['high'].iloc[j],
-                                'lower': df['low'].iloc[j],
-                                'index': j,
-                                'strength': (df['open'].iloc[i] - df['close'].iloc[i]) / df['open'].iloc[i],
-                                'tested': False
-                            }
-                            order_blocks.append(ob)
-                            break
-            
-            # Find active order blocks near current price
-            active_obs = []
-            for ob in order_blocks[-10:]:
-                distance = min(abs(current_price - ob['upper']), abs(current_price - ob['lower']))
-                if distance / current_price < 0.01:  # Within 1% of order block
-                    active_obs.append(ob)
-            
-            # Generate signal
-            signal = None
-            strength = 0
-            if active_obs:
-                strongest_ob = max(active_obs, key=lambda x: x['strength'])
-                if strongest_ob['type'] == 'BULLISH_OB' and not strongest_ob['tested']:
-                    signal = 'BULLISH'
-                    strength = strongest_ob['strength']
-                elif strongest_ob['type'] == 'BEARISH_OB' and not strongest_ob['tested']:
-                    signal = 'BEARISH'
-                    strength = strongest_ob['strength']
+            bars = as_bars(bars)
+            opens, highs, lows, closes = bars.open, bars.high, bars.low, bars.close
+            current_price = closes[-1]
+            
+            # Strong moves (1.5% bodies) after consolidation create order blocks
+            rise = (closes - opens) / opens
+            fall = (opens - closes) / opens
+            bullish = rise > 0.015
+            strong = np.zeros(len(bars), dtype=bool)
+            strong[20:max(len(bars) - 5, 20)] = True
+            strong &= bullish | (fall > 0.015)
+            
+            # Block candle: the last opposite candle among the 9 bars before the move
+            positions = np.arange(len(bars))
+            last_down = np.maximum.accumulate(np.where(closes < opens, positions, -1))
+            last_up = np.maximum.accumulate(np.where(closes > opens, positions, -1))
+            block = np.full(len(bars), -1)
+            block[1:] = np.where(bullish[1:], last_down[:-1], last_up[:-1])
+            found = strong & (block >= positions - 9)
+            
+            # Only the most recent blocks can be active
+            i = np.flatnonzero(found)[-MAX_ZONES:]
+            j = block[i]
+            order_blocks = OrderBlocks(
+                type=np.where(bullish[i], 'BULLISH_OB', 'BEARISH_OB'),
+                upper=highs[j],
+                lower=lows[j],
+                index=j,
+                strength=np.where(bullish[i], rise[i], fall[i]),
+                tested=np.zeros(len(i), dtype=bool)
+            )
+            
+            # Only the last 10 blocks can be active
+            recent_obs = order_blocks[-10:]
             
             return {
-                'signal': signal,
-                'strength': min(strength, 1.0),
+                **self._order_block_signal(recent_obs, current_price),
                 'order_blocks': order_blocks[-5:],
-                'active_blocks': active_obs
+                'recent_blocks': recent_obs
             }
             
         except Exception as e:
             logger.error(f"Order block analysis error: {e}")
-            return {'signal': None, 'strength': 0, 'order_blocks': [], 'active_blocks': []}
+            return {'signal': None, 'strength': 0, 'order_blocks': OrderBlocks.empty(), 'active_blocks': OrderBlocks.empty()}
+    
+    def _order_block_signal(self, recent_obs: OrderBlocks, current_price: float) -> Dict[str, Any]:
+        """Blocks within 1% of `current_price` and the signal of the strongest untested one"""
+        distance = np.minimum(np.abs(current_price - recent_obs.upper), np.abs(current_price - recent_obs.lower))
+        active_obs = recent_obs[distance / current_price < 0.01]
+        
+        # Generate signal
+        signal = None
+        strength = 0
+        if len(active_obs):
+            strongest_ob = active_obs[int(np.argmax(active_obs.strength))]
+            if strongest_ob.type == 'BULLISH_OB' and not strongest_ob.tested:
+                signal = 'BULLISH'
+                strength = strongest_ob.strength
+            elif strongest_ob.type == 'BEARISH_OB' and not strongest_ob.tested:
+                signal = 'BEARISH'
+                strength = strongest_ob.strength
+        
+        return {'signal': signal, 'strength': min(strength, 1.0), 'active_blocks': active_obs}
     
-    def _analyze_ict_concepts(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_ict_concepts(self, bars: OHLCV) -> Dict[str, Any]:
         """Analyze ICT (Inner Circle Trader) concepts"""
         try:
             # Simplified ICT analysis
-            swing_highs, swing_lows = self._identify_swing_points(df)
-            current_price = df['close'].iloc[-1]
-            
-            # Look for liquidity grabs and reversals
-            signal = None
-            strength = 0
+            bars = as_bars(bars)
+            swing_highs, swing_lows = self._identify_swing_points(bars)
+            current_price = bars.close[-1]
             
-            if len(swing_highs) > 0 and len(swing_lows) > 0:
-                recent_high = swing_highs[-1]['price']
-                recent_low = swing_lows[-1]['price']
-                
-                # Check for liquidity grab above high
-                if current_price > recent_high * 1.001:
-                    if df['close'].iloc[-1] < df['close'].iloc[-2]:  # Reversal
-                        signal = 'BEARISH'
-                        strength = 0.8
-                
-                # Check for liquidity grab below low
-                elif current_price < recent_low * 0.999:
-                    if df['close'].iloc[-1] > df['close'].iloc[-2]:  # Reversal
-                        signal = 'BULLISH'
-                        strength = 0.8
+            # Look for liquidity grabs and reversals against the last swing high / low
+            recent_high = swing_highs.price[-1] if len(swing_highs) > 0 and len(swing_lows) > 0 else None
+            recent_low = swing_lows.price[-1] if recent_high is not None else None
+            previous_close = bars.close[-2] if len(bars) > 1 else current_price
             
             return {
-                'signal': signal,
-                'strength': strength,
-                'liquidity_grab': signal is not None
+                **self._liquidity_grab_signal(current_price, recent_high, recent_low, previous_close),
+                'recent_high': recent_high,
+                'recent_low': recent_low,
+                'previous_close': previous_close
             }
             
         except Exception as e:
             logger.error(f"ICT analysis error: {e}")
             return {'signal': None, 'strength': 0}
     
-    def _analyze_smart_money_concepts(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _liquidity_grab_signal(self, current_price: float, recent_high: float, recent_low: float,
+                               previous_close: float) -> Dict[str, Any]:
+        """Liquidity grab beyond the last swing high / low that `current_price` already reverses"""
+        signal = None
+        strength = 0
+        
+        if recent_high is not None and recent_low is not None:
+            # Check for liquidity grab above high
+            if current_price > recent_high * 1.001:
+                if current_price < previous_close:  # Reversal
+                    signal = 'BEARISH'
+                    strength = 0.8
+            
+            # Check for liquidity grab below low
+            elif current_price < recent_low * 0.999:
+                if current_price > previous_close:  # Reversal
+                    signal = 'BULLISH'
+                    strength = 0.8
+        
+        return {'signal': signal, 'strength': strength, 'liquidity_grab': signal is not None}
+    
+    def _analyze_smart_money_concepts(self, bars: OHLCV) -> Dict[str, Any]:
         """Analyze Smart Money Concepts (SMC)"""
         try:
             # Market structure shift detection
-            swing_highs, swing_lows = self._identify_swing_points(df)
+            swing_highs, swing_lows = self._identify_swing_points(as_bars(bars))
             
             signal = None
             strength = 0
             
             if len(swing_highs) >= 2 and len(swing_lows) >= 2:
                 # Check for break of structure
-                if swing_highs[-1]['price'] > swing_highs[-2]['price']:
+                if swing_highs.price[-1] > swing_highs.price[-2]:
                     signal = 'BULLISH'
                     strength = 0.7
-                elif swing_lows[-1]['price'] < swing_lows[-2]['price']:
+                elif swing_lows.price[-1] < swing_lows.price[-2]:
                     signal = 'BEARISH'
                     strength = 0.7
             
@@ -940,40 +1444,61 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"Smart Money Concepts error: {e}")
             return {'signal': None, 'strength': 0}
     
-    def _analyze_smart_money_divergence(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze Smart Money Divergence patterns"""
+    def _analyze_smart_money_divergence(self, bars: OHLCV, symbol: str = None) -> Dict[str, Any]:
+        """Analyze regular and hidden divergences between price swings and RSI / MACD"""
         try:
-            # Price vs RSI divergence
-            rsi = ta.momentum.rsi(df['close'], window=14)
+            bars = as_bars(bars)
+            oscillators = self._oscillators(bars, symbol)
             
-            signal = None
-            strength = 0
+            # Per symbol the history accumulates bar by bar; otherwise the whole frame is scanned once
+            if symbol:
+                direction, strength, regular = divergence_signal(bars.high, bars.low, oscillators)
+                divergences = get_divergence_engine(symbol, '1h').update(bars, oscillators)
+            else:
+                scan = divergence_masks(bars.high, bars.low, oscillators)
+                direction, strength, regular = latest_divergence(scan[0])
+                divergences = find_divergences(bars, oscillators, scan=scan)
             
-            if len(rsi) >= 10:
-                price_higher = df['close'].iloc[-1] > df['close'].iloc[-5]
-                rsi_lower = rsi.iloc[-1] < rsi.iloc[-5]
-                
-                if price_higher and rsi_lower:
-                    signal = 'BEARISH'  # Bearish divergence
-                    strength = 0.6
-                elif not price_higher and not rsi_lower:
-                    signal = 'BULLISH'  # Bullish divergence
-                    strength = 0.6
+            signal = None
+            divergence_type = None
+            if direction[0]:
+                signal = 'BULLISH' if direction[0] > 0 else 'BEARISH'
+                divergence_type = f"{'REGULAR' if regular[0] else 'HIDDEN'}_{signal}"
             
             return {
                 'signal': signal,
-                'strength': strength,
-                'divergence_detected': signal is not None
+                'strength': float(strength[0]),
+                'type': divergence_type,
+                'divergence_detected': signal is not None,
+                'divergences': divergences[-5:],
+                'divergence_count': len(divergences)
             }
             
         except Exception as e:
             logger.error(f"Smart Money Divergence error: {e}")
             return {'signal': None, 'strength': 0}
     
-    def _analyze_qmlr(self, df_1h: pd.DataFrame, df_4h: pd.DataFrame) -> Dict[str, Any]:
+    def _oscillators(self, bars: OHLCV, symbol: str = None) -> Dict[str, np.ndarray]:
+        """RSI and MACD line the divergences are measured against"""
+        oscillators = self._oscillator_arrays(bars, symbol)
+        return {'rsi': oscillators['rsi'], 'macd': oscillators['macd']}
+    
+    def _oscillator_arrays(self, bars: OHLCV, symbol: str = None) -> Dict[str, np.ndarray]:
+        """RSI and MACD of the frame, computed once per analysis (from the indicator cache per symbol)"""
+        def compute():
+            if symbol:
+                series = indicator_cache.get_indicators(symbol, '1h', bars)
+                return {name: series[name].to_numpy() for name in ('rsi', 'macd', 'macd_signal')}
+            macd_line, macd_signal = kernels.macd(bars.close)
+            return {'rsi': kernels.rsi(bars.close, 14), 'macd': macd_line, 'macd_signal': macd_signal}
+        
+        return self._memoized(('oscillators', symbol), bars, compute)
+    
+    def _analyze_qmlr(self, df_1h: OHLCV, df_4h: OHLCV) -> Dict[str, Any]:
         """Quantified Market Logic & Reasoning analysis"""
         try:
             # Multi-factor quantified analysis
+            df_1h, df_4h = as_bars(df_1h), as_bars(df_4h)
             factors = []
             
             # Factor 1: Trend strength
@@ -982,15 +1507,15 @@ class AdvancedTechnicalAnalyzer:
                 factors.append('STRONG_TREND')
             
             # Factor 2: Volume confirmation
-            volume = df_1h.get('volume', pd.Series([1000] * len(df_1h)))
-            volume_ratio = volume.iloc[-5:].mean() / volume.iloc[-20:].mean()
+            volume = df_1h.volume if df_1h.volume is not None else np.full(len(df_1h), 1000.0)
+            volume_ratio = volume[-5:].mean() / volume[-20:].mean()
             if volume_ratio > 1.2:
                 factors.append('VOLUME_CONFIRM')
             
             # Factor 3: Multi-timeframe alignment
             if df_4h is not None and not df_4h.empty:
-                h1_trend = df_1h['close'].iloc[-1] > df_1h['close'].iloc[-20]
-                h4_trend = df_4h['close'].iloc[-1] > df_4h['close'].iloc[-10]
+                h1_trend = df_1h.close[-1] > df_1h.close[-20]
+                h4_trend = df_4h.close[-1] > df_4h.close[-10]
                 if h1_trend == h4_trend:
                     factors.append('MTF_ALIGN')
             
@@ -1000,7 +1525,7 @@ class AdvancedTechnicalAnalyzer:
             
             if len(factors) >= 2:
                 # Determine direction
-                if df_1h['close'].iloc[-1] > df_1h['close'].iloc[-10]:
+                if df_1h.close[-1] > df_1h.close[-10]:
                     signal = 'BULLISH'
                 else:
                     signal = 'BEARISH'
@@ -1017,14 +1542,24 @@ class AdvancedTechnicalAnalyzer:
             logger.error(f"QMLR analysis error: {e}")
             return {'signal': None, 'strength': 0}
     
-    def get_precise_entry_signal(self, df_1h: pd.DataFrame, df_4h: pd.DataFrame = None) -> Dict[str, Any]:
+    def get_precise_entry_signal(self, df_1h: pd.DataFrame = None, df_4h: pd.DataFrame = None, symbol: str = None,
+                                 analysis: Dict[str, Any] = None, current_price: float = None) -> Dict[str, Any]:
         """
         🎯 PRECISE ENTRY SIGNAL SYSTEM
         Returns exact entry timing with UP/DOWN direction and duration (1/5/10 minutes)
+        
+        Pass a stored `analysis` (e.g. from analysis_cache) with the live `current_price`
+        to skip the candle analysis; only the price-dependent checks and the entry
+        timing are recomputed then.
         """
         try:
-            # Perform full analysis
-            analysis = self.analyze(df_1h, df_4h)
+            if analysis is None:
+                # Perform full analysis
+                analysis = self.analyze(df_1h, df_4h, symbol)
+            elif current_price is not None:
+                analysis = self.refresh_analysis(analysis, current_price, symbol)
+            
+            current_price = float(analysis['current_price'])
             
             if not analysis['meets_threshold']:
                 return {
@@ -1037,7 +1572,6 @@ class AdvancedTechnicalAnalyzer:
                     'next_check': '1 minute'
                 }
             
-            current_price = float(df_1h['close'].iloc[-1])
             confidence = analysis['confidence']
             
             # 🎯 DETERMINE OPTIMAL DURATION based on signal strength
@@ -1052,7 +1586,7 @@ class AdvancedTechnicalAnalyzer:
                 risk_level = "HIGH"
             
             # 🎯 CALCULATE PRECISE ENTRY POINT
-            entry_price = self._calculate_optimal_entry(df_1h, analysis)
+            entry_price = self._calculate_optimal_entry(current_price, analysis)
             
             # 🎯 DETERMINE ENTRY TIMING
             price_distance = abs(current_price - entry_price) / current_price * 100
@@ -1101,10 +1635,8 @@ class AdvancedTechnicalAnalyzer:
                 'reason': f'System error: {str(e)[:50]}...'
             }
     
-    def _calculate_optimal_entry(self, df: pd.DataFrame, analysis: Dict) -> float:
+    def _calculate_optimal_entry(self, current_price: float, analysis: Dict) -> float:
         """Calculate optimal entry price based on market structure"""
-        current_price = float(df['close'].iloc[-1])
-        
         # Get support/resistance levels
         sr_levels = analysis['advanced_analysis'].get('support_resistance', {})
         
@@ -1141,6 +1673,39 @@ class AdvancedTechnicalAnalyzer:
         
         return f"{len(factors)} confluence factors, {signal_count} signals"
     
+    def _get_no_setup_analysis(self, bars: OHLCV, details: Dict[str, Any], votes: Dict[str, Tuple[str, float]],
+                               skipped: List[str], bounds: Dict[str, float], horizons: List[str]) -> Dict[str, Any]:
+        """
+        Result when the confidence threshold became unreachable part-way through
+        
+        Each `confidence` is the upper bound at the point of exit, so the real blend
+        would have scored at most this much.
+        """
+        signals = [signal for signal, _ in votes.values()]
+        bound = bounds[self.prediction_timeframe]
+        analysis = self._get_default_analysis()
+        analysis.update({
+            'confidence': math.floor(bound * 10) / 10,
+            'current_price': float(bars.close[-1]),
+            'signal_breakdown': {
+                'up_signals': signals.count('UP'),
+                'down_signals': signals.count('DOWN'),
+                'total_signals': len(signals)
+            },
+            'horizons': {
+                horizon: {'direction': None, 'confidence': math.floor(bounds[horizon] * 10) / 10, 'meets_threshold': False}
+                for horizon in horizons
+            },
+            'advanced_analysis': details,
+            'early_exit': {
+                'stopped_after': list(details)[-1],
+                'evaluated': list(details),
+                'skipped': skipped,
+                'confidence_upper_bound': round(bound, 2)
+            }
+        })
+        return analysis
+    
     def _get_default_analysis(self) -> Dict[str, Any]:
         """Return default analysis when calculation fails"""
         return {
@@ -13,6 +13,8 @@ urlpatterns = [
     path('api/auto-resolve/', views.auto_resolve_predictions, name='auto_resolve_predictions'),
     path('api/precise-entry/', views.get_precise_entry_signal, name='precise_entry_signal'),
     path('api/qxbroker-quote/', views.get_qxbroker_quote, name='qxbroker_quote'),
+    path('api/profiling/', views.get_analysis_profiling, name='analysis_profiling'),
+    path('api/scanner/', views.get_market_scan, name='market_scan'),
     
     # Chart Analysis Endpoints (Visual + Real Price Data)
     path('api/upload-chart-analysis/', views.upload_chart_analysis, name='upload_chart_analysis'),
@@ -8,11 +8,19 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
-from .models import TradingPair, PriceData, Prediction, AccuracyMetrics, ChartUpload
+from .models import TradingPair, PriceData, Prediction, AccuracyMetrics, AccuracyBucket, ChartUpload
 from .data_sources import DataSourceManager
 from .technical_analysis import AdvancedTechnicalAnalyzer, TechnicalAnalyzer
+from .analysis_cache import analysis_cache, current_key
+from .profiling import stage_histograms, profiling_enabled
+from .analysis_service import get_analysis_service, AnalysisBusy, AnalysisTimeout
+from .scanner import market_scanner
+from .price_index import price_index
+from .structures import Record, RecordArray
 from .chart_analyzer import ChartVisualAnalyzer
 from django.utils import timezone
+from django.conf import settings
+from django.db.models import Sum
 from decimal import Decimal
 import json
 import logging
@@ -46,11 +54,23 @@ def get_prediction(request):
     try:
         symbol = request.data.get('symbol')
         timeframe = request.data.get('timeframe', '1m')
+        debug = str(request.data.get('debug', 'false')).lower() in ('1', 'true', 'yes')
+        
+        # Prediction horizons, e.g. "1m,5m,10m"; all are blended from one analysis pass
+        horizons = request.data.get('horizons') or ['5m']
+        if isinstance(horizons, str):
+            horizons = [horizon.strip() for horizon in horizons.split(',') if horizon.strip()]
         
         if not symbol:
             return Response({'error': 'Symbol is required'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
+        valid_horizons = dict(Prediction.TIMEFRAME_CHOICES)
+        unknown = [horizon for horizon in horizons if horizon not in valid_horizons]
+        if unknown:
+            return Response({'error': f"Unsupported horizons: {', '.join(unknown)} (use {', '.join(valid_horizons)})"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
         # Get or create trading pair
         trading_pair, created = TradingPair.objects.get_or_create(
             symbol=symbol,
@@ -61,18 +81,31 @@ def get_prediction(request):
         data_manager = DataSourceManager()
         
         # Get both 1H and 4H data for professional analysis
-        multi_tf_data = data_manager.get_multi_timeframe_data(symbol, ['1h', '4h'], 100)
+        multi_tf_data = data_manager.get_multi_timeframe_data(symbol, ['1h', '4h'], settings.ANALYSIS_HISTORY_BARS)
         
         if not multi_tf_data or '1h' not in multi_tf_data:
             return Response({'error': 'No price data available'}, 
                           status=status.HTTP_404_NOT_FOUND)
         
-        # Perform advanced technical analysis
+        # Perform advanced technical analysis on the analysis workers
         analyzer = AdvancedTechnicalAnalyzer()
-        analysis = analyzer.analyze(
-            df_1h=multi_tf_data['1h'], 
-            df_4h=multi_tf_data.get('4h', None)
-        )
+        service = get_analysis_service()
+        try:
+            analysis = service.analyze(
+                df_1h=multi_tf_data['1h'], 
+                df_4h=multi_tf_data.get('4h', None),
+                symbol=symbol,
+                debug=debug,
+                horizons=horizons
+            )
+        except AnalysisBusy:
+            response = Response({'error': 'Analysis service busy, retry shortly', 'busy': True}, 
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '1'
+            return response
+        except AnalysisTimeout:
+            return Response({'error': f'Analysis timed out after {service.timeout:.0f}s'}, 
+                            status=status.HTTP_504_GATEWAY_TIMEOUT)
         
         # Clean advanced analysis data for JSON serialization
         def clean_for_json(obj):
@@ -84,6 +117,8 @@ def get_prediction(request):
                 return {k: clean_for_json(v) for k, v in obj.items()}
             elif isinstance(obj, list):
                 return [clean_for_json(item) for item in obj]
+            elif isinstance(obj, (Record, RecordArray)):  # swing point / gap / zone / order block structures
+                return obj.to_json()
             elif hasattr(obj, 'isoformat'):  # datetime/timestamp objects
                 return obj.isoformat()
             elif hasattr(obj, 'tolist'):  # pandas Series/arrays
@@ -104,7 +139,11 @@ def get_prediction(request):
                 return str(obj)  # Convert anything else to string
         
         # Check if prediction meets professional trading standards (70%+ confidence)
-        if not analysis.get('meets_threshold', False):
+        qualifying = {
+            horizon: result for horizon, result in analysis.get('horizons', {}).items()
+            if result['meets_threshold']
+        }
+        if not qualifying:
             return Response({
                 'symbol': symbol,
                 'timeframe': '5m',  # Always 5-minute predictions now
@@ -116,47 +155,69 @@ def get_prediction(request):
                 'timestamp': timezone.now().isoformat()
             })
         
-        # Clean advanced analysis data for database storage
-        cleaned_indicators = clean_for_json(analysis.get('advanced_analysis', {}))
-        
-        # Save prediction to database with error handling
+        # Store the compact summary; full debug detail is only returned in the response
+        advanced_analysis = analysis.get('advanced_analysis', {})
+        if debug:
+            cleaned_indicators = analyzer.compact_analysis(advanced_analysis)
+            advanced_analysis = clean_for_json(advanced_analysis)
+        else:
+            cleaned_indicators = advanced_analysis
+        
+        # One prediction row per qualifying horizon, saved in a single batch
+        def build_predictions(indicators=None):
+            return [
+                Prediction(
+                    trading_pair=trading_pair,
+                    direction=result['direction'],
+                    confidence=Decimal(str(result['confidence'])),
+                    timeframe=horizon,
+                    current_price=Decimal(str(analysis['current_price'])),
+                    technical_indicators=indicators if indicators is not None else {
+                        'error': 'Complex indicators could not be saved', 'direction': result['direction']
+                    }
+                )
+                for horizon, result in qualifying.items()
+            ]
+        
+        # Save predictions to database with error handling
         try:
-            prediction = Prediction.objects.create(
-                trading_pair=trading_pair,
-                direction=analysis['direction'],
-                confidence=Decimal(str(analysis['confidence'])),
-                timeframe='5m',  # Always 5-minute predictions
-                current_price=Decimal(str(analysis['current_price'])),
-                technical_indicators=cleaned_indicators
-            )
+            predictions = Prediction.objects.bulk_create(build_predictions(cleaned_indicators))
         except Exception as db_error:
             logger.warning(f"Database save error for {symbol}, saving with minimal indicators: {db_error}")
             # Fallback: save with minimal indicators
-            prediction = Prediction.objects.create(
-                trading_pair=trading_pair,
-                direction=analysis['direction'],
-                confidence=Decimal(str(analysis['confidence'])),
-                timeframe='5m',
-                current_price=Decimal(str(analysis['current_price'])),
-                technical_indicators={'error': 'Complex indicators could not be saved', 'direction': analysis['direction']}
-            )
+            predictions = Prediction.objects.bulk_create(build_predictions())
+        
+        prediction_ids = {prediction.timeframe: prediction.id for prediction in predictions}
+        
+        # The top-level prediction is the 5m call when it qualified, else the first qualifying horizon
+        lead_horizon = '5m' if '5m' in qualifying else next(iter(qualifying))
+        lead = qualifying[lead_horizon]
+        
+        # The price the predictions start from, for point-in-time resolution
+        if predictions:
+            price_index.record(symbol, predictions[0].prediction_time, float(analysis['current_price']))
         
         return Response({
             'symbol': symbol,
             'timeframe': '5m',
             'prediction': {
-                'direction': analysis['direction'],
-                'confidence': float(analysis['confidence']),
+                'direction': lead['direction'],
+                'confidence': float(lead['confidence']),
                 'current_price': float(analysis['current_price']),
-                'prediction_timeframe': analysis.get('prediction_timeframe', '5m'),
+                'prediction_timeframe': lead_horizon,
                 'analysis_timeframes': analysis.get('analysis_timeframes', ['1h', '4h']),
                 'signal_breakdown': clean_for_json(analysis['signal_breakdown']),
-                'advanced_analysis': clean_for_json(analysis.get('advanced_analysis', {})),
-                'confluence_factors': clean_for_json(analysis.get('confluence_factors', {}))
+                'advanced_analysis': advanced_analysis,
+                'confluence_factors': clean_for_json(analysis.get('confluence_factors', {})),
+                **({'timings': analysis['timings']} if 'timings' in analysis else {})
+            },
+            'horizons': {
+                horizon: {**result, 'prediction_id': prediction_ids.get(horizon)}
+                for horizon, result in analysis.get('horizons', {}).items()
             },
             'threshold_met': True,
             'timestamp': timezone.now().isoformat(),
-            'prediction_id': prediction.id
+            'prediction_id': prediction_ids[lead_horizon]
         })
         
     except Exception as e:
@@ -169,10 +230,21 @@ def get_prediction(request):
 
 @api_view(['GET'])
 def get_accuracy_metrics(request):
-    """Get accuracy metrics for all trading pairs"""
+    """
+    Get accuracy metrics for all trading pairs
+    
+    With ?window=1h|24h|7d the counts are summed from hourly accuracy buckets,
+    so windows are hour-aligned: they start at the top of the hour containing
+    now - window ('since' in the response) and cover up to one hour more than
+    the window.
+    """
     try:
         symbol = request.GET.get('symbol')
         timeframe = request.GET.get('timeframe')
+        window = request.GET.get('window')
+        
+        if window:
+            return rolling_accuracy_metrics(symbol, timeframe, window)
         
         metrics_query = AccuracyMetrics.objects.all()
         
@@ -200,6 +272,41 @@ def get_accuracy_metrics(request):
                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def rolling_accuracy_metrics(symbol, timeframe, window):
+    """Accuracy over an hour-aligned rolling window, from `since` (a bucket start) to `until` (now)"""
+    if window not in AccuracyBucket.WINDOWS:
+        return Response({'error': f"Unsupported window '{window}'", 'windows': list(AccuracyBucket.WINDOWS)},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    until = timezone.now()
+    since = AccuracyBucket.window_start(window, until)
+    buckets = AccuracyBucket.objects.filter(hour__gte=since)
+    if symbol:
+        buckets = buckets.filter(trading_pair__symbol=symbol)
+    if timeframe:
+        buckets = buckets.filter(timeframe=timeframe)
+    
+    totals = buckets.order_by('trading_pair__symbol', 'timeframe').values('trading_pair__symbol', 'timeframe').annotate(
+        total=Sum('total_predictions'), correct=Sum('correct_predictions')
+    )
+    
+    metrics = []
+    for row in totals:
+        total, correct = row['total'], row['correct']
+        metrics.append({
+            'symbol': row['trading_pair__symbol'],
+            'timeframe': row['timeframe'],
+            'window': window,
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'total_predictions': total,
+            'correct_predictions': correct,
+            'accuracy_percentage': round(correct / total * 100, 2) if total else 0.0
+        })
+    
+    return Response(metrics)
+
+
 @api_view(['GET'])
 def get_recent_predictions(request):
     """Get recent predictions with their outcomes"""
@@ -297,6 +404,7 @@ def get_current_price(request):
         
         current_price = float(price_data['close'].iloc[-1])
         timestamp = price_data.index[-1]
+        price_index.record(symbol, timezone.now(), current_price)
         
         return Response({
             'symbol': symbol,
@@ -361,20 +469,47 @@ def get_precise_entry_signal(request):
             return Response({'error': 'Symbol is required'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        # Fetch multi-timeframe data
         data_manager = DataSourceManager()
-        multi_tf_data = data_manager.get_multi_timeframe_data(symbol, ['1h', '4h'], 100)
-        
-        if not multi_tf_data or '1h' not in multi_tf_data:
-            return Response({'error': 'No price data available'}, 
-                          status=status.HTTP_404_NOT_FOUND)
-        
-        # Get precise entry signal
         analyzer = AdvancedTechnicalAnalyzer()
-        entry_signal = analyzer.get_precise_entry_signal(
-            df_1h=multi_tf_data['1h'], 
-            df_4h=multi_tf_data.get('4h', None)
-        )
+        service = get_analysis_service()
+        
+        # Until the next 1H/4H candle close, the stored analysis only needs the live quote
+        cached_analysis = analysis_cache.get(current_key(symbol, analyzer.analysis_timeframes))
+        live_price = data_manager.qxbroker.get_current_price(symbol) if cached_analysis is not None else None
+        
+        if live_price:
+            # Re-priced against per-symbol levels only where the service keeps them (inline analyses)
+            entry_signal = analyzer.get_precise_entry_signal(
+                symbol=service.state_symbol(symbol),
+                analysis=cached_analysis,
+                current_price=live_price
+            )
+        else:
+            # Fetch multi-timeframe data
+            multi_tf_data = data_manager.get_multi_timeframe_data(symbol, ['1h', '4h'], settings.ANALYSIS_HISTORY_BARS)
+            
+            if not multi_tf_data or '1h' not in multi_tf_data:
+                return Response({'error': 'No price data available'}, 
+                              status=status.HTTP_404_NOT_FOUND)
+            
+            # Same queue bound, deadline and analysis_cache entry as /api/prediction/
+            try:
+                analysis = service.analyze(
+                    df_1h=multi_tf_data['1h'], 
+                    df_4h=multi_tf_data.get('4h', None),
+                    symbol=symbol
+                )
+            except AnalysisBusy:
+                response = Response({'error': 'Analysis service busy, retry shortly', 'busy': True}, 
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                response['Retry-After'] = '1'
+                return response
+            except AnalysisTimeout:
+                return Response({'error': f'Analysis timed out after {service.timeout:.0f}s'}, 
+                                status=status.HTTP_504_GATEWAY_TIMEOUT)
+            
+            # Get precise entry signal
+            entry_signal = analyzer.get_precise_entry_signal(analysis=analysis)
         
         # Clean data for JSON response
         def clean_for_json(obj):
@@ -415,6 +550,69 @@ def get_precise_entry_signal(request):
                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+def get_analysis_profiling(request):
+    """
+    Per-stage latency histograms of the analysis pipeline
+    Collected from debug predictions, or from every analysis with ANALYSIS_PROFILING on;
+    analyses run on worker processes report their queue wait and total time here
+    """
+    try:
+        snapshot = stage_histograms.snapshot()
+        if request.GET.get('reset', 'false').lower() == 'true':
+            stage_histograms.reset()
+        
+        return Response({
+            'profiling_enabled': profiling_enabled(),
+            'analyses': snapshot.get('total', {}).get('count', 0),
+            'stages': snapshot,
+            'service': get_analysis_service().snapshot(),
+            'timestamp': timezone.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error fetching analysis profiling: {e}")
+        return Response({'error': 'Failed to fetch analysis profiling'}, 
+                       status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def get_market_scan(request):
+    """
+    Best current setups across all active pairs, highest confidence first
+    Query: top (default 10), direction (UP/DOWN), all=true to include setups below the threshold
+    
+    Pairs are only fetched and rescored after a candle close, so most reads are served from the scanner
+    """
+    try:
+        top = max(int(request.GET.get('top', 10)), 1)
+        direction = (request.GET.get('direction') or '').upper() or None
+        include_all = request.GET.get('all', 'false').lower() == 'true'
+        
+        if direction not in (None, 'UP', 'DOWN'):
+            return Response({'error': 'direction must be UP or DOWN'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        symbols = list(TradingPair.objects.filter(is_active=True).values_list('symbol', flat=True))
+        rescored = market_scanner.refresh(symbols, limit=settings.ANALYSIS_HISTORY_BARS)
+        
+        return Response({
+            'setups': market_scanner.top(top, direction, qualifying_only=not include_all),
+            'pairs': len(symbols),
+            'rescored': len(rescored),
+            'scanner': market_scanner.snapshot(),
+            'timestamp': timezone.now().isoformat()
+        })
+        
+    except ValueError:
+        return Response({'error': 'top must be an integer'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error scanning market: {e}")
+        return Response({'error': 'Failed to scan market'}, 
+                       status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 def get_qxbroker_quote(request):
     """
@@ -0,0 +1,256 @@
+"""
+Signal Weight Optimization
+Searches component weights and confidence bonuses against realized outcomes.
+The feature matrix is computed once per symbol; each configuration only
+re-runs the confidence blend, so batches of configurations are evaluated
+with a few matrix operations.
+"""
+
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import WalkForwardBacktester
+from .feature_matrix import COMPONENTS, signal_votes
+from .technical_analysis import AdvancedTechnicalAnalyzer, CONFIDENCE_BONUSES, get_signal_profile
+
+logger = logging.getLogger(__name__)
+
+BONUS_NAMES = tuple(CONFIDENCE_BONUSES)
+OBJECTIVES = ('hit_rate', 'brier')
+
+
+def _symbol_dataset(args):
+    symbol, candles, options = args
+    try:
+        dataset = WalkForwardBacktester(**options).feature_dataset(candles)
+        return symbol, dataset
+    except Exception as e:
+        logger.error(f"Feature dataset failed for {symbol}: {str(e)}")
+        return symbol, None
+
+
+def build_dataset(candles_by_symbol: Dict[str, pd.DataFrame], workers: int = 1, **options) -> Dict[str, np.ndarray]:
+    """
+    Precompute the feature matrix for every symbol (one symbol per process when
+    `workers` > 1) and keep only what the confidence blend needs
+
+    `options` are passed to WalkForwardBacktester.
+    """
+    jobs = [(symbol, candles, options) for symbol, candles in candles_by_symbol.items()]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        results = [_symbol_dataset(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_symbol_dataset, jobs))
+
+    parts = {key: [] for key in ('strength', 'correct', 'consensus_ratio', 'has_signals', 'mtf', 'structure')}
+    for symbol, dataset in results:
+        if dataset is None:
+            continue
+        votes = signal_votes(dataset['features'])
+        change = dataset['change']
+        parts['strength'].append(dataset['features'].strength)
+        parts['correct'].append(np.where(votes['direction'] > 0, change > 0, change < 0))
+        for key in ('consensus_ratio', 'has_signals', 'mtf', 'structure'):
+            parts[key].append(votes[key])
+
+    if not parts['strength']:
+        raise ValueError("No feature data could be built")
+
+    return {key: np.concatenate(values) for key, values in parts.items()}
+
+
+def evaluate_configs(dataset: Dict[str, np.ndarray], weights: np.ndarray, bonuses: np.ndarray,
+                     threshold: float = 80.0) -> Dict[str, np.ndarray]:
+    """
+    Score a batch of configurations at once
+
+    `weights` is (configs, len(COMPONENTS)) and `bonuses` is (configs, len(BONUS_NAMES)).
+    Returns per-configuration coverage (share of calls at or above `threshold`),
+    hit rate of those calls, and the Brier score of confidence as a probability.
+    """
+    bonus = {name: bonuses[:, col] for col, name in enumerate(BONUS_NAMES)}
+    total_weight = dataset['strength'] @ weights.T
+
+    consensus = np.nan_to_num(dataset['consensus_ratio'] - 0.5)[:, None]
+    confidence = (
+        70.0
+        + consensus * bonus['consensus']
+        + np.minimum(total_weight * bonus['weight_scale'], bonus['weight_cap'])
+        + dataset['mtf'][:, None] * bonus['mtf']
+        + dataset['structure'][:, None] * bonus['structure']
+    )
+    confidence = np.where(dataset['has_signals'][:, None], np.clip(confidence, 70.0, 95.0), 70.0)
+    confidence = np.round(confidence, 1)
+
+    correct = dataset['correct'][:, None]
+    selected = confidence >= threshold
+    signals = selected.sum(axis=0)
+    hits = (selected & correct).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hit_rate = np.where(signals > 0, hits / signals * 100, 0.0)
+
+    return {
+        'signals': signals,
+        'coverage': signals / max(len(correct), 1) * 100,
+        'hit_rate': hit_rate,
+        'brier': ((confidence / 100 - correct) ** 2).mean(axis=0),
+    }
+
+
+def objective_scores(stats: Dict[str, np.ndarray], objective: str = 'hit_rate', min_coverage: float = 5.0) -> np.ndarray:
+    """Higher is better; configurations below `min_coverage` percent of calls are ruled out"""
+    if objective == 'brier':
+        score = -stats['brier']
+    else:
+        score = stats['hit_rate'].astype(float)
+    return np.where(stats['coverage'] >= min_coverage, score, -np.inf)
+
+
+def default_config(profile: Dict[str, Any] = None, horizon: str = None):
+    """
+    Weights and bonuses the analyzer currently blends with: those of `profile`
+    (default settings.SIGNAL_PROFILE_PATH) for `horizon` (default its base blend)
+    """
+    analyzer = AdvancedTechnicalAnalyzer(profile or get_signal_profile())
+    blend = analyzer._horizon_profile(horizon or analyzer.prediction_timeframe)
+    return (
+        np.array([blend['weights'][name] for name in COMPONENTS]),
+        np.array([blend['bonuses'][name] for name in BONUS_NAMES]),
+    )
+
+
+def random_configs(samples: int, seed: Optional[int] = None, spread: float = 1.0,
+                   profile: Dict[str, Any] = None, horizon: str = None):
+    """Current weights and bonuses (see default_config) scaled by independent uniform factors in [1 - spread, 1 + spread]"""
+    rng = np.random.default_rng(seed)
+    base_weights, base_bonuses = default_config(profile, horizon)
+    low, high = max(1.0 - spread, 0.0), 1.0 + spread
+    weights = base_weights * rng.uniform(low, high, (samples, base_weights.size))
+    bonuses = base_bonuses * rng.uniform(low, high, (samples, base_bonuses.size))
+    return weights, bonuses
+
+
+def grid_configs(components: List[str], multipliers: List[float], profile: Dict[str, Any] = None,
+                 horizon: str = None):
+    """Every combination of `multipliers` applied to `components`; other weights stay at their current values"""
+    base_weights, base_bonuses = default_config(profile, horizon)
+    columns = [COMPONENTS.index(name) for name in components]
+    combos = np.array(list(itertools.product(multipliers, repeat=len(columns))), dtype=float)
+
+    weights = np.tile(base_weights, (len(combos), 1))
+    weights[:, columns] *= combos
+    return weights, np.tile(base_bonuses, (len(combos), 1))
+
+
+_worker_dataset = None
+
+
+def _init_worker(dataset):
+    global _worker_dataset
+    _worker_dataset = dataset
+
+
+def _evaluate_batch(args):
+    weights, bonuses, threshold = args
+    return evaluate_configs(_worker_dataset, weights, bonuses, threshold)
+
+
+def search(dataset: Dict[str, np.ndarray], weights: np.ndarray, bonuses: np.ndarray,
+           objective: str = 'hit_rate', threshold: float = 80.0, min_coverage: float = 5.0,
+           workers: int = 1, batch_size: int = 32, top: int = 5, profile: Dict[str, Any] = None,
+           horizon: str = None) -> Dict[str, Any]:
+    """
+    Evaluate every configuration (batched, across a process pool when `workers` > 1)
+    and return the best ones next to the current configuration (see default_config)
+    """
+    base_weights, base_bonuses = default_config(profile, horizon)
+    weights = np.vstack([base_weights, weights])
+    bonuses = np.vstack([base_bonuses, bonuses])
+
+    batches = [
+        (weights[start:start + batch_size], bonuses[start:start + batch_size], threshold)
+        for start in range(0, len(weights), batch_size)
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    if workers <= 1:
+        _init_worker(dataset)
+        results = [_evaluate_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset,)) as pool:
+            results = list(pool.map(_evaluate_batch, batches))
+
+    stats = {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+    scores = objective_scores(stats, objective, min_coverage)
+
+    def config(row):
+        return {
+            'weights': {name: round(float(value), 4) for name, value in zip(COMPONENTS, weights[row])},
+            'bonuses': {name: round(float(value), 4) for name, value in zip(BONUS_NAMES, bonuses[row])},
+            'score': float(scores[row]) if np.isfinite(scores[row]) else None,
+            'hit_rate': round(float(stats['hit_rate'][row]), 2),
+            'coverage': round(float(stats['coverage'][row]), 2),
+            'signals': int(stats['signals'][row]),
+            'brier': round(float(stats['brier'][row]), 5),
+        }
+
+    order = np.argsort(-scores, kind='stable')
+    best = [config(row) for row in order[:top] if np.isfinite(scores[row])]
+
+    return {
+        'objective': objective,
+        'threshold': threshold,
+        'min_coverage': min_coverage,
+        'configs_evaluated': len(weights) - 1,
+        'calls': int(len(dataset['correct'])),
+        'baseline': config(0),
+        'best': best,
+    }
+
+
+def write_profile(path: str, result: Dict[str, Any], metadata: Dict[str, Any] = None, horizon: str = None):
+    """
+    Save the best configuration as a profile loadable through settings.SIGNAL_PROFILE_PATH
+
+    With `horizon` (e.g. '1m') the configuration is stored in the profile's
+    `horizons` section instead, keeping the rest of an existing profile.
+    """
+    if not result['best']:
+        raise ValueError("No configuration met the coverage requirement")
+
+    best = result['best'][0]
+    profile = {
+        'weights': best['weights'],
+        'bonuses': best['bonuses'],
+        'objective': result['objective'],
+        'threshold': result['threshold'],
+        'score': best['score'],
+        'hit_rate': best['hit_rate'],
+        'coverage': best['coverage'],
+        'baseline_hit_rate': result['baseline']['hit_rate'],
+        'created': datetime.now(timezone.utc).isoformat(),
+        **(metadata or {}),
+    }
+
+    if horizon:
+        existing = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                existing = json.load(f)
+        existing.setdefault('horizons', {})[horizon] = profile
+        profile = existing
+
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    return profile
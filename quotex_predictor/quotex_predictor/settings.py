@@ -116,4 +116,20 @@ CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
-CELERY_TIMEZONE = TIME_ZONE
\ No newline at end of file
+CELERY_TIMEZONE = TIME_ZONE
+# Signal blend profile written by `manage.py optimize_weights` (empty: built-in weights)
+SIGNAL_PROFILE_PATH = config('SIGNAL_PROFILE_PATH', default='')
+
+# Record per-stage analysis timings for every request, not only debug ones (see /api/profiling/)
+ANALYSIS_PROFILING = config('ANALYSIS_PROFILING', default=False, cast=bool)
+
+# 1H/4H candles fetched per analysis; the analyzer is linear in history length (tested to 100k bars)
+ANALYSIS_HISTORY_BARS = config('ANALYSIS_HISTORY_BARS', default=100, cast=int)
+
+# Analysis worker processes (0: analyze inline in the request thread), jobs queued or running
+# before /api/prediction/ answers 503, and the per-job deadline in seconds. With workers, the
+# per-symbol state (accumulated S/R levels, indicator cache, divergence history) is off: each
+# analysis reads only the candles it is given, as if analyzed without a symbol
+ANALYSIS_WORKERS = config('ANALYSIS_WORKERS', default=0, cast=int)
+ANALYSIS_QUEUE_SIZE = config('ANALYSIS_QUEUE_SIZE', default=8, cast=int)
+ANALYSIS_TIMEOUT = config('ANALYSIS_TIMEOUT', default=10.0, cast=float)
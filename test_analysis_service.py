@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+⚙️ ANALYSIS SERVICE TESTER
+Checks that analyses run on the worker pool match inline analyze(), and that
+a full queue and a missed deadline are reported, without Django setup
+"""
+
+import sys
+import threading
+
+# Add the predictor path
+sys.path.append('quotex_predictor')
+
+from predictor.technical_analysis import AdvancedTechnicalAnalyzer
+from predictor.analysis_service import AnalysisService, AnalysisBusy, AnalysisTimeout
+from predictor.profiling import stage_histograms
+from test_panel_analysis import create_test_data
+
+COMPARED_FIELDS = ('direction', 'confidence', 'meets_threshold', 'current_price', 'horizons', 'advanced_analysis')
+
+
+def _check_pool_matches_inline(service):
+    """Frames sent through shared memory give the same analysis as in-process"""
+    print("\n⚙️ TESTING POOL RESULTS AGAINST analyze()")
+    print("=" * 50)
+
+    analyzer = AdvancedTechnicalAnalyzer()
+    cases = {
+        '1H + 4H': (create_test_data(100, seed=1), create_test_data(100, seed=2, freq='4h')),
+        '1H only': (create_test_data(120, seed=3), None),
+        'no volume': (create_test_data(100, seed=4).drop(columns='volume'), None),
+    }
+    for name, (df_1h, df_4h) in cases.items():
+        expected = analyzer.analyze(df_1h, df_4h, horizons=['1m', '5m'])
+        result = service.analyze(df_1h, df_4h, horizons=['1m', '5m'])
+        mismatches = [field for field in COMPARED_FIELDS if result.get(field) != expected.get(field)]
+        print(f"   {name}: {'✅' if not mismatches else f'❌ {mismatches}'}")
+        assert not mismatches, f"Pool analysis of {name} diverges from analyze()"
+
+    # Per-symbol state is off in workers: a symbol's analysis, fresh or re-priced from
+    # the parent's cache, matches analyze() of the same frames without a symbol
+    df_1h = create_test_data(150, seed=6)
+    expected = analyzer.analyze(df_1h, horizons=['1m', '5m'])
+    for attempt in ('fresh', 'cached'):
+        result = service.analyze(df_1h, symbol='POOLTEST', horizons=['1m', '5m'])
+        mismatches = [field for field in COMPARED_FIELDS if result.get(field) != expected.get(field)]
+        print(f"   symbol, {attempt}: {'✅' if not mismatches else f'❌ {mismatches}'}")
+        assert not mismatches, f"Pool analysis with a symbol ({attempt}) diverges from stateless analyze()"
+    return True
+
+
+def _check_stage_timings(service):
+    """Stage timings of a worker job reach the parent's histograms"""
+    print("\n⏱️ TESTING WORKER STAGE TIMINGS")
+    print("=" * 50)
+
+    stage_histograms.reset()
+    result = service.analyze(create_test_data(100, seed=7), debug=True)
+    recorded = stage_histograms.snapshot()
+    print(f"   {len(result.get('timings', {}))} stages timed, {len(recorded)} recorded in the parent")
+    assert 'total' in result.get('timings', {}), "Worker analysis returned no timings"
+    assert recorded.get('total', {}).get('count') == 1, "Worker stage timings missing from the parent's histograms"
+    assert set(result['timings']) <= set(recorded), "Some worker stages were not recorded"
+    return True
+
+
+def _check_backpressure(service):
+    """Jobs beyond the queue bound are refused at once; late jobs time out"""
+    print("\n🚦 TESTING BUSY AND DEADLINE RESPONSES")
+    print("=" * 50)
+
+    frame = create_test_data(50000, seed=5)
+    outcomes = []
+
+    def job():
+        try:
+            service.analyze(frame, timeout=60)
+            outcomes.append('done')
+        except AnalysisBusy:
+            outcomes.append('busy')
+
+    threads = [threading.Thread(target=job) for _ in range(service.max_pending + 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"   {len(threads)} concurrent jobs: {outcomes.count('done')} done, {outcomes.count('busy')} busy")
+    assert outcomes.count('busy') >= 1, "Expected jobs beyond the queue bound to be refused"
+
+    try:
+        service.analyze(frame, timeout=0.001)
+        timed_out = False
+    except AnalysisTimeout:
+        timed_out = True
+    print(f"   1 ms deadline: {'✅ timed out' if timed_out else '❌ finished'}")
+    assert timed_out, "Expected a job past its deadline to time out"
+    return True
+
+
+def test_analysis_service():
+    """Pool results and backpressure on one warm two-worker service"""
+    service = AnalysisService(workers=2, max_pending=2, timeout=30).start()
+    try:
+        _check_pool_matches_inline(service)
+        _check_stage_timings(service)
+        _check_backpressure(service)
+    finally:
+        service.shutdown(wait=True)
+
+
+def main():
+    try:
+        test_analysis_service()
+        print("\n🎉 Analysis service matches analyze() and applies backpressure")
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
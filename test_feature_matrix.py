@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+🧮 FEATURE MATRIX PARITY TESTER
+Checks that the bar-wise feature matrix reproduces analyze() bar for bar
+without Django setup
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the predictor path
+sys.path.append('quotex_predictor')
+
+from predictor.technical_analysis import AdvancedTechnicalAnalyzer, SIGNAL_WEIGHTS, CONFIDENCE_BONUSES
+from predictor.feature_matrix import window_stack, build_features, reduce_features, COMPONENTS
+from predictor.backtesting import WalkForwardBacktester
+from predictor.analysis_cache import analysis_cache
+
+LOOKBACK = 100
+
+SIGNAL_DIRECTIONS = {
+    'BULLISH': 1, 'BEARISH': -1, 'NEUTRAL': 0, None: 0,
+    'BULLISH_BOS': 1, 'BEARISH_BOS': -1, 'BULLISH_CHOCH': 1, 'BEARISH_CHOCH': -1,
+}
+
+
+def create_test_data(periods=400, seed=42, volatility=0.006):
+    """Create test data volatile enough for zones, order blocks and gaps to appear"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2024-01-01', periods=periods, freq='1h')
+
+    close = 1.0850 * np.exp(np.cumsum(rng.normal(0, volatility, periods)))
+    open_price = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, volatility / 2, periods)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, volatility / 2, periods)))
+    volume = rng.integers(1000, 10000, periods).astype(float)
+
+    return pd.DataFrame({'open': open_price, 'high': high, 'low': low,
+                         'close': close, 'volume': volume}, index=dates)
+
+
+def component_directions(details):
+    """Direction of each component as reported by analyze(debug=True)"""
+    directions = {
+        'htf_bias': SIGNAL_DIRECTIONS[details['htf_bias']['bias']],
+        'ltf_structure': SIGNAL_DIRECTIONS[details['ltf_structure']['bias']],
+        'bos': SIGNAL_DIRECTIONS[details['bos']['type']],
+        'choch': SIGNAL_DIRECTIONS[details['choch']['type']],
+    }
+    for name, key in (('fvg', 'fvg'), ('support_resistance', 'support_resistance'),
+                      ('supply_demand', 'supply_demand'), ('order_blocks', 'order_blocks'),
+                      ('ict_concepts', 'ict_concepts'), ('smart_money', 'smart_money'),
+                      ('smart_money_divergence', 'smart_money_divergence'), ('qmlr', 'qmlr')):
+        directions[name] = SIGNAL_DIRECTIONS[details[key]['signal']]
+    return directions
+
+
+def test_feature_matrix_parity():
+    """Every component, direction and confidence matches analyze() on the same window"""
+    print("\n🧮 TESTING FEATURE MATRIX AGAINST analyze()")
+    print("=" * 50)
+
+    analyzer = AdvancedTechnicalAnalyzer()
+    all_ok = True
+
+    for seed, volatility, separate_4h in ((1, 0.004, False), (2, 0.008, False), (3, 0.012, True)):
+        df_1h = create_test_data(300, seed, volatility)
+        df_4h = create_test_data(300, seed + 50, volatility * 2) if separate_4h else None
+
+        features = build_features(
+            window_stack(df_1h, LOOKBACK),
+            window_stack(df_4h, LOOKBACK) if separate_4h else None
+        )
+        reduced = reduce_features(features)
+
+        mismatches = {name: 0 for name in COMPONENTS}
+        mismatches.update({'direction': 0, 'confidence': 0})
+
+        for row in range(len(features)):
+            window_4h = df_4h.iloc[row:row + LOOKBACK] if separate_4h else None
+            result = analyzer.analyze(df_1h.iloc[row:row + LOOKBACK], window_4h, debug=True)
+
+            for name, direction in component_directions(result['advanced_analysis']).items():
+                if features.direction[row, features.column(name)] != direction:
+                    mismatches[name] += 1
+
+            if reduced['direction'][row] != (1 if result['direction'] == 'UP' else -1):
+                mismatches['direction'] += 1
+            if abs(reduced['confidence'][row] - result['confidence']) > 0.05:
+                mismatches['confidence'] += 1
+
+        bad = {name: count for name, count in mismatches.items() if count}
+        status = "✅" if not bad else f"❌ {bad}"
+        print(f"   seed {seed}, {len(features)} bars: {status}")
+        all_ok = all_ok and not bad
+
+    assert all_ok, "Feature matrix diverges from analyze()"
+    return all_ok
+
+
+def test_profile_lookbacks():
+    """Non-default lookbacks for every component, structure ones included, match analyze() under the same profile"""
+    print("\n📐 TESTING PROFILE LOOKBACKS")
+    print("=" * 50)
+
+    lookback = 200
+    lookbacks = {
+        'htf_bias': 80, 'ltf_structure': 120, 'bos': 60, 'choch': 90, 'ict_concepts': 50, 'smart_money': 70,
+        'support_resistance': 100, 'qmlr': 60, 'fvg': 40, 'supply_demand': 150, 'order_blocks': 110,
+        'smart_money_divergence': 130, 'traditional': 130,
+    }
+    analyzer = AdvancedTechnicalAnalyzer({'lookbacks': lookbacks})
+    df_1h = create_test_data(lookback + 60, seed=11, volatility=0.008)
+    df_4h = create_test_data(lookback + 60, seed=61, volatility=0.016)
+
+    features = build_features(window_stack(df_1h, lookback), window_stack(df_4h, lookback), analyzer.component_lookbacks)
+    reduced = reduce_features(features)
+    mismatches = {name: 0 for name in COMPONENTS}
+    mismatches['confidence'] = 0
+    for row in range(len(features)):
+        result = analyzer.analyze(df_1h.iloc[row:row + lookback], df_4h.iloc[row:row + lookback], debug=True)
+        for name, direction in component_directions(result['advanced_analysis']).items():
+            if features.direction[row, features.column(name)] != direction:
+                mismatches[name] += 1
+        if abs(reduced['confidence'][row] - result['confidence']) > 0.05:
+            mismatches['confidence'] += 1
+
+    bad = {name: count for name, count in mismatches.items() if count}
+    print(f"   {len(features)} windows of {lookback} bars: {'✅' if not bad else f'❌ {bad}'}")
+    assert not bad, "Feature matrix ignores profile lookbacks"
+    return True
+
+
+def test_long_history():
+    """Windows longer than every component lookback still match, and large inputs stay fast"""
+    print("\n📜 TESTING LONG HISTORY WINDOWS")
+    print("=" * 50)
+
+    analyzer = AdvancedTechnicalAnalyzer()
+    lookback = 1500
+    df_1h = create_test_data(lookback + 20, seed=4, volatility=0.008)
+    features = build_features(window_stack(df_1h, lookback))
+    reduced = reduce_features(features)
+
+    mismatches = 0
+    for row in range(len(features)):
+        result = analyzer.analyze(df_1h.iloc[row:row + lookback], debug=True)
+        directions = component_directions(result['advanced_analysis'])
+        mismatches += sum(features.direction[row, features.column(name)] != direction
+                          for name, direction in directions.items())
+        mismatches += abs(reduced['confidence'][row] - result['confidence']) > 0.05
+    print(f"   {len(features)} windows of {lookback} bars: {'✅' if not mismatches else f'❌ {mismatches} mismatches'}")
+
+    for bars in (10_000, 100_000):
+        df = create_test_data(bars, seed=5)
+        started = time.perf_counter()
+        result = analyzer.analyze(df, df)
+        print(f"   {bars} bars: {result['direction']} {result['confidence']}% in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    assert not mismatches, "Feature matrix diverges from analyze() on long windows"
+    return True
+
+
+def test_backtest_threshold():
+    """A confidence threshold above the 70% floor reaches the replayed analyzer and leaves fewer threshold signals"""
+    print("\n🎯 TESTING BACKTEST CONFIDENCE THRESHOLD")
+    print("=" * 50)
+
+    candles = create_test_data(3600, seed=7, volatility=0.002)
+    candles.index = pd.date_range(start='2024-01-01', periods=len(candles), freq='5min')
+
+    reports = {}
+    for threshold in (70.0, 90.0):
+        for vectorized in (True, False):
+            report = WalkForwardBacktester(horizon_minutes=5, step_minutes=60, lookback=60,
+                                           confidence_threshold=threshold, vectorized=vectorized).run(candles)
+            reports[threshold, vectorized] = report
+            print(f"   threshold {threshold:.0f}%, {'vectorized' if vectorized else 'replay'}: "
+                  f"{report['threshold_signals']['calls']} of {report['calls']} calls")
+
+    for vectorized in (True, False):
+        assert reports[90.0, vectorized]['threshold_signals']['calls'] < reports[70.0, vectorized]['threshold_signals']['calls'], \
+            "A higher threshold does not reduce threshold signals"
+    assert reports[90.0, True]['threshold_signals'] == reports[90.0, False]['threshold_signals'], \
+        "Replay and vectorized threshold signals differ"
+    # The replayed analyzer stops early on setups that cannot reach its threshold (no call)
+    assert reports[90.0, False]['calls'] < reports[70.0, False]['calls'], "Replay ignores the confidence threshold"
+    return True
+
+
+def test_backtest_profile():
+    """A signal profile's weights, bonuses and lookbacks reach the feature matrix as they reach analyze()"""
+    print("\n🎛️ TESTING BACKTEST SIGNAL PROFILE")
+    print("=" * 50)
+
+    candles = create_test_data(3600, seed=8, volatility=0.002)
+    candles.index = pd.date_range(start='2024-01-01', periods=len(candles), freq='5min')
+    profile = {
+        'weights': {**SIGNAL_WEIGHTS, 'bos': 3.0, 'fvg': 0.2},
+        'bonuses': {**CONFIDENCE_BONUSES, 'structure': 12.0},
+        'horizons': {},
+        'lookbacks': {'fvg': 20, 'supply_demand': 30, 'order_blocks': 30, 'traditional': 40},
+    }
+    compared = ('calls', 'hits', 'by_direction', 'threshold_signals', 'calibration')
+
+    reports = {}
+    for name, chosen in (('default', None), ('custom', profile)):
+        for vectorized in (True, False):
+            report = WalkForwardBacktester(horizon_minutes=5, step_minutes=60, lookback=60, confidence_threshold=80.0,
+                                           vectorized=vectorized, profile=chosen).run(candles)
+            reports[name, vectorized] = {key: report[key] for key in compared}
+        same = reports[name, True] == reports[name, False]
+        print(f"   {name} profile: {reports[name, True]['hits']}/{reports[name, True]['calls']} hits, "
+              f"{'✅ replay matches' if same else '❌ replay differs'}")
+        assert same, f"Vectorized backtest ignores the {name} profile"
+
+    assert reports['custom', True] != reports['default', True], "The custom profile changes nothing"
+    return True
+
+
+def test_early_exit_cache():
+    """Above the 70% floor uncached analyses skip components; cached ones evaluate all and are reused"""
+    print("\n⏭️ TESTING EARLY EXIT AND CACHING")
+    print("=" * 50)
+
+    analyzer = AdvancedTechnicalAnalyzer()
+    analyzer.min_confidence_threshold = 90.0
+    for seed in range(40):
+        bars = create_test_data(200, seed=seed, volatility=0.004)
+        result = analyzer.analyze(bars)
+        if 'early_exit' in result:
+            break
+    else:
+        raise AssertionError("No setup stopped early at a 90% threshold")
+
+    skipped = result['early_exit']['skipped']
+    print(f"   seed {seed}: stopped after {result['early_exit']['stopped_after']}, skipped {len(skipped)} of {len(COMPONENTS)}")
+    assert skipped and len(result['early_exit']['evaluated']) < len(COMPONENTS), "Early exit skipped no components"
+
+    analysis_cache.clear()
+    hits = analysis_cache.stats['hits']
+    first = analyzer.analyze(bars, symbol='EARLYEXIT')
+    second = analyzer.analyze(bars, symbol='EARLYEXIT')
+    assert 'early_exit' not in first and 'components' in first['signal_breakdown'], \
+        "A cached analysis stopped early"
+    assert analysis_cache.stats['hits'] == hits + 1, "The full analysis was not cached"
+    assert (second['direction'], second['confidence']) == (first['direction'], first['confidence']), \
+        "The refreshed analysis differs"
+    print(f"   with a symbol: all {len(first['advanced_analysis'])} components evaluated, served from cache on repeat")
+    return True
+
+
+def main():
+    try:
+        if (test_feature_matrix_parity() and test_profile_lookbacks() and test_long_history() and test_backtest_threshold()
+                and test_early_exit_cache() and test_backtest_profile()):
+            print("\n🎉 Feature matrix matches analyze()")
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
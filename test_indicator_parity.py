@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+📈 INDICATOR PARITY TESTER
+Checks the O(1) streaming indicators and the NumPy kernels against the `ta`
+library without Django setup
+"""
+
+import json
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import ta
+
+# Add the predictor path
+sys.path.append('quotex_predictor')
+
+from predictor.streaming_indicators import StreamingIndicatorSet, INDICATOR_NAMES
+from predictor import indicators as kernels
+from predictor.indicator_cache import IndicatorCache
+
+TOLERANCE = 1e-9
+
+
+def create_test_data(periods=500, seed=42):
+    """Create realistic test data"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2024-01-01', periods=periods, freq='1h')
+
+    close = 1.0850 * np.exp(np.cumsum(rng.normal(0.0001, 0.002, periods)))
+    open_price = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, 0.001, periods)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, 0.001, periods)))
+    volume = rng.integers(800, 1200, periods).astype(float)
+
+    return pd.DataFrame({'open': open_price, 'high': high, 'low': low,
+                         'close': close, 'volume': volume}, index=dates)
+
+
+def ta_reference(df):
+    """The indicator set exactly as _calculate_supporting_indicators computed it with `ta`"""
+    close, high, low = df['close'], df['high'], df['low']
+    return {
+        'ema_21': ta.trend.ema_indicator(close, window=21),
+        'ema_50': ta.trend.ema_indicator(close, window=50),
+        'sma_200': ta.trend.sma_indicator(close, window=min(200, len(df))),
+        'rsi': ta.momentum.rsi(close, window=14),
+        'macd': ta.trend.macd(close),
+        'macd_signal': ta.trend.macd_signal(close),
+        'stoch_k': ta.momentum.stoch(high, low, close, window=14),
+        'adx': ta.trend.adx(high, low, close, window=14),
+        'atr': ta.volatility.average_true_range(high, low, close, window=14),
+        'volume_sma': df['volume'].rolling(window=20).mean(),
+    }
+
+
+def count_mismatches(values, reference):
+    """Number of bars per indicator that differ from the reference"""
+    mismatches = {}
+    for col, name in enumerate(INDICATOR_NAMES):
+        ours = values[:, col]
+        theirs = reference[name].to_numpy(dtype=float)
+        close = np.isclose(ours, theirs, rtol=TOLERANCE, atol=TOLERANCE, equal_nan=True)
+        mismatches[name] = int((~close).sum())
+    return mismatches
+
+
+def test_streaming_parity():
+    """Streaming values match `ta` bar for bar, across a state save/restore"""
+    print("\n📈 TESTING STREAMING INDICATORS AGAINST TA")
+    print("=" * 50)
+
+    all_ok = True
+    for periods in (60, 100, 500, 2000):
+        df = create_test_data(periods, seed=periods)
+        rows = list(zip(df['high'], df['low'], df['close'], df['volume']))
+
+        indicator_set = StreamingIndicatorSet(sma_window=min(200, periods))
+        half = periods // 2
+        values = [indicator_set.update(*row) for row in rows[:half]]
+
+        # Persist and restore halfway through the stream
+        state = json.loads(json.dumps(indicator_set.get_state()))
+        indicator_set = StreamingIndicatorSet.from_state(state)
+        values += [indicator_set.update(*row) for row in rows[half:]]
+
+        mismatches = count_mismatches(np.array(values), ta_reference(df))
+        bad = {name: count for name, count in mismatches.items() if count}
+        status = "✅" if not bad else f"❌ {bad}"
+        print(f"   {periods:>5} bars: {status}")
+        all_ok = all_ok and not bad
+
+    assert all_ok, "Streaming indicators diverge from ta"
+    return all_ok
+
+
+def kernel_values(df):
+    """The indicator set computed by the NumPy kernels, in INDICATOR_NAMES order"""
+    close, high, low = df['close'].values, df['high'].values, df['low'].values
+    macd_line, macd_signal = kernels.macd(close)
+    return np.column_stack([
+        kernels.ema(close, 21),
+        kernels.ema(close, 50),
+        kernels.sma(close, min(200, len(df))),
+        kernels.rsi(close, 14),
+        macd_line,
+        macd_signal,
+        kernels.stoch_k(high, low, close, 14),
+        kernels.adx(high, low, close, 14),
+        kernels.atr(high, low, close, 14),
+        kernels.sma(df['volume'].values, 20),
+    ])
+
+
+def test_kernel_parity():
+    """NumPy kernels match `ta`, and a 2-D panel matches the per-symbol results"""
+    print("\n🧮 TESTING NUMPY KERNELS AGAINST TA")
+    print("=" * 50)
+
+    all_ok = True
+    for periods in (60, 100, 1000, 10000):
+        df = create_test_data(periods, seed=periods)
+        mismatches = count_mismatches(kernel_values(df), ta_reference(df))
+        bad = {name: count for name, count in mismatches.items() if count}
+        status = "✅" if not bad else f"❌ {bad}"
+        print(f"   {periods:>5} bars: {status}")
+        all_ok = all_ok and not bad
+
+    frames = [create_test_data(300, seed=seed) for seed in range(4)]
+    panel = {col: np.vstack([df[col].values for df in frames]) for col in ('high', 'low', 'close')}
+    panel_adx = kernels.adx(panel['high'], panel['low'], panel['close'], 14)
+    panel_rsi = kernels.rsi(panel['close'], 14)
+    panel_ok = all(
+        np.allclose(panel_adx[i], kernels.adx(df['high'].values, df['low'].values, df['close'].values, 14))
+        and np.allclose(panel_rsi[i], kernels.rsi(df['close'].values, 14), equal_nan=True)
+        for i, df in enumerate(frames)
+    )
+    print(f"   2-D panel: {'✅' if panel_ok else '❌'}")
+
+    assert all_ok and panel_ok, "NumPy kernels diverge from ta"
+    return True
+
+
+def test_cache_revised_history():
+    """Cached indicators follow revised candles, not only appended ones"""
+    print("\n🗂️ TESTING INDICATOR CACHE ON REVISED HISTORY")
+    print("=" * 50)
+
+    df = create_test_data(400, seed=9)
+    revised = df.copy()
+    revised.iloc[150, revised.columns.get_loc('close')] *= 1.01
+
+    cases = {
+        # Same first and last candle and length, one close revised in the middle
+        'revised middle bar': (df.iloc[:300], revised.iloc[:300]),
+        # A new candle appended after a revision of an earlier one
+        'revised then extended': (df.iloc[:300], revised.iloc[:301]),
+        'extended': (df.iloc[:300], df.iloc[:301]),
+    }
+    all_ok = True
+    for name, (first, second) in cases.items():
+        cache = IndicatorCache()
+        cache.get_indicators('TEST', '1h', first)
+        result = cache.get_indicators('TEST', '1h', second)
+        expected = IndicatorCache().get_indicators('TEST', '1h', second)
+        values = np.column_stack([result[indicator].to_numpy() for indicator in INDICATOR_NAMES])
+        mismatches = count_mismatches(values, expected)
+        bad = {indicator: count for indicator, count in mismatches.items() if count}
+        print(f"   {name}: {'✅' if not bad else f'❌ {bad}'} {cache.stats}")
+        all_ok = all_ok and not bad
+
+    assert all_ok, "Indicator cache serves stale values after revised candles"
+    return all_ok
+
+
+def test_cache_concurrency():
+    """Concurrent polls of one symbol with growing frames get the series of their own frame"""
+    print("\n🧵 TESTING INDICATOR CACHE UNDER CONCURRENT POLLS")
+    print("=" * 50)
+
+    df = create_test_data(600, seed=10)
+    frames = [df.iloc[:length] for length in range(300, 600, 5)]
+    expected = {len(frame): IndicatorCache().get_indicators('TEST', '1h', frame) for frame in frames}
+    cache = IndicatorCache()
+    wrong = []
+
+    def poll(frame):
+        for _ in range(5):
+            result = cache.get_indicators('TEST', '1h', frame)
+            reference = expected[len(frame)]
+            if len(result['rsi']) != len(frame) or any(
+                not np.allclose(result[name].to_numpy(), reference[name].to_numpy(), equal_nan=True)
+                for name in INDICATOR_NAMES
+            ):
+                wrong.append(len(frame))
+
+    threads = [threading.Thread(target=poll, args=(frame,)) for frame in frames for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"   {len(threads)} threads: {'✅' if not wrong else f'❌ {len(wrong)} wrong series'} {cache.stats}")
+    assert not wrong, "Concurrent polls got series of another frame"
+    return True
+
+
+def main():
+    try:
+        if (test_streaming_parity() and test_kernel_parity() and test_cache_revised_history()
+                and test_cache_concurrency()):
+            print("\n🎉 All indicators match ta")
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+📊 PANEL ANALYSIS TESTER
+Checks that one vectorized pass over many symbols reproduces analyze() for
+each symbol, without Django setup
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the predictor path
+sys.path.append('quotex_predictor')
+
+from predictor.technical_analysis import AdvancedTechnicalAnalyzer
+from predictor.panel import analyze_panel
+
+SYMBOLS = 20
+COMPARED_FIELDS = ('direction', 'confidence', 'meets_threshold', 'current_price', 'horizons', 'confluence_factors')
+
+
+def create_test_data(periods=100, seed=42, volatility=0.006, freq='1h'):
+    """Create test data volatile enough for zones, order blocks and gaps to appear"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end='2024-06-01', periods=periods, freq=freq)
+
+    close = 1.0850 * np.exp(np.cumsum(rng.normal(0, volatility, periods)))
+    open_price = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, volatility / 2, periods)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, volatility / 2, periods)))
+    volume = rng.integers(1000, 10000, periods).astype(float)
+
+    return pd.DataFrame({'open': open_price, 'high': high, 'low': low,
+                         'close': close, 'volume': volume}, index=dates)
+
+
+def create_universe():
+    """20 OTC-like symbols; a few without 4H data, one without volume and one too short to analyze"""
+    frames_1h, frames_4h = {}, {}
+    for i in range(SYMBOLS):
+        symbol = f"PAIR{i:02d}_OTC"
+        volatility = 0.003 + 0.001 * (i % 8)
+        frames_1h[symbol] = create_test_data(100, seed=i, volatility=volatility)
+        if i % 5:
+            frames_4h[symbol] = create_test_data(100, seed=i + 100, volatility=volatility * 2, freq='4h')
+    frames_1h['PAIR03_OTC'] = frames_1h['PAIR03_OTC'].drop(columns='volume')
+    frames_1h['SHORT_OTC'] = create_test_data(30, seed=99)
+    return frames_1h, frames_4h
+
+
+def test_panel_matches_analyze():
+    """Every symbol of the panel matches its own analyze() call"""
+    print("\n📊 TESTING PANEL ANALYSIS AGAINST analyze()")
+    print("=" * 50)
+
+    analyzer = AdvancedTechnicalAnalyzer()
+    frames_1h, frames_4h = create_universe()
+    horizons = ['1m', '5m', '10m']
+
+    started = time.perf_counter()
+    panel = analyze_panel(frames_1h, frames_4h, analyzer, horizons=horizons)
+    panel_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    single = {
+        symbol: analyzer.analyze(frame, frames_4h.get(symbol), horizons=horizons)
+        for symbol, frame in frames_1h.items()
+    }
+    single_ms = (time.perf_counter() - started) * 1000
+
+    mismatches = []
+    for symbol, expected in single.items():
+        result = panel[symbol]
+        for field in COMPARED_FIELDS:
+            if field in expected and result.get(field) != expected[field]:
+                mismatches.append(f"{symbol}.{field}")
+        for key in ('up_signals', 'down_signals', 'total_signals'):
+            if result['signal_breakdown'][key] != expected['signal_breakdown'][key]:
+                mismatches.append(f"{symbol}.signal_breakdown.{key}")
+
+    print(f"   {len(frames_1h)} symbols: {'✅' if not mismatches else f'❌ {mismatches[:5]}'}")
+    print(f"   ⏱️ panel {panel_ms:.1f} ms vs {single_ms:.1f} ms for one analyze() per symbol")
+
+    assert not mismatches, "Panel results diverge from analyze()"
+    return True
+
+
+def main():
+    try:
+        if test_panel_matches_analyze():
+            print("\n🎉 Panel analysis matches analyze()")
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+🧾 RESOLUTION AND ACCURACY COUNT TESTER
+Resolves predictions against a throwaway test database and checks outcomes,
+AccuracyMetrics and AccuracyBucket counts, the no-price path and reconciliation
+"""
+
+import os
+import sys
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+import pandas as pd
+
+# Add the project directory to Python path
+sys.path.insert(0, os.path.join(os.getcwd(), 'quotex_predictor'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quotex_predictor.settings')
+
+# Setup Django
+django.setup()
+
+from django.db import connection
+from django.utils import timezone
+from predictor.models import Prediction, TradingPair, AccuracyMetrics, AccuracyBucket
+from predictor.price_index import PriceIndex
+from predictor import tasks
+
+
+class StubPrices:
+    """Live prices for the resolver's fallback, without any data source"""
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_price_data(self, symbol, timeframe, limit):
+        price = self.prices.get(symbol)
+        return None if price is None else pd.DataFrame({'close': [price]})
+
+
+def create_prediction(pair, age, timeframe, direction, current_price):
+    return Prediction.objects.create(
+        trading_pair=pair, prediction_time=timezone.now() - age, direction=direction,
+        confidence=Decimal('80'), timeframe=timeframe, current_price=Decimal(str(current_price))
+    )
+
+
+def metric_counts():
+    return {
+        (metrics.trading_pair.symbol, metrics.timeframe): (metrics.total_predictions, metrics.correct_predictions)
+        for metrics in AccuracyMetrics.objects.select_related('trading_pair')
+    }
+
+
+def bucket_counts():
+    return {
+        (bucket.trading_pair.symbol, bucket.timeframe, bucket.hour): (bucket.total_predictions, bucket.correct_predictions)
+        for bucket in AccuracyBucket.objects.select_related('trading_pair')
+    }
+
+
+def _check_resolution_counts():
+    """Indexed and live outcomes are written once and counted once per metric row and hourly bucket"""
+    print("\n🧾 TESTING BULK RESOLUTION AND ACCURACY COUNTS")
+    print("=" * 50)
+
+    eurusd = TradingPair.objects.create(symbol='EURUSD', name='EUR/USD')
+    usdjpy = TradingPair.objects.create(symbol='USDJPY', name='USD/JPY')
+    up_hit = create_prediction(eurusd, timedelta(minutes=10), '5m', 'UP', 1.10)
+    down_miss = create_prediction(eurusd, timedelta(minutes=10), '5m', 'DOWN', 1.10)
+    old_miss = create_prediction(eurusd, timedelta(hours=3), '1m', 'UP', 1.10)
+    live_hit = create_prediction(usdjpy, timedelta(minutes=1, seconds=10), '1m', 'UP', 149.0)
+
+    # Ticks just before each resolve time, stored by another process; USDJPY has none
+    # and falls back to the live price
+    recorder = PriceIndex()
+    for prediction, price in ((up_hit, 1.12), (old_miss, 1.08)):
+        resolve_time = prediction.prediction_time + tasks.RESOLVE_AFTER[prediction.timeframe]
+        recorder.record('EURUSD', resolve_time - timedelta(seconds=5), price)
+
+    stats = tasks.resolve_predictions_bulk(data_manager=StubPrices({'USDJPY': 150.0}), index=PriceIndex())
+    print(f"   first run: {stats}")
+    assert (stats['resolved'], stats['correct'], stats['indexed'], stats['live']) == (4, 2, 3, 1), \
+        "Unexpected resolution stats"
+
+    expected = {up_hit: (Decimal('1.12'), True), down_miss: (Decimal('1.12'), False),
+                old_miss: (Decimal('1.08'), False), live_hit: (Decimal('150'), True)}
+    for prediction, (actual_price, is_correct) in expected.items():
+        prediction.refresh_from_db()
+        assert prediction.is_resolved and prediction.is_correct is is_correct, \
+            f"Wrong outcome for the {prediction.direction} {prediction.timeframe} prediction"
+        assert prediction.actual_price == actual_price, f"Wrong resolution price {prediction.actual_price}"
+
+    metrics = metric_counts()
+    print(f"   metrics: {metrics}")
+    assert metrics == {('EURUSD', '5m'): (2, 1), ('EURUSD', '1m'): (1, 0), ('USDJPY', '1m'): (1, 1)}, \
+        "AccuracyMetrics counts differ from the outcomes"
+    assert AccuracyMetrics.objects.get(trading_pair=eurusd, timeframe='5m').accuracy_percentage == Decimal('50'), \
+        "Accuracy percentage not updated with the counts"
+
+    hour = AccuracyBucket.hour_of
+    buckets = bucket_counts()
+    assert buckets == {
+        ('EURUSD', '5m', hour(up_hit.prediction_time)): (2, 1),
+        ('EURUSD', '1m', hour(old_miss.prediction_time)): (1, 0),
+        ('USDJPY', '1m', hour(live_hit.prediction_time)): (1, 1),
+    }, "AccuracyBucket counts differ from the outcomes"
+
+    # Nothing is due any more: a second run writes and counts nothing
+    stats = tasks.resolve_predictions_bulk(data_manager=StubPrices({'USDJPY': 150.0}), index=PriceIndex())
+    assert stats['resolved'] == 0 and metric_counts() == metrics and bucket_counts() == buckets, \
+        "A second run counted predictions again"
+    print("   second run: nothing due, counts unchanged ✅")
+    return True
+
+
+def _check_no_price():
+    """Without a price a prediction stays pending, and is closed uncounted after UNRESOLVABLE_AFTER"""
+    print("\n🕳️ TESTING THE NO-PRICE PATH")
+    print("=" * 50)
+
+    gbpusd = TradingPair.objects.create(symbol='GBPUSD', name='GBP/USD')
+    recent = create_prediction(gbpusd, timedelta(minutes=6), '5m', 'UP', 1.25)
+    stale = create_prediction(gbpusd, timedelta(minutes=30), '5m', 'UP', 1.25)
+    abandoned = create_prediction(gbpusd, tasks.UNRESOLVABLE_AFTER + timedelta(hours=1), '5m', 'UP', 1.25)
+    buckets = len(bucket_counts())
+
+    # The live price exists but only describes resolve times within MAX_TICK_AGE
+    stats = tasks.resolve_predictions_bulk(data_manager=StubPrices({'GBPUSD': 1.30}), index=PriceIndex())
+    print(f"   with a live price: {stats}")
+    assert (stats['resolved'], stats['live'], stats['no_price'], stats['unresolvable']) == (1, 1, 1, 1), \
+        "Live price used outside MAX_TICK_AGE, or stale predictions not held back"
+
+    for prediction in (recent, stale, abandoned):
+        prediction.refresh_from_db()
+    assert recent.is_resolved and recent.is_correct is True, "Recent prediction not resolved at the live price"
+    assert not stale.is_resolved and stale.actual_price is None, "Stale prediction resolved at today's price"
+    assert abandoned.is_resolved and abandoned.is_correct is None and abandoned.actual_price is None, \
+        "Abandoned prediction not closed without an outcome"
+    assert metric_counts()[('GBPUSD', '5m')] == (1, 1), "An unresolvable prediction was counted"
+
+    # No price at all: the stale one stays pending
+    stats = tasks.resolve_predictions_bulk(data_manager=StubPrices({}), index=PriceIndex())
+    stale.refresh_from_db()
+    print(f"   without a price: {stats}")
+    assert stats['no_price'] == 1 and stats['resolved'] == 0 and not stale.is_resolved, \
+        "A prediction without a price was resolved"
+    assert len(bucket_counts()) == buckets + 1, "Unexpected buckets for the no-price predictions"
+    return True
+
+
+def _check_reconcile():
+    """Reconciliation leaves consistent counts alone and repairs drifted ones"""
+    print("\n🔁 TESTING RECONCILIATION")
+    print("=" * 50)
+
+    metrics, buckets = metric_counts(), bucket_counts()
+    corrected = tasks.reconcile_accuracy_metrics(), tasks.reconcile_accuracy_buckets()
+    print(f"   consistent counts: {corrected[0]} metrics, {corrected[1]} buckets corrected")
+    assert corrected == (0, 0), "Reconciling counts the resolver kept in step changed them"
+    assert metric_counts() == metrics and bucket_counts() == buckets, "Reconciling changed consistent counts"
+
+    # Drift, e.g. a crashed counter update or a manual edit
+    AccuracyMetrics.objects.filter(trading_pair__symbol='EURUSD', timeframe='5m').update(total_predictions=7)
+    AccuracyBucket.objects.filter(trading_pair__symbol='USDJPY').delete()
+    corrected = tasks.reconcile_accuracy_metrics(), tasks.reconcile_accuracy_buckets()
+    print(f"   after drift: {corrected[0]} metrics, {corrected[1]} buckets corrected")
+    assert corrected == (1, 1) and metric_counts() == metrics and bucket_counts() == buckets, \
+        "Reconciliation did not restore the counts"
+    assert (tasks.reconcile_accuracy_metrics(), tasks.reconcile_accuracy_buckets()) == (0, 0), \
+        "Reconciliation is not idempotent"
+    return True
+
+
+def test_resolution_metrics():
+    """Resolution, counting and reconciliation on a throwaway database, so development data is never touched"""
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        _check_resolution_counts()
+        _check_no_price()
+        _check_reconcile()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def main():
+    try:
+        test_resolution_metrics()
+        print("\n🎉 Resolution outcomes and accuracy counts agree")
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()